@@ -0,0 +1,111 @@
+"""Lost updates and database writes for concurrent profile-view increments.
+
+Usage:
+    python benchmarks/bench_counters.py [--increments 1000] [--threads 50] [--interval 0.05]
+
+``--threads`` threads, released together, share ``--increments``
+increments of one ``UserDetails.profile_views_count``. Three ways of
+counting are compared:
+
+* ``save``: the read-modify-write the model used to do (fetch the row, add
+  one, ``save(update_fields=...)``);
+* ``local`` and ``cache``: ``increment_profile_views()`` through each
+  write-behind buffer (``jobs/counters.py``), flushed every ``--interval``
+  seconds and once more after the threads finish.
+
+For each, the table shows the increments lost (the expected count minus the
+count in the row), the UPDATE statements sent and the wall time. The
+buffered ways must lose nothing.
+"""
+import argparse
+import threading
+import time
+
+import common
+
+
+class UpdateCounter:
+    """A ``connection.execute_wrapper`` collecting the UPDATE statements sent"""
+
+    def __init__(self):
+        self.updates = []
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.startswith('UPDATE'):
+            with self.lock:
+                self.updates.append(sql)
+        return execute(sql, params, many, context)
+
+
+def run(increments, threads, work, wrapper):
+    """Call ``work()`` ``increments`` times over ``threads`` threads; returns the ms taken"""
+    from django.db import connection
+
+    barrier = threading.Barrier(threads)
+
+    def worker(share):
+        with connection.execute_wrapper(wrapper):
+            barrier.wait()
+            for _ in range(share):
+                work()
+        connection.close()
+
+    shares = [increments // threads + (i < increments % threads) for i in range(threads)]
+    workers = [threading.Thread(target=worker, args=(share,)) for share in shares]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--increments', type=int, default=1000)
+    parser.add_argument('--threads', type=int, default=50)
+    parser.add_argument('--interval', type=float, default=0.05)
+    args = parser.parse_args()
+
+    common.setup_django()
+    from django.contrib.auth.models import User
+    from django.db import connection
+
+    from jobs import counters
+    from jobs.models import UserDetails
+
+    counters.FLUSH_INTERVAL = args.interval
+    user = User.objects.create_user('bench')
+    details = UserDetails.objects.create(user=user)
+
+    def save():
+        row = UserDetails.objects.get(pk=details.pk)
+        row.profile_views_count += 1
+        row.save(update_fields=['profile_views_count', 'updated_at'])
+
+    def buffered():
+        details.increment_profile_views()
+
+    print(f'{args.increments} increments over {args.threads} threads, '
+          f'flush interval {args.interval}s')
+    print(f"{'mode':<6} {'count':>6} {'lost':>5} {'UPDATEs':>8} {'ms':>8}")
+    for mode, work in (('save', save), ('local', buffered), ('cache', buffered)):
+        if mode != 'save':
+            counters.use_buffer(mode)
+        UserDetails.objects.filter(pk=details.pk).update(profile_views_count=0)
+        wrapper = UpdateCounter()
+        elapsed = run(args.increments, args.threads, work, wrapper)
+        if mode != 'save':
+            with connection.execute_wrapper(wrapper):
+                counters.flush()
+            assert UserDetails.profile_views.pending(details.pk) == 0
+        count = UserDetails.objects.get(pk=details.pk).profile_views_count
+        lost = args.increments - count
+        print(f'{mode:<6} {count:>6} {lost:>5} {len(wrapper.updates):>8} {elapsed:>8.1f}')
+        if mode != 'save':
+            assert lost == 0, f'{mode}: {lost} increments lost'
+
+
+if __name__ == '__main__':
+    main()
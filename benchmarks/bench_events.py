@@ -0,0 +1,86 @@
+"""Request-path cost of logging interaction events, and drops under overload.
+
+Usage:
+    python benchmarks/bench_events.py [--events 5000] [--queue-size 1000]
+
+Logs ``--events`` view events one after another, two ways:
+
+* ``create``: one ``InteractionEvent.objects.create()`` per event, what a
+  view would pay writing the row itself;
+* ``record``: ``events.record()``, which queues the event for the
+  background writer (``jobs/events.py``).
+
+The table shows the mean and 99th percentile microseconds per call, and the
+rows in the table once the writer has caught up. Then ``--events`` events
+are offered at once to a ``--queue-size`` queue with the writer stopped,
+so every event past the queue size must be dropped and counted.
+"""
+import argparse
+import queue
+import statistics
+import time
+
+import common
+
+
+def timed(calls, work):
+    """Microseconds taken by each of ``calls`` calls of ``work()``"""
+    times = []
+    for number in range(calls):
+        start = time.perf_counter()
+        work(number)
+        times.append((time.perf_counter() - start) * 1e6)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=5000)
+    parser.add_argument('--queue-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    common.setup_django()
+    from django.utils import timezone
+
+    from jobs import events
+    from jobs.models import InteractionEvent
+    from jobs.models.events import month_of
+
+    def create(number):
+        now = timezone.now()
+        InteractionEvent.objects.create(
+            kind='view', object_type='job', object_id=number, created_at=now, month=month_of(now)
+        )
+
+    def record(number):
+        events.record('view', 'job', number)
+
+    print(f'{args.events} view events')
+    print(f"{'mode':<7} {'mean us':>8} {'p99 us':>8} {'rows':>6}")
+    for mode, work in (('create', create), ('record', record)):
+        InteractionEvent.objects.all().delete()
+        times = timed(args.events, work)
+        while events.stats()['queued']:
+            time.sleep(0.01)
+        # Let the writer finish the batch it took last
+        time.sleep(events.FLUSH_INTERVAL + 0.5)
+        events.flush()
+        rows = InteractionEvent.objects.count()
+        p99 = statistics.quantiles(times, n=100)[98]
+        print(f'{mode:<7} {statistics.mean(times):>8.1f} {p99:>8.1f} {rows:>6}')
+        assert rows == args.events, f'{mode}: {args.events - rows} events missing'
+
+    # Overload: no writer, a small queue
+    events.BACKGROUND = False
+    events.BATCH_SIZE = args.events + 1
+    events._queue = queue.Queue(maxsize=args.queue_size)
+    dropped = events.stats()['dropped']
+    accepted = sum(events.record('view', 'job', number) for number in range(args.events))
+    dropped = events.stats()['dropped'] - dropped
+    print(f'overload: {accepted} queued, {dropped} dropped '
+          f'(queue size {args.queue_size})')
+    assert dropped == args.events - min(args.events, args.queue_size)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""Body size and encode/decode time: JSON vs MessagePack vs CBOR.
+
+Usage:
+    python benchmarks/bench_formats.py [--sizes 20 100 1000] [--repeat 5]
+
+Two payloads are used. The first is a job list page of each size, shaped
+as ``api_job_list`` returns it. The second is a full profile document
+(``/api/v1/profile/``) with ``size`` rows in each list section. Each
+payload is encoded with every API renderer and decoded the way a client
+would (orjson or json, msgpack, cbor2), best of ``--repeat``. Sizes are
+given raw and gzipped, as ``CompressionMiddleware`` sends them. That the
+formats carry the same data is checked by the test suite
+(``BinaryFormatTests``), not here.
+"""
+import argparse
+import datetime
+import json
+import time
+
+import common
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000, result
+
+
+def make_profile(size):
+    """A user with ``size`` rows in every list section of their profile"""
+    from django.contrib.auth.models import User
+
+    from jobs.models import (
+        Education, Experience, Register, Resume, Skill, SkillCategory, SkillEndorsement,
+        Skills, UserDetails,
+    )
+
+    user = User.objects.create_user(f'bench{size}', first_name='Bench', last_name='User')
+    Register.objects.create(user=user, city='Berlin', country='Germany', bio='Engineer. ' * 20)
+    UserDetails.objects.create(
+        user=user, current_job_title='Engineer', summary='Builds things. ' * 30,
+        preferred_locations='Berlin, Remote', languages='English, German',
+        expected_salary_min=80000, expected_salary_max=120000,
+    )
+    start = datetime.date(2010, 1, 1)
+    Education.objects.bulk_create(
+        Education(user=user, institution=f'University {i}', degree='bachelor',
+                  field_of_study='Computer Science', start_date=start,
+                  description='Studied. ' * 10)
+        for i in range(size)
+    )
+    Experience.objects.bulk_create(
+        Experience(user=user, job_title=f'Engineer {i}', company=f'Company {i}',
+                   employment_type='full_time', start_date=start,
+                   description='Shipped features. ' * 10)
+        for i in range(size)
+    )
+    category, _ = SkillCategory.objects.get_or_create(name='Engineering')
+    skills = Skill.objects.bulk_create(
+        Skill(name=f'Skill {size}-{i}', category=category) for i in range(size)
+    )
+    user_skills = Skills.objects.bulk_create(
+        Skills(user=user, skill=skill, proficiency_level='expert', years_of_experience=5)
+        for skill in skills
+    )
+    endorser = User.objects.create_user(f'endorser{size}', first_name='Endorsing')
+    SkillEndorsement.objects.bulk_create(
+        SkillEndorsement(user_skill=user_skill, endorsed_by=endorser, message='Great.')
+        for user_skill in user_skills
+    )
+    Resume.objects.bulk_create(
+        Resume(user=user, title=f'Resume {i}', file=f'resumes/resume_{i}.pdf')
+        for i in range(size)
+    )
+    return user
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[20, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    common.setup_django()
+    import cbor2
+    import msgpack
+    from django.utils.text import compress_string
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    from jobs.models import Job
+    from jobs.profile import SECTIONS, profile_document
+    from jobs.renderers import CBORRenderer, FastJSONRenderer, MessagePackRenderer, orjson
+    from jobs.serializers import JobSerializer
+    from jobs.serializers.compiled import compile_serializer
+
+    formats = [
+        ('json', FastJSONRenderer(), orjson.loads if orjson is not None else json.loads),
+        ('msgpack', MessagePackRenderer(), msgpack.unpackb),
+        ('cbor', CBORRenderer(), cbor2.loads),
+    ]
+    common.make_jobs(max(args.sizes), companies=min(500, max(args.sizes)))
+    compiled = compile_serializer(JobSerializer)
+
+    def payloads(size):
+        yield 'jobs', {'next': None, 'previous': None, 'results': compiled.serialize(
+            Job.objects.order_by('pk')[:size]
+        )}
+        request = Request(APIRequestFactory().get('/api/v1/profile/'))
+        request.user = make_profile(size)
+        yield 'profile', profile_document(request, SECTIONS)
+
+    print(f"{'payload':<8} {'rows':>5} {'format':<8} {'KiB':>8} {'gzip KiB':>9} "
+          f"{'encode ms':>10} {'decode ms':>10}")
+    for size in args.sizes:
+        for name, data in payloads(size):
+            for fmt, renderer, loads in formats:
+                encode_ms, body = best_of(args.repeat, lambda: renderer.render(data))
+                decode_ms, _ = best_of(args.repeat, lambda: loads(body))
+                gzipped = compress_string(body)
+                print(f'{name:<8} {size:>5} {fmt:<8} {len(body) / 1024:>8.1f} '
+                      f'{len(gzipped) / 1024:>9.1f} {encode_ms:>10.2f} {decode_ms:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""JSON encoding CPU and bytes on the wire for api_job_list pages.
+
+Usage:
+    python benchmarks/bench_json.py [--sizes 20 100 1000 10000] [--repeat 5]
+
+For each size, that many jobs (serialized the way ``api_job_list`` does it)
+go through, best of ``--repeat``:
+
+* ``render``: DRF's ``JSONRenderer`` against ``FastJSONRenderer``, whose
+  bytes must be identical;
+* ``parse``: DRF's ``JSONParser`` against ``FastJSONParser`` on the same body;
+* ``wire``: the body's size raw, gzipped as ``CompressionMiddleware`` does
+  it and, when the ``brotli`` package is installed, brotli-compressed, with
+  the time each compression takes.
+
+Without orjson installed both renderers take the same path and the render
+and parse columns show no speedup.
+"""
+import argparse
+import io
+import time
+
+import common
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[20, 100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    common.setup_django()
+    from django.utils.text import compress_string
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from jobs import compression, renderers
+    from jobs.models import Job
+    from jobs.serializers import JobSerializer
+    from jobs.serializers.compiled import compile_serializer
+
+    common.make_jobs(max(args.sizes), companies=min(500, max(args.sizes)))
+    compiled = compile_serializer(JobSerializer)
+    stock, fast = JSONRenderer(), renderers.FastJSONRenderer()
+    stock_parser, fast_parser = JSONParser(), renderers.FastJSONParser()
+    print(f"orjson: {'yes' if renderers.orjson else 'no'}, "
+          f"brotli: {'yes' if compression.brotli else 'no'}")
+
+    print(f"{'rows':>6} {'render ms':>10} {'fast ms':>8} {'speedup':>8} "
+          f"{'parse ms':>9} {'fast ms':>8} {'speedup':>8} "
+          f"{'raw KiB':>8} {'gzip KiB':>9} {'gzip ms':>8} {'br KiB':>7} {'br ms':>6}")
+    for size in args.sizes:
+        data = {'results': compiled.serialize(Job.objects.order_by('pk')[:size])}
+
+        render_ms, expected = best_of(args.repeat, lambda: stock.render(data))
+        fast_ms, body = best_of(args.repeat, lambda: fast.render(data))
+        assert body == expected, f'x{size}: rendered bytes differ'
+
+        parse_ms, parsed = best_of(args.repeat, lambda: stock_parser.parse(io.BytesIO(body)))
+        fast_parse_ms, fast_parsed = best_of(
+            args.repeat, lambda: fast_parser.parse(io.BytesIO(body))
+        )
+        assert parsed == fast_parsed, f'x{size}: parsed data differs'
+
+        gzip_ms, gzipped = best_of(
+            args.repeat, lambda: compress_string(body, max_random_bytes=100)
+        )
+        if compression.brotli is not None:
+            br_ms, brotlied = best_of(args.repeat, lambda: compression.brotli.compress(
+                body, quality=compression.BROTLI_QUALITY
+            ))
+            br = f'{len(brotlied) / 1024:>7.1f} {br_ms:>6.2f}'
+        else:
+            br = f"{'-':>7} {'-':>6}"
+        print(f'{size:>6} {render_ms:>10.2f} {fast_ms:>8.2f} {render_ms / fast_ms:>7.1f}x '
+              f'{parse_ms:>9.2f} {fast_parse_ms:>8.2f} {parse_ms / fast_parse_ms:>7.1f}x '
+              f'{len(body) / 1024:>8.1f} {len(gzipped) / 1024:>9.1f} {gzip_ms:>8.2f} {br}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Ranking stage: bulk column scoring vs scoring one row at a time.
+
+Usage:
+    python benchmarks/bench_ranking.py [--size 100000] [--k 1000] [--repeat 5]
+
+Every job is a candidate, with a random full-text score and a viewer with
+place, employment type and salary preferences, so all five features are in
+play. It times, best of ``--repeat``:
+
+* ``rows``: a per-job Python loop computing the same score from the index's
+  columns, i.e. re-ranking one row at a time;
+* ``python``: ``RankingIndex.top`` on the pure Python column path;
+* ``numpy``: the same on the numpy path, when numpy is installed.
+
+and checks that all of them return the same top ``--k``.
+"""
+import argparse
+import heapq
+import random
+import time
+
+import common
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000, result
+
+
+def rank_rows(index, ids, k, text_scores, preferences, now):
+    """The reference scorer: one job at a time, same arithmetic"""
+    from jobs.search.ranking import WEIGHTS as weights
+
+    profiles = {code: profile for profile, code in index._profiles.items()}
+    decay = index._decay(now)
+    best = max(text_scores.values())
+    low, high = preferences.salary
+    scored = []
+    for job_id in ids:
+        slot = index._slots[job_id]
+        place_id, job_type, remote = profiles[index._profile[slot]]
+        score = index._base_score(slot, decay)
+        score += weights['text'] / best * text_scores.get(job_id, 0.0)
+        matches = (
+            (place_id in preferences.place_ids)
+            + (job_type == preferences.job_type)
+            + ((index._low[slot] <= high) & (index._high[slot] >= low))
+        )
+        score += weights['match'] / len(preferences) * matches
+        scored.append((score, job_id))
+    return [job_id for _, job_id in heapq.nlargest(k, scored)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--k', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    common.setup_django()
+    from jobs.models import Job
+    from jobs.search import ranking
+
+    start = time.perf_counter()
+    common.make_jobs(args.size)
+    # make_jobs bulk-creates, which skips location resolution
+    for location, place_id in [('San Francisco, CA', 'us-ca-san-francisco'),
+                               ('New York, NY', 'us-ny-new-york')]:
+        Job.objects.filter(location=location).update(place_id=place_id)
+    print(f'populated {args.size} jobs in {time.perf_counter() - start:.1f}s')
+    start = time.perf_counter()
+    index = ranking.build_index()
+    print(f'built ranking index in {time.perf_counter() - start:.1f}s')
+
+    rng = random.Random(7)
+    ids = list(index._slots)
+    rng.shuffle(ids)
+    text_scores = {job_id: rng.uniform(0.5, 12.0) for job_id in ids}
+    preferences = ranking.Preferences(
+        ['us-ny-new-york'], 'full-time', False, (90000.0, 140000.0)
+    )
+    now = time.time()
+    index._refresh(now)
+
+    rows_ms, expected = best_of(args.repeat, lambda: rank_rows(
+        index, ids, args.k, text_scores, preferences, now
+    ))
+    print(f'\n{len(ids)} candidates, top {args.k}')
+    print(f"{'rows':<8} {rows_ms:>8.1f} ms")
+
+    def columns():
+        return index.top(ids, args.k, text_scores, preferences, now=now)
+
+    numpy = ranking.numpy
+    ranking.numpy = None
+    try:
+        python_ms, result = best_of(args.repeat, columns)
+    finally:
+        ranking.numpy = numpy
+    assert result == expected
+    print(f"{'python':<8} {python_ms:>8.1f} ms")
+    if numpy is None:
+        print(f"{'numpy':<8} {'n/a':>8}    (not installed)")
+    else:
+        numpy_ms, result = best_of(args.repeat, columns)
+        assert result == expected
+        print(f"{'numpy':<8} {numpy_ms:>8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Salary range filtering: table scan vs indexed bounds vs the facet grid.
+
+Usage:
+    python benchmarks/bench_salary.py [--size 1000000] [--repeat 5]
+
+For each filter it times, best of ``--repeat``:
+
+* ``scan``: the same predicate on ``COALESCE(salary_min, salary_max)``
+  computed per row, i.e. what filtering without the generated columns costs;
+* ``index``: the filter on the indexed ``salary_low``/``salary_high``
+  columns, both a full COUNT and the first listing page;
+* ``grid``: the facet index computing the whole facet block (total plus
+  every count) for the filter from memory.
+"""
+import argparse
+import time
+from decimal import Decimal
+
+import common
+
+FILTERS = [
+    ('overlap 90k-110k', Decimal(90000), Decimal(110000), 'overlap'),
+    ('overlap >= 200k', Decimal(200000), None, 'overlap'),
+    ('within 80k-120k', Decimal(80000), Decimal(120000), 'within'),
+    ('within min >= 150k', Decimal(150000), None, 'within'),
+    ('within max <= 60k', None, Decimal(60000), 'within'),
+]
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000, result
+
+
+def scan_queryset(jobs, salary):
+    """The filter without the indexed columns, for comparison"""
+    from django.db.models import Q
+    from django.db.models.functions import Coalesce
+
+    jobs = jobs.alias(
+        raw_low=Coalesce('salary_min', 'salary_max'),
+        raw_high=Coalesce('salary_max', 'salary_min'),
+    )
+    condition = Q()
+    for lookup, value in salary.q().children:
+        condition &= Q(**{lookup.replace('salary_', 'raw_'): value})
+    return jobs.filter(condition)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    common.setup_django()
+    from django.db import connection
+
+    from jobs.models import Job
+    from jobs.pagination import KeysetPaginator
+    from jobs.search.facets import build_index
+    from jobs.search.salary import SalaryRange
+
+    start = time.perf_counter()
+    common.make_jobs(args.size)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    print(f'populated {args.size} jobs in {time.perf_counter() - start:.1f}s')
+    start = time.perf_counter()
+    facets = build_index()
+    print(f'built facet index in {time.perf_counter() - start:.1f}s')
+
+    active = Job.objects.filter(is_active=True)
+    paginator = KeysetPaginator(('-created_at',), 10)
+    print(f"\n{'filter':<20} {'matches':>8} {'scan ms':>9} {'index ms':>9} "
+          f"{'page ms':>8} {'grid ms':>8}")
+    for label, lower, upper, match in FILTERS:
+        salary = SalaryRange(lower, upper, match)
+        scan_ms, scanned = best_of(args.repeat, scan_queryset(active, salary).count)
+        index_ms, count = best_of(args.repeat, salary.apply(active).count)
+        page_ms, _ = best_of(args.repeat, lambda: paginator.paginate(salary.apply(active)))
+        grid_ms, grid = best_of(args.repeat, lambda: facets.facets(salary=salary)['total'])
+        assert scanned == count == grid, (scanned, count, grid)
+        print(f'{label:<20} {count:>8} {scan_ms:>9.1f} {index_ms:>9.1f} '
+              f'{page_ms:>8.1f} {grid_ms:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Read serializers: stock DRF vs the compiled ``values()`` fast path.
+
+Usage:
+    python benchmarks/bench_serializers.py [--sizes 1 100 10000] [--repeat 5]
+
+For each size, ``JobSerializer`` (with its nested company) and
+``CompanySerializer`` render that many rows to JSON, best of ``--repeat``:
+
+* ``drf``: load model instances, ``Serializer(many=True).data``, render;
+* ``compiled``: ``values_list()`` rows through the compiled function, render.
+
+Timings include the query, so they are what a list endpoint pays. Each
+pair's rendered bytes are compared and must be identical.
+"""
+import argparse
+import time
+
+import common
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    common.setup_django()
+    from rest_framework.renderers import JSONRenderer
+
+    from jobs.models import Company, Job
+    from jobs.serializers import CompanySerializer, JobSerializer
+    from jobs.serializers.compiled import compile_serializer
+
+    common.make_jobs(max(args.sizes), companies=min(500, max(args.sizes)))
+    renderer = JSONRenderer()
+    cases = [
+        ('job', Job.objects.select_related('company').order_by('pk'), JobSerializer),
+        ('company', Company.objects.order_by('pk'), CompanySerializer),
+    ]
+
+    print(f"{'serializer':<10} {'rows':>6} {'drf ms':>9} {'compiled ms':>12} {'speedup':>8}")
+    for name, queryset, serializer_class in cases:
+        compiled = compile_serializer(serializer_class)
+        for size in args.sizes:
+            rows = queryset[:size]
+
+            def drf():
+                return renderer.render(serializer_class(list(rows), many=True).data)
+
+            def fast():
+                return renderer.render(compiled.serialize(rows))
+
+            drf_ms, expected = best_of(args.repeat, drf)
+            fast_ms, result = best_of(args.repeat, fast)
+            assert result == expected, f'{name} x{size}: output differs'
+            print(f'{name:<10} {len(list(rows)):>6} {drf_ms:>9.2f} {fast_ms:>12.2f} '
+                  f'{drf_ms / fast_ms:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
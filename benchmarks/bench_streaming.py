@@ -0,0 +1,98 @@
+"""Peak RSS and time-to-first-byte of api_job_list: buffered vs streamed.
+
+Usage:
+    python benchmarks/bench_streaming.py [--sizes 10000 100000 1000000]
+                                         [--modes buffered json ndjson]
+
+The buffered mode holds the whole payload in memory (roughly 5.5 GiB at
+1M jobs), so leave it out with ``--modes json ndjson`` on small machines.
+
+Each (size, mode) pair is measured in a fresh subprocess so that the peak
+RSS of one run cannot hide behind another's.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import common
+
+MODES = ('buffered', 'json', 'ndjson')
+
+
+def measure(db_path, mode):
+    common.setup_django(db_path, migrate=False)
+    from django.contrib.auth.models import AnonymousUser
+    from rest_framework.test import APIRequestFactory
+
+    from jobs.views import api_job_list
+
+    query = {} if mode == 'buffered' else {'stream': mode}
+    if mode == 'buffered':
+        # The buffered path is paginated now; ask for everything at once
+        from jobs.pagination import KeysetPagination
+        KeysetPagination.max_page_size = 10 ** 7
+        query['page_size'] = 10 ** 7
+    request = APIRequestFactory().get('/api/jobs/', query)
+    request.user = AnonymousUser()
+    baseline = common.peak_rss_mb()
+
+    start = time.perf_counter()
+    response = api_job_list(request)
+    if response.streaming:
+        chunks = iter(response.streaming_content)
+        size = len(next(chunks))
+        ttfb = time.perf_counter() - start
+        size += sum(len(chunk) for chunk in chunks)
+    else:
+        response.render()
+        ttfb = time.perf_counter() - start
+        size = len(response.content)
+    total = time.perf_counter() - start
+    print(json.dumps({
+        'ttfb_ms': ttfb * 1000,
+        'total_ms': total * 1000,
+        'rss_growth_mb': common.peak_rss_mb() - baseline,
+        'bytes': size,
+    }))
+
+
+def populate(db_path, size):
+    common.setup_django(db_path)
+    common.make_jobs(size)
+
+
+def run_child(*args):
+    output = subprocess.check_output([sys.executable, __file__, *map(str, args)])
+    return output.decode().strip().splitlines()[-1] if output.strip() else ''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--populate', nargs=2, metavar=('DB', 'SIZE'), help=argparse.SUPPRESS)
+    parser.add_argument('--measure', nargs=2, metavar=('DB', 'MODE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.populate:
+        return populate(args.populate[0], int(args.populate[1]))
+    if args.measure:
+        return measure(*args.measure)
+
+    workdir = tempfile.mkdtemp(prefix='getai-bench-')
+    print(f"{'jobs':>9} {'mode':>9} {'ttfb ms':>10} {'total ms':>10} {'rss +MiB':>9} {'MiB out':>8}")
+    for size in args.sizes:
+        db_path = os.path.join(workdir, f'jobs-{size}.sqlite3')
+        run_child('--populate', db_path, size)
+        for mode in args.modes:
+            result = json.loads(run_child('--measure', db_path, mode))
+            print(f"{size:>9} {mode:>9} {result['ttfb_ms']:>10.1f} {result['total_ms']:>10.1f} "
+                  f"{result['rss_growth_mb']:>9.1f} {result['bytes'] / 2 ** 20:>8.1f}")
+        os.remove(db_path)
+
+
+if __name__ == '__main__':
+    main()
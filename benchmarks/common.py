@@ -0,0 +1,92 @@
+"""Shared set-up for the benchmark scripts in this directory.
+
+Every benchmark runs against its own throw-away SQLite database so it never
+touches ``db.sqlite3``. Import this module before anything from ``jobs``.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'getai_project.settings')
+
+
+def setup_django(db_path=None, migrate=True):
+    """Point Django at ``db_path`` (a temp file by default) and set it up"""
+    import django
+    from django.conf import settings
+
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix='getai-bench-'), 'bench.sqlite3')
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.DEBUG = False
+    django.setup()
+    if migrate:
+        from django.core.management import call_command
+        call_command('migrate', verbosity=0)
+    return db_path
+
+
+def _salary(rng):
+    """A random (salary_min, salary_max); some jobs leave one or both unset"""
+    from decimal import Decimal
+
+    shape = rng.random()
+    if shape < 0.15:
+        return None, None
+    low = Decimal(rng.randrange(30, 250) * 1000)
+    if shape < 0.25:
+        return low, None
+    if shape < 0.30:
+        return None, low
+    return low, low + Decimal(rng.randrange(5, 80) * 1000)
+
+
+def make_jobs(count, companies=500, batch_size=5000):
+    """Bulk-insert ``count`` active jobs spread over ``companies`` companies.
+
+    ``bulk_create`` skips the save signals, so the search indexes are not
+    maintained for these rows; benchmarks that need them rebuild them.
+    """
+    import random
+
+    from jobs.models import Company, Job
+
+    rng = random.Random(42)
+    Company.objects.bulk_create(
+        Company(name=f'Company {i}', description='Benchmark company', location='Remote')
+        for i in range(companies)
+    )
+    company_ids = list(Company.objects.values_list('id', flat=True))
+    titles = ['Software Engineer', 'Data Scientist', 'Product Manager',
+              'DevOps Engineer', 'Frontend Developer', 'ML Engineer']
+    job_types = [value for value, _ in Job.JOB_TYPE_CHOICES]
+    locations = ['San Francisco, CA', 'New York, NY', 'Austin, TX', 'Remote', 'Seattle, WA']
+    created = 0
+    while created < count:
+        batch = []
+        for _ in range(min(batch_size, count - created)):
+            salary_min, salary_max = _salary(rng)
+            batch.append(Job(
+                title=rng.choice(titles),
+                description='Benchmark job description. ' * 10,
+                company_id=rng.choice(company_ids),
+                location=rng.choice(locations),
+                job_type=rng.choice(job_types),
+                salary_min=salary_min,
+                salary_max=salary_max,
+                requirements='Python, SQL',
+            ))
+        Job.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MiB"""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
@@ -14,3 +14,19 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "getai_project.settings")
 
 application = get_asgi_application()
+
+# Build the in-memory search indexes before the first request arrives
+from django.db import DatabaseError  # noqa: E402
+from jobs.search.analysis import warm_dictionary  # noqa: E402
+from jobs.search.autocomplete import warm_autocomplete  # noqa: E402
+from jobs.search.facets import warm_facets  # noqa: E402
+from jobs.search.ranking import warm_ranking  # noqa: E402
+
+try:
+    warm_dictionary()
+    warm_autocomplete()
+    warm_facets()
+    warm_ranking()
+except DatabaseError:
+    # Tables not migrated yet; the indexes are built lazily on first use
+    pass
@@ -44,6 +44,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "jobs.compression.CompressionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -133,6 +134,22 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'jobs.pagination.KeysetPagination',
+    'PAGE_SIZE': 20,
+    # orjson-backed when it is installed; same bytes as the stock classes
+    'DEFAULT_RENDERER_CLASSES': [
+        'jobs.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'jobs.renderers.MessagePackRenderer',
+        'jobs.renderers.CBORRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'jobs.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        'jobs.renderers.MessagePackParser',
+        'jobs.renderers.CBORParser',
+    ],
 }
 
 # CORS settings
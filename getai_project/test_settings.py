@@ -0,0 +1,9 @@
+"""
+Settings for the test suite: the project settings with single-process overrides.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+# The test runner is one process on the default local-memory cache, which
+# jobs.W001 warns about for multi-worker deployments
+SILENCED_SYSTEM_CHECKS = ["jobs.W001"]
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Company, Job, JobApplication, UserProfile
+from .counts import CountedRelationsAdminMixin, count_display
+from .models import Company, Job, JobApplication, SearchSynonym, UserProfile
 
 @admin.register(Company)
 class CompanyAdmin(admin.ModelAdmin):
@@ -9,12 +10,15 @@ class CompanyAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at']
 
 @admin.register(Job)
-class JobAdmin(admin.ModelAdmin):
-    list_display = ['title', 'company', 'location', 'job_type', 'is_active', 'created_at']
+class JobAdmin(CountedRelationsAdminMixin, admin.ModelAdmin):
+    list_display = ['title', 'company', 'location', 'job_type', 'is_active', 'application_count', 'created_at']
     list_filter = ['job_type', 'is_active', 'created_at', 'company']
     search_fields = ['title', 'description', 'company__name']
     list_editable = ['is_active']
     readonly_fields = ['created_at', 'updated_at']
+    counted_relations = {'application_count': 'applications'}
+    
+    application_count = count_display('application_count', 'Applications')
 
 @admin.register(JobApplication)
 class JobApplicationAdmin(admin.ModelAdmin):
@@ -28,3 +32,11 @@ class UserProfileAdmin(admin.ModelAdmin):
     list_display = ['user', 'location', 'phone']
     search_fields = ['user__username', 'user__email', 'skills']
     list_filter = ['location']
+
+@admin.register(SearchSynonym)
+class SearchSynonymAdmin(admin.ModelAdmin):
+    list_display = ['term', 'synonyms', 'is_active', 'updated_at']
+    list_filter = ['is_active']
+    search_fields = ['term', 'synonyms']
+    list_editable = ['is_active']
+    readonly_fields = ['created_at', 'updated_at']
@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
 
+from .counts import CountedRelationsAdminMixin, count_display
 from .models.education import Education
 from .models.experience import Experience
 from .models.register import Register
@@ -130,14 +131,13 @@ class ResumeAdmin(admin.ModelAdmin):
     )
 
 @admin.register(SkillCategory)
-class SkillCategoryAdmin(admin.ModelAdmin):
+class SkillCategoryAdmin(CountedRelationsAdminMixin, admin.ModelAdmin):
     list_display = ['name', 'skill_count', 'created_at']
     search_fields = ['name', 'description']
     readonly_fields = ['created_at']
+    counted_relations = {'skill_count': 'skills'}
     
-    def skill_count(self, obj):
-        return obj.skills.count()
-    skill_count.short_description = 'Number of Skills'
+    skill_count = count_display('skill_count', 'Number of Skills')
 
 @admin.register(Skill)
 class SkillAdmin(admin.ModelAdmin):
@@ -160,11 +160,14 @@ class SkillAdmin(admin.ModelAdmin):
     )
 
 @admin.register(Skills)
-class SkillsAdmin(admin.ModelAdmin):
-    list_display = ['user', 'skill', 'proficiency_level', 'years_of_experience', 'verification_status', 'is_featured']
+class SkillsAdmin(CountedRelationsAdminMixin, admin.ModelAdmin):
+    list_display = ['user', 'skill', 'proficiency_level', 'years_of_experience', 'verification_status', 'endorsements_received', 'is_featured']
     list_filter = ['proficiency_level', 'verification_status', 'is_featured', 'created_at']
     search_fields = ['user__username', 'user__email', 'skill__name']
     readonly_fields = ['endorsement_count', 'created_at', 'updated_at']
+    counted_relations = {'endorsements_received': 'endorsements'}
+    
+    endorsements_received = count_display('endorsements_received', 'Endorsements')
     
     fieldsets = (
         ('User & Skill', {
@@ -9,7 +9,8 @@ from .viewsets import (
     SkillViewSet,
     SkillsViewSet,
     SkillEndorsementViewSet,
-    UserDetailsViewSet
+    UserDetailsViewSet,
+    ProfileViewSet
 )
 
 # Create a router and register our viewsets with it
@@ -23,6 +24,7 @@ router.register(r'skills', SkillViewSet, basename='skill')
 router.register(r'user-skills', SkillsViewSet, basename='userskills')
 router.register(r'skill-endorsements', SkillEndorsementViewSet, basename='skillendorsement')
 router.register(r'user-details', UserDetailsViewSet, basename='userdetails')
+router.register(r'profile', ProfileViewSet, basename='profile')
 
 # The API URLs are now determined automatically by the router
 urlpatterns = [
@@ -0,0 +1,200 @@
+"""Bulk create/update/delete for the per-user profile viewsets.
+
+``BulkModelMixin`` adds a ``bulk/`` route to a viewset:
+
+* ``POST`` a list of objects to create them;
+* ``PATCH`` a list of partial objects, each with its ``id``, to update them;
+* ``DELETE`` a list of ids to delete them.
+
+Every item is validated before anything is written, and then the whole
+batch is written in one transaction with ``bulk_create``/``bulk_update``.
+If any item is invalid nothing is written and the 400 body is a list
+aligned with the request, holding ``{}`` for valid items and that item's
+errors otherwise. This is the same shape as a ``many=True`` serializer's
+errors.
+
+Validation uses the serializers the single-item actions use. The viewset's
+``get_serializer_class`` treats ``bulk_create`` like ``create`` and
+``bulk_update`` like ``update``. Successful writes answer with the rows as
+the viewset's read serializer renders them.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .prefetch import with_relations
+
+MAX_ITEMS = getattr(settings, 'API_BULK_MAX_ITEMS', 500)
+
+
+def _items(data):
+    if not isinstance(data, list):
+        raise ValidationError({'non_field_errors': ['Expected a list of items.']})
+    if not data:
+        raise ValidationError({'non_field_errors': ['The list is empty.']})
+    if len(data) > MAX_ITEMS:
+        raise ValidationError({'non_field_errors': [f'At most {MAX_ITEMS} items per request.']})
+    return data
+
+
+def _ids(items):
+    """The ``id`` of each item (None when missing or not an integer)"""
+    ids = []
+    for item in items:
+        value = item.get('id') if isinstance(item, dict) else item
+        ids.append(value if isinstance(value, int) and not isinstance(value, bool) else None)
+    return ids
+
+
+class BulkModelMixin:
+    """ViewSet mixin adding ``POST``/``PATCH``/``DELETE`` on ``<prefix>/bulk/``.
+
+    ``bulk_unique_fields`` names fields that, with the user, must be unique
+    (a model ``unique_together``); clashes within the batch or with the
+    user's existing rows become item errors rather than an IntegrityError.
+    """
+
+    bulk_unique_fields = ()
+
+    def _bulk_response(self, objects, status_code):
+        queryset = with_relations(self.get_queryset(), self.serializer_class)
+        rows = queryset.in_bulk([obj.pk for obj in objects])
+        serializer = self.serializer_class(
+            [rows[obj.pk] for obj in objects], many=True, context=self.get_serializer_context()
+        )
+        return Response(serializer.data, status=status_code)
+
+    def _check_unique(self, states, errors, exclude=()):
+        """Flag items whose ``bulk_unique_fields`` clash; ``states`` are field dicts"""
+        fields = self.bulk_unique_fields
+        if not fields:
+            return
+        keys = [tuple(state.get(field) for field in fields) for state in states]
+        existing = set(
+            self.get_queryset().exclude(pk__in=exclude).values_list(*fields)
+            if len(fields) > 1 else
+            ((value,) for value in self.get_queryset().exclude(pk__in=exclude).values_list(
+                fields[0], flat=True
+            ))
+        )
+        seen = set()
+        message = f"You already have this {' / '.join(fields)}."
+        for index, key in enumerate(keys):
+            if errors[index]:
+                continue
+            raw = tuple(getattr(value, 'pk', value) for value in key)
+            if raw in existing or raw in seen:
+                errors[index] = {fields[0]: [message]}
+            seen.add(raw)
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request):
+        """Create a list of objects in one transaction"""
+        items = _items(request.data)
+        serializer = self.get_serializer(data=items, many=True)
+        if serializer.is_valid():
+            validated = serializer.validated_data
+            errors = [{} for _ in items]
+            self._check_unique(validated, errors)
+        else:
+            errors = [dict(error) for error in serializer.errors]
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        model = self.get_queryset().model
+        objects = [model(user=request.user, **data) for data in validated]
+        with transaction.atomic():
+            self.perform_bulk_create(objects)
+        return self._bulk_response(objects, status.HTTP_201_CREATED)
+
+    @bulk_create.mapping.patch
+    def bulk_update(self, request):
+        """Partially update a list of objects, each identified by its ``id``"""
+        items = _items(request.data)
+        ids = _ids(items)
+        with transaction.atomic():
+            instances = self.get_queryset().select_for_update(of=('self',)).in_bulk(
+                [pk for pk in ids if pk is not None]
+            )
+            errors = []
+            validated = []
+            seen = set()
+            serializer_class = self.get_serializer_class()
+            context = self.get_serializer_context()
+            for item, pk in zip(items, ids):
+                if pk is None:
+                    errors.append({'id': ['This field is required.']})
+                elif pk not in instances:
+                    errors.append({'id': ['Not found.']})
+                elif pk in seen:
+                    errors.append({'id': ['Duplicate id in this request.']})
+                else:
+                    serializer = serializer_class(
+                        instances[pk], data=item, partial=True, context=context
+                    )
+                    errors.append({} if serializer.is_valid() else dict(serializer.errors))
+                    data = dict(serializer.validated_data)
+                    # Rows never change owner
+                    data.pop('user', None)
+                    validated.append((instances[pk], data))
+                    seen.add(pk)
+                    continue
+                validated.append((None, {}))
+            if not any(errors) and self.bulk_unique_fields:
+                states = [
+                    {
+                        field: data.get(field, getattr(instance, field))
+                        for field in self.bulk_unique_fields
+                    }
+                    for instance, data in validated
+                ]
+                self._check_unique(states, errors, exclude=list(seen))
+            if any(errors):
+                return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+            now = timezone.now()
+            fields = {'updated_at'}
+            objects = []
+            for instance, data in validated:
+                for field, value in data.items():
+                    setattr(instance, field, value)
+                instance.updated_at = now
+                fields.update(data)
+                objects.append(instance)
+            self.perform_bulk_update(objects, sorted(fields))
+        return self._bulk_response(objects, status.HTTP_200_OK)
+
+    @bulk_create.mapping.delete
+    def bulk_destroy(self, request):
+        """Delete a list of objects given by id (or ``{"id": ...}`` items)"""
+        items = _items(request.data)
+        ids = _ids(items)
+        with transaction.atomic():
+            found = set(
+                self.get_queryset().filter(pk__in=[pk for pk in ids if pk is not None])
+                .values_list('pk', flat=True)
+            )
+            errors = [
+                {} if pk in found else {'id': ['Not found.' if pk is not None else 'Expected an id.']}
+                for pk in ids
+            ]
+            if any(errors):
+                return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+            self.perform_bulk_destroy(self.get_queryset().filter(pk__in=found))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    # Writes of the validated batch, in its transaction; like perform_create()
+    # and friends, these are the places to hook side effects
+
+    def perform_bulk_create(self, objects):
+        self.get_queryset().model.objects.bulk_create(objects)
+
+    def perform_bulk_update(self, objects, fields):
+        self.get_queryset().model.objects.bulk_update(objects, fields)
+
+    def perform_bulk_destroy(self, queryset):
+        queryset.delete()
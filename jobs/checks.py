@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+from .search import cache as result_cache
+
+
+@register()
+def shared_cache_check(app_configs, **kwargs):
+    """Warn when the caches that invalidate across workers are process-local"""
+    if result_cache.is_shared():
+        return []
+    return [Warning(
+        "The default cache is process-local, so job search pages, the skill "
+        "taxonomy cache and buffered counters are not shared between workers.",
+        hint=(
+            "Configure a shared CACHES['default'] (Redis, Memcached or the database "
+            "cache) before running more than one process. Silence jobs.W001 for "
+            "single-process development."
+        ),
+        id='jobs.W001',
+    )]
+
+
+@register()
+def counter_buffer_check(app_configs, **kwargs):
+    """Warn when buffered counters stay in process memory next to a shared cache"""
+    if getattr(settings, 'COUNTER_BUFFER', None) != 'local' or not result_cache.is_shared():
+        return []
+    return [Warning(
+        "COUNTER_BUFFER = 'local' keeps buffered counter increments in each "
+        "worker's memory, where a killed worker loses them.",
+        hint="Use COUNTER_BUFFER = 'cache' (or leave it unset) with a shared cache in production.",
+        id='jobs.W002',
+    )]
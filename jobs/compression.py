@@ -0,0 +1,132 @@
+"""Negotiated response compression: brotli or gzip above a size threshold.
+
+``CompressionMiddleware`` replaces Django's ``GZipMiddleware``. It reads
+the q-values in ``Accept-Encoding`` and picks brotli (when the ``brotli``
+package is installed) or gzip. When the client rates them equally, brotli
+wins, since it is smaller on the repetitive JSON of job lists. It only
+compresses content types that repeat themselves, such as JSON, NDJSON,
+MessagePack, CBOR and HTML. Bodies under ``API_COMPRESSION_MIN_SIZE``
+bytes are sent as they are, because compressing them costs more CPU than
+it saves on the wire. Streamed responses are compressed chunk by chunk
+(async ones with gzip only).
+
+gzip goes through ``GZipMiddleware`` itself, including its random-length
+padding against BREACH. Brotli has no such padding, so it is only offered
+for the API media types in ``BROTLI_TYPES``; HTML pages, which carry the
+CSRF token, and other text always take the gzip path. As there, a strong
+ETag becomes weak, so it keeps matching ``If-None-Match`` whichever
+encoding the client accepts.
+"""
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # in requirements.txt; without it, gzip only
+    brotli = None
+
+MIN_SIZE = getattr(settings, 'API_COMPRESSION_MIN_SIZE', 1024)
+
+BROTLI_QUALITY = getattr(settings, 'API_COMPRESSION_BROTLI_QUALITY', 5)
+
+COMPRESSIBLE_TYPES = (
+    'application/json', 'application/x-ndjson', 'application/javascript',
+    'application/xml', 'image/svg+xml', 'application/msgpack', 'application/cbor',
+)
+
+# API payloads that never echo secrets such as the CSRF token
+BROTLI_TYPES = (
+    'application/json', 'application/x-ndjson', 'application/msgpack', 'application/cbor',
+)
+
+
+def accepted_encodings(header):
+    """``{coding: q}`` from an ``Accept-Encoding`` header"""
+    accepted = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(header, offered=('br', 'gzip')):
+    """The first of the ``offered`` codings ``header`` rates highest, or None"""
+    accepted = accepted_encodings(header)
+    best, best_q = None, 0.0
+    for coding in offered:
+        q = accepted.get(coding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def _content_type(response):
+    return response.get('Content-Type', '').split(';')[0].strip().lower()
+
+
+def compressible(response):
+    content_type = _content_type(response)
+    return content_type.startswith('text/') or content_type in COMPRESSIBLE_TYPES
+
+
+def _brotli_sequence(sequence):
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    for chunk in sequence:
+        data = compressor.process(chunk)
+        if data:
+            yield data
+        # Flush each chunk so streamed rows leave as they are produced
+        data = compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """Compress responses with the best coding the client accepts"""
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or not compressible(response):
+            return response
+        if not response.streaming and len(response.content) < MIN_SIZE:
+            return response
+
+        if (brotli is None or _content_type(response) not in BROTLI_TYPES
+                or (response.streaming and response.is_async)):
+            offered = ('gzip',)
+        else:
+            offered = ('br', 'gzip')
+        coding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), offered)
+        if coding == 'gzip':
+            return super().process_response(request, response)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if coding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = _brotli_sequence(response.streaming_content)
+            del response.headers['Content-Length']
+        else:
+            compressed = brotli.compress(response.content, quality=BROTLI_QUALITY)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(response.content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = coding
+        return response
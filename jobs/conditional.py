@@ -0,0 +1,143 @@
+"""Conditional GET for the API: ETag / Last-Modified validators and 304s.
+
+Validators come from one cheap query made before anything is serialized.
+A detail resource uses its ``updated_at``, plus those of the rows embedded
+in it, such as a job's company (``validator_relations`` on a viewset). A
+list uses the newest ``updated_at`` and the row count of its filtered
+queryset, which together move on every insert, update and delete, and the
+newest ``updated_at`` of each embedded relation. The ETag also covers everything else that
+shapes the body: the query string (filters, cursor, ``?fields=``) and the
+negotiated media type. On the per-user viewsets it covers the user too.
+The job listing, whose order also depends on the search and ranking
+state, keys its ETag on the result cache generation instead (see
+``jobs.views``).
+
+Lists send no Last-Modified. Deleting a row lowers the count but not the
+newest ``updated_at``, and If-Modified-Since alone would miss that.
+"""
+import hashlib
+from calendar import timegm
+from functools import wraps
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+VALIDATOR_FIELD = 'updated_at'
+
+
+def make_etag(request, *parts):
+    """A strong ETag over ``parts`` and what the request asks the body to look like"""
+    digest = hashlib.md5(usedforsecurity=False)
+    query = sorted(request.GET.lists())
+    for part in (*parts, query, getattr(request, 'accepted_media_type', '')):
+        digest.update(repr(part).encode())
+        digest.update(b'\0')
+    return quote_etag(digest.hexdigest())
+
+
+def _timestamp(value):
+    return timegm(value.utctimetuple()) if value is not None else None
+
+
+def detail_validators(request, *updated, extra=()):
+    """``(etag, last_modified)`` for a resource built from rows updated at ``updated``"""
+    last_modified = max((value for value in updated if value is not None), default=None)
+    return make_etag(request, *updated, *extra), last_modified
+
+
+def list_validators(request, queryset, related=(), extra=()):
+    """``(etag, None)`` for a list, from max(updated_at) and count; nothing is serialized.
+
+    ``related`` are the ``updated_at`` lookups of embedded rows, whose newest
+    values are read in the same query.
+    """
+    aggregates = {f'related_{number}': Max(lookup) for number, lookup in enumerate(related)}
+    stats = queryset.order_by().aggregate(
+        latest=Max(VALIDATOR_FIELD), count=Count('pk'), **aggregates
+    )
+    return make_etag(
+        request, stats['latest'], stats['count'], *(stats[name] for name in aggregates), *extra
+    ), None
+
+
+def not_modified(request, etag, last_modified=None):
+    """The 304 (or 412) answer to a conditional request, else None"""
+    return get_conditional_response(
+        request, etag=etag, last_modified=_timestamp(last_modified)
+    )
+
+
+def set_validators(response, etag, last_modified=None):
+    if response.status_code in (200, 304):
+        response.headers.setdefault('ETag', etag)
+        if last_modified is not None:
+            response.headers.setdefault('Last-Modified', http_date(_timestamp(last_modified)))
+    return response
+
+
+def conditional_get(validators):
+    """Decorate a detail API view with conditional GET.
+
+    ``validators(request, **kwargs)`` returns the ``updated_at`` values the
+    response is built from, or None when the resource does not exist (the
+    view then answers as usual, typically 404). Goes under ``@api_view``.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            updated = validators(request, **kwargs)
+            if updated is None:
+                return view(request, *args, **kwargs)
+            etag, last_modified = detail_validators(request, *updated)
+            response = not_modified(request, etag, last_modified)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            return set_validators(response, etag, last_modified)
+        return wrapper
+    return decorator
+
+
+class ConditionalGetMixin:
+    """ViewSet mixin adding conditional GET to ``list`` and ``retrieve``.
+
+    Access control comes from ``get_queryset`` (the viewsets filter on the
+    user), so validators read from the same filtered queryset.
+    ``validator_relations`` lists the ``updated_at`` lookups of the rows the
+    serializer embeds, such as a user skill's skill and category names.
+    """
+
+    validator_relations = ()
+
+    def _validator_extra(self):
+        return (self.request.user.pk,)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            updated = queryset.filter(
+                **{self.lookup_field: kwargs[lookup_url_kwarg]}
+            ).values_list(VALIDATOR_FIELD, *self.validator_relations).first()
+        except (TypeError, ValueError, DjangoValidationError):
+            updated = None
+        if updated is None:
+            return super().retrieve(request, *args, **kwargs)
+        etag, last_modified = detail_validators(
+            request, *updated, extra=self._validator_extra()
+        )
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
+
+    def list(self, request, *args, **kwargs):
+        etag, _ = list_validators(
+            request, self.filter_queryset(self.get_queryset()),
+            related=self.validator_relations, extra=self._validator_extra(),
+        )
+        response = not_modified(request, etag)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        return set_validators(response, etag)
@@ -0,0 +1,352 @@
+"""Write-behind counters: increments are buffered and written in batches.
+
+``UserDetails.profile_views_count`` and ``Resume.download_count`` go up on
+every profile view and resume download. A read-modify-write ``save()``
+loses increments when two requests overlap, and every hit on a popular
+row waits for that row's lock. A ``BufferedCounter`` declared on the model
+adds each increment to a buffer instead. ``flush()`` then writes the
+accumulated deltas as ``UPDATE ... SET n = n + <delta>`` statements (a
+``CASE`` over the primary keys when the deltas differ), up to
+``BATCH_SIZE`` rows per statement. Each statement also moves ``updated_at``
+and the counter's stamp field, such as ``last_downloaded``.
+
+There are two buffers, chosen by ``COUNTER_BUFFER``:
+
+* ``'cache'``: the pending deltas are ``cache.incr()`` counters in the
+  default cache, shared by every process. A process takes a delta under a
+  per-key ``cache.add()`` lock, so two processes never write the same delta
+  twice. Increments that land meanwhile stay for the next flush.
+* ``'local'``: a dict in this process. This is the stand-in when the cache
+  is local-memory or dummy, which is the default when the setting is unset.
+
+Other buffered writes use the same machinery through ``add(target, pk)``,
+such as the analytics rollups in ``jobs/rollups.py``. State that is not an
+integer delta buffers itself and registers a hook that each flush runs
+(``register_flush()``), as the viewer sketches in ``jobs/sketches.py`` do.
+
+A process flushes the rows it incremented every ``COUNTER_FLUSH_INTERVAL``
+seconds (default 5), from a daemon thread started by its first increment,
+so a row that stops getting traffic is still written. An increment that
+finds ``COUNTER_FLUSH_MAX_KEYS`` rows (default 1000) pending, or the last
+flush overdue, flushes at once, and a final flush runs at exit. A failed
+write puts its deltas back. ``COUNTER_BACKGROUND_FLUSH = False`` turns the
+thread off; flushes then only follow increments and exit.
+
+Production deployments must use the ``'cache'`` buffer on a shared cache
+(Redis or Memcached). A worker killed without running its exit hook
+(SIGKILL, OOM) then leaves its deltas in the cache. The next increment of
+the row, from any worker, takes and writes them. With the ``'local'``
+buffer they die with the process, so up to a flush interval of
+increments is lost. Deltas the cache evicts are lost either way, which is
+the usual write-behind trade.
+
+Reads merge what is pending. ``BufferedCounterField`` serializes the column
+plus the row's buffered delta. ``updated_at``, the API's ETag and
+Last-Modified validator, only moves when the flush writes. To keep
+conditional GETs honest in between, each increment also bumps its owner's
+``epoch()``, which the validators of the owner's resumes, details and
+profile include.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+from rest_framework import serializers
+
+FLUSH_INTERVAL = getattr(settings, 'COUNTER_FLUSH_INTERVAL', 5)
+
+FLUSH_MAX_KEYS = getattr(settings, 'COUNTER_FLUSH_MAX_KEYS', 1000)
+
+BACKGROUND = getattr(settings, 'COUNTER_BACKGROUND_FLUSH', True)
+
+BATCH_SIZE = 500
+
+# Seconds a flushing process holds a key's lock in the shared cache
+LOCK_TIMEOUT = 30
+
+# Cache backends that are not shared between processes
+LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+class LocalBuffer:
+    """Pending deltas in this process's memory"""
+
+    def __init__(self):
+        self._deltas = {}
+        self._lock = threading.Lock()
+
+    def add(self, key, delta):
+        with self._lock:
+            value = self._deltas.get(key, 0) + delta
+            self._deltas[key] = value
+            return value
+
+    def get_many(self, keys):
+        with self._lock:
+            return {key: self._deltas[key] for key in keys if key in self._deltas}
+
+    def take(self, key):
+        with self._lock:
+            return self._deltas.pop(key, 0)
+
+
+class CacheBuffer:
+    """Pending deltas in the default cache, shared by every process"""
+
+    def add(self, key, delta):
+        # cache.incr() refuses missing keys; add() is a no-op when present
+        cache.add(key, 0, timeout=None)
+        try:
+            return cache.incr(key, delta)
+        except ValueError:
+            cache.set(key, delta, timeout=None)
+            return delta
+
+    def get_many(self, keys):
+        return {key: value for key, value in cache.get_many(keys).items() if value}
+
+    def take(self, key):
+        # Another process holding the lock is writing this delta already
+        lock = f'{key}:lock'
+        if not cache.add(lock, 1, LOCK_TIMEOUT):
+            return 0
+        try:
+            value = cache.get(key) or 0
+            if value:
+                cache.decr(key, value)
+            return value
+        finally:
+            cache.delete(lock)
+
+
+BUFFERS = {'local': LocalBuffer, 'cache': CacheBuffer}
+
+_buffer = None
+_dirty = set()
+_dirty_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+_flusher = None
+_flusher_lock = threading.Lock()
+
+# (model, field name) -> BufferedCounter
+_counters = {}
+
+# Callables run by every flush, see register_flush()
+_flush_hooks = []
+
+logger = logging.getLogger(__name__)
+
+
+def use_buffer(name):
+    """Switch to the ``'local'`` or ``'cache'`` buffer, flushing the current one"""
+    global _buffer
+    if _buffer is not None:
+        flush()
+    _buffer = BUFFERS[name]()
+    return _buffer
+
+
+def get_buffer():
+    if _buffer is None:
+        name = getattr(settings, 'COUNTER_BUFFER', None)
+        if name is None:
+            backend = settings.CACHES.get('default', {}).get('BACKEND', LOCAL_BACKENDS[0])
+            name = 'local' if backend in LOCAL_BACKENDS else 'cache'
+        use_buffer(name)
+    return _buffer
+
+
+def _epoch_key(owner_pk):
+    return f'counter:epoch:{owner_pk}'
+
+
+def epoch(owner_pk):
+    """A number that moves whenever one of the owner's counters is incremented"""
+    key = _epoch_key(owner_pk)
+    return get_buffer().get_many([key]).get(key, 0)
+
+
+def increment(items, lookup='pk'):
+    """What to add to each row for ``(key, delta)`` pairs: one value or a CASE on ``lookup``"""
+    amounts = {delta for _, delta in items}
+    if len(amounts) == 1:
+        return Value(amounts.pop())
+    return Case(
+        *(When(**{lookup: key}, then=Value(delta)) for key, delta in items),
+        default=Value(0), output_field=IntegerField(),
+    )
+
+
+class BufferedCounter:
+    """A counter column on the model whose increments go through the buffer.
+
+    ``owner`` names the foreign key whose ``epoch()`` an increment bumps;
+    ``stamp`` a datetime field set to the flush time along with the count.
+    """
+
+    def __init__(self, field, owner='user', stamp=None, touch='updated_at'):
+        self.field = field
+        self.owner = owner
+        self.stamp = stamp
+        self.touch = touch
+
+    def contribute_to_class(self, cls, name):
+        self.model = cls
+        setattr(cls, name, self)
+        _counters[cls, self.field] = self
+
+    def key(self, pk):
+        return f'counter:{self.model._meta.label_lower}:{self.field}:{pk}'
+
+    def incr(self, obj, delta=1):
+        """Add ``delta`` to ``obj``'s count; returns the count including what is pending"""
+        pending = add(self, obj.pk, delta)
+        get_buffer().add(_epoch_key(getattr(obj, self.model._meta.get_field(self.owner).attname)), 1)
+        return getattr(obj, self.field) + pending
+
+    def pending(self, pk):
+        key = self.key(pk)
+        return get_buffer().get_many([key]).get(key, 0)
+
+    def value(self, obj):
+        """``obj``'s count as loaded plus its pending increments"""
+        return getattr(obj, self.field) + self.pending(obj.pk)
+
+    def write(self, deltas):
+        """Add ``{pk: delta}`` to the column, ``BATCH_SIZE`` rows per UPDATE"""
+        now = timezone.now()
+        items = sorted(deltas.items())
+        with transaction.atomic():
+            for start in range(0, len(items), BATCH_SIZE):
+                batch = items[start:start + BATCH_SIZE]
+                update = {self.field: F(self.field) + increment(batch)}
+                for name in (self.touch, self.stamp):
+                    if name:
+                        update[name] = now
+                self.model._base_manager.filter(pk__in=[pk for pk, _ in batch]).update(**update)
+
+
+def add(target, pk, delta=1):
+    """Buffer ``delta`` for ``target``'s row ``pk``; returns the delta pending for it.
+
+    ``target`` gives the row's buffer key (``key(pk)``) and writes
+    ``{pk: delta}`` at flush time (``write(deltas)``), as ``BufferedCounter``
+    does.
+    """
+    pending = get_buffer().add(target.key(pk), delta)
+    with _dirty_lock:
+        _dirty.add((target, pk))
+        due = len(_dirty) >= FLUSH_MAX_KEYS or time.monotonic() - _last_flush >= FLUSH_INTERVAL
+    _schedule(due)
+    return pending
+
+
+def register_flush(hook):
+    """Have every ``flush()`` also call ``hook()``, which returns the rows it wrote.
+
+    The hook writes what its module buffered itself, and puts it back if the
+    write fails. The module calls ``wake()`` when it has something buffered.
+    """
+    _flush_hooks.append(hook)
+    return hook
+
+
+def wake(waiting):
+    """Make sure a flush follows, at once if ``waiting`` rows are pending or one is overdue"""
+    _schedule(waiting >= FLUSH_MAX_KEYS or time.monotonic() - _last_flush >= FLUSH_INTERVAL)
+
+
+def _schedule(due):
+    if BACKGROUND:
+        _start_flusher()
+    if due:
+        # Inside a transaction the write waits for it, so a rollback
+        # cannot discard deltas already taken from the buffer
+        transaction.on_commit(flush)
+
+
+def counter_for(model, field):
+    return _counters[model._meta.concrete_model, field]
+
+
+def flush():
+    """Write the deltas this process has buffered; returns the number of rows updated"""
+    global _dirty, _last_flush
+    with _dirty_lock:
+        dirty, _dirty = _dirty, set()
+        _last_flush = time.monotonic()
+    buffer = get_buffer()
+    taken = defaultdict(dict)
+    for target, pk in dirty:
+        delta = buffer.take(target.key(pk))
+        if delta:
+            taken[target][pk] = delta
+    pending = list(taken.items())
+    written = 0
+    while pending:
+        target, deltas = pending[0]
+        try:
+            target.write(deltas)
+        except Exception:
+            # Put back everything not written yet
+            for target, deltas in pending:
+                for pk, delta in deltas.items():
+                    buffer.add(target.key(pk), delta)
+                    with _dirty_lock:
+                        _dirty.add((target, pk))
+            raise
+        pending.pop(0)
+        written += len(deltas)
+    for hook in _flush_hooks:
+        written += hook()
+    return written
+
+
+def _run_flusher():
+    while True:
+        time.sleep(max(0, _last_flush + FLUSH_INTERVAL - time.monotonic()))
+        if time.monotonic() - _last_flush < FLUSH_INTERVAL:
+            # An increment flushed meanwhile
+            continue
+        try:
+            flush()
+        except Exception:
+            logger.exception('Could not flush buffered counters')
+            # Reconnect for the next flush in case the connection is broken
+            connection.close()
+
+
+def _start_flusher():
+    global _flusher
+    if _flusher is not None and _flusher.is_alive():
+        return
+    with _flusher_lock:
+        # A forked worker inherits the dirty set but not the thread
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = threading.Thread(target=_run_flusher, name='counter-flusher', daemon=True)
+            _flusher.start()
+
+
+atexit.register(flush)
+
+
+class BufferedCounterField(serializers.ReadOnlyField):
+    """A ``BufferedCounter`` column of the same name, with its pending increments"""
+
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        super().__init__(**kwargs)
+
+    def to_representation(self, obj):
+        return counter_for(type(obj), self.field_name).value(obj)
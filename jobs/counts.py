@@ -0,0 +1,112 @@
+"""Counted relations: count-style fields read from one annotation.
+
+A ``SerializerMethodField`` returning ``obj.skills.count()`` runs a COUNT
+per row, or loads every related row through a prefetch just to count
+them. Instead the serializer declares the count::
+
+    skill_count = CountField('skills')
+
+and ``with_relations`` (so every ``SerializerRelationsMixin`` viewset, the
+profile document and the taxonomy snapshot) annotates the queryset with
+each declared count once. The field reads the annotation, and falls back to
+counting the relation for an instance that was loaded without it (a freshly
+created row, or a serializer nested under a prefetch).
+
+The admin declares the same thing on a ``ModelAdmin`` through
+``CountedRelationsAdminMixin``::
+
+    counted_relations = {'skill_count': 'skills'}
+    skill_count = count_display('skill_count', 'Number of Skills')
+
+A count is a correlated subquery rather than ``Count()`` over a join, so it
+does not multiply with other joins or counts on the same queryset, and the
+``GROUP BY`` stays out of the paginated and filtered query.
+"""
+from django.contrib import admin
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from rest_framework import serializers
+
+
+class Counted:
+    """The rows of ``relation`` (optionally those matching ``filter``, a Q on them) per row"""
+
+    def __init__(self, relation, filter=None):
+        self.relation = relation
+        self.filter = filter
+
+    def expression(self, model):
+        field = model._meta.get_field(self.relation)
+        if not field.concrete:
+            # A reverse relation: back through the foreign key pointing here
+            back = field.field.name
+        else:
+            back = field.related_query_name()
+        rows = field.related_model._default_manager.filter(**{back: OuterRef('pk')})
+        if self.filter is not None:
+            rows = rows.filter(self.filter)
+        rows = rows.order_by().values(back).annotate(count=Count('pk')).values('count')
+        return Coalesce(Subquery(rows), 0, output_field=IntegerField())
+
+    def count(self, obj):
+        """Count ``obj``'s rows with a query of its own"""
+        rows = getattr(obj, self.relation)
+        if self.filter is not None:
+            return rows.filter(self.filter).count()
+        return rows.count()
+
+
+def _counted(value):
+    return value if isinstance(value, Counted) else Counted(value)
+
+
+def with_counts(queryset, counted):
+    """Annotate ``queryset`` with ``counted``, a ``{name: relation or Counted}`` mapping"""
+    annotations = {
+        name: _counted(value).expression(queryset.model)
+        for name, value in counted.items()
+        if name not in queryset.query.annotations
+    }
+    return queryset.annotate(**annotations) if annotations else queryset
+
+
+class CountField(serializers.ReadOnlyField):
+    """The number of rows in a relation, read from the annotation of the same name"""
+
+    def __init__(self, relation, filter=None, **kwargs):
+        self.counted = Counted(relation, filter)
+        kwargs['source'] = '*'
+        super().__init__(**kwargs)
+
+    def to_representation(self, obj):
+        value = getattr(obj, self.field_name, None)
+        return self.counted.count(obj) if value is None else value
+
+
+def counted_fields(serializer):
+    """``{name: Counted}`` for the ``CountField``s of a serializer instance"""
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    return {
+        name: field.counted for name, field in serializer.fields.items()
+        if isinstance(field, CountField)
+    }
+
+
+class CountedRelationsAdminMixin:
+    """ModelAdmin mixin annotating its querysets with ``counted_relations``"""
+
+    counted_relations = {}
+
+    def get_queryset(self, request):
+        return with_counts(super().get_queryset(request), self.counted_relations)
+
+
+def count_display(name, description):
+    """An admin column showing the annotation ``name``, sortable by it"""
+
+    @admin.display(description=description, ordering=name)
+    def display(self, obj):
+        return getattr(obj, name)
+    return display
+
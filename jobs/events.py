@@ -0,0 +1,193 @@
+"""Append-only log of user interactions, written in batches off the request path.
+
+Views, downloads, applications, endorsements and searches each append an
+``InteractionEvent``, the raw material for rollups, trending and
+recommendations. Writing that row inside the request would add an INSERT
+to every hit. ``record()`` instead puts the unsaved event on a bounded
+in-process queue and returns. A background writer thread takes events off
+the queue and saves them with ``bulk_create``: up to
+``EVENT_LOG_BATCH_SIZE`` rows (default 500) at a time, after waiting at most
+``EVENT_LOG_FLUSH_INTERVAL`` seconds (default 1) for a batch to fill.
+
+The queue holds ``EVENT_LOG_QUEUE_SIZE`` events (default 10,000). When the
+database falls behind and the queue is full, new events are dropped rather
+than slowing requests down, and counted. Batches the database rejects are
+counted as failed. ``stats()`` (and ``/api/events/stats/``) reports the
+counts since the process started. Events still queued when the process exits
+are written by an exit hook. With ``EVENT_LOG_BACKGROUND = False`` there is
+no thread: events are written by whoever calls ``flush()``, or once a full
+batch is queued.
+
+Each event carries ``month`` (``YYYYMM``), the partition key. The log is
+queried and archived a month at a time: ``archive_events`` writes each
+month older than ``--keep-months`` to a gzipped NDJSON file and deletes it
+from the table in one statement. On a database with declarative
+partitioning the table can be partitioned on ``month`` as it is.
+"""
+import atexit
+import gzip
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .models.events import InteractionEvent, month_of
+from .renderers import dumps
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = getattr(settings, 'EVENT_LOG_QUEUE_SIZE', 10000)
+
+BATCH_SIZE = getattr(settings, 'EVENT_LOG_BATCH_SIZE', 500)
+
+FLUSH_INTERVAL = getattr(settings, 'EVENT_LOG_FLUSH_INTERVAL', 1)
+
+BACKGROUND = getattr(settings, 'EVENT_LOG_BACKGROUND', True)
+
+ARCHIVE_DIR = getattr(
+    settings, 'EVENT_LOG_ARCHIVE_DIR', os.path.join(settings.BASE_DIR, 'archive', 'events')
+)
+
+# The columns written to archive files, in order
+ARCHIVE_FIELDS = ('id', 'kind', 'actor_id', 'object_type', 'object_id', 'query', 'created_at')
+
+_queue = queue.Queue(maxsize=QUEUE_SIZE)
+_counts = {'written': 0, 'dropped': 0, 'failed': 0}
+_counts_lock = threading.Lock()
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def _count(name, amount):
+    with _counts_lock:
+        _counts[name] += amount
+
+
+def actor_of(request):
+    user = getattr(request, 'user', None)
+    return user.pk if user is not None and user.is_authenticated else None
+
+
+def record(kind, object_type='', object_id=None, actor_id=None, query=''):
+    """Queue an event for the log; returns False when it was dropped"""
+    now = timezone.now()
+    event = InteractionEvent(
+        kind=kind, object_type=object_type, object_id=object_id, actor_id=actor_id,
+        query=query[:200], created_at=now, month=month_of(now),
+    )
+    try:
+        _queue.put_nowait(event)
+    except queue.Full:
+        _count('dropped', 1)
+        return False
+    if BACKGROUND:
+        _start_writer()
+    elif _queue.qsize() >= BATCH_SIZE:
+        flush()
+    return True
+
+
+def _take(limit, deadline=None):
+    """Up to ``limit`` queued events, waiting until ``deadline`` for more"""
+    batch = []
+    while len(batch) < limit:
+        try:
+            if deadline is None:
+                batch.append(_queue.get_nowait())
+            else:
+                batch.append(_queue.get(timeout=max(0, deadline - time.monotonic())))
+        except queue.Empty:
+            break
+    return batch
+
+
+def _write(batch):
+    try:
+        InteractionEvent.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+    except Exception:
+        _count('failed', len(batch))
+        logger.exception('Could not write %d interaction events', len(batch))
+        # Reconnect for the next batch in case the connection is broken
+        connection.close()
+    else:
+        _count('written', len(batch))
+
+
+def flush():
+    """Write every queued event now, in the calling thread; returns how many were taken"""
+    taken = 0
+    while True:
+        batch = _take(BATCH_SIZE)
+        if not batch:
+            return taken
+        _write(batch)
+        taken += len(batch)
+
+
+def _run():
+    while True:
+        first = _queue.get()
+        batch = [first] + _take(BATCH_SIZE - 1, time.monotonic() + FLUSH_INTERVAL)
+        _write(batch)
+
+
+def _start_writer():
+    global _writer
+    if _writer is not None and _writer.is_alive():
+        return
+    with _writer_lock:
+        # A forked worker inherits the queue but not the thread
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_run, name='event-log-writer', daemon=True)
+            _writer.start()
+
+
+atexit.register(flush)
+
+
+def stats():
+    """Events written, dropped and failed by this process, and how many are queued"""
+    with _counts_lock:
+        counts = dict(_counts)
+    counts['queued'] = _queue.qsize()
+    return counts
+
+
+def archive_month(month, directory=None):
+    """Move the events of ``month`` (``YYYYMM``) to a gzipped NDJSON file; returns (path, rows)"""
+    directory = directory or ARCHIVE_DIR
+    os.makedirs(directory, exist_ok=True)
+    events = InteractionEvent.objects.filter(month=month)
+    last_id = events.order_by('-pk').values_list('pk', flat=True).first()
+    if last_id is None:
+        return None, 0
+    path = os.path.join(directory, f'events-{month // 100:04d}-{month % 100:02d}-{last_id}.ndjson.gz')
+    partial = path + '.partial'
+    rows = 0
+    with gzip.open(partial, 'wb') as archive:
+        for values in events.filter(pk__lte=last_id).order_by('pk').values_list(
+            *ARCHIVE_FIELDS
+        ).iterator(chunk_size=BATCH_SIZE):
+            archive.write(dumps(dict(zip(ARCHIVE_FIELDS, values))) + b'\n')
+            rows += 1
+    os.replace(partial, path)
+    # Nothing references events, so this is a single DELETE; if it never
+    # runs, the next run rewrites the same file
+    events.filter(pk__lte=last_id).delete()
+    return path, rows
+
+
+def archivable_months(keep_months):
+    """The months with events that are more than ``keep_months`` months old"""
+    now = timezone.localtime()
+    index = now.year * 12 + now.month - 1 - keep_months
+    cutoff = (index // 12) * 100 + index % 12 + 1
+    return list(
+        InteractionEvent.objects.filter(month__lt=cutoff).order_by('month')
+        .values_list('month', flat=True).distinct()
+    )
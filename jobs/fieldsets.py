@@ -0,0 +1,255 @@
+"""Sparse fieldsets: ``?fields=`` / ``?omit=`` on the read API.
+
+``?fields=id,title,company.name`` keeps only the listed fields (dotted
+names reach into nested serializers) and ``?omit=summary,achievements``
+drops the listed ones. Serializers that mix in ``SparseFieldsMixin`` prune
+their fields on construction, and the queryset feeding them is narrowed
+with ``.only()`` to the columns the remaining fields read, so large text
+columns that are not asked for are never loaded.
+
+Most fields map to columns by their ``source``: ``get_degree_display``
+reads ``degree``, ``skill.name`` reads the ``skill`` foreign key plus, when
+the queryset joins ``skill``, the related ``name`` column. Fields
+whose source is a method (``SerializerMethodField`` and friends) declare
+the columns they read in ``Meta.field_sources``; while such a field is
+undeclared the queryset is left as it is, so a missing declaration costs
+speed, never correctness.
+"""
+import re
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+# Query parameters only shape responses to reads; a write keeps every field
+READ_METHODS = ('GET', 'HEAD')
+
+DISPLAY_RE = re.compile(r'^get_(\w+)_display$')
+
+
+def parse(value):
+    """Turn ``"id,company.name"`` into the tree ``{'id': {}, 'company': {'name': {}}}``"""
+    tree = {}
+    for name in (value or '').split(','):
+        name = name.strip()
+        if not name:
+            continue
+        node = tree
+        for part in name.split('.'):
+            node = node.setdefault(part, {})
+    return tree
+
+
+def _nested(field):
+    """The serializer inside ``field`` when it is a nested (list) serializer"""
+    if isinstance(field, serializers.ListSerializer):
+        field = field.child
+    return field if isinstance(field, serializers.Serializer) else None
+
+
+def _unknown(names, param, prefix):
+    return ValidationError({
+        param: f"Unknown field(s): {', '.join(prefix + name for name in sorted(names))}"
+    })
+
+
+def keep_fields(serializer, tree, param=FIELDS_PARAM, prefix=''):
+    """Drop the fields of ``serializer`` that ``tree`` does not list"""
+    fields = serializer.fields
+    unknown = set(tree) - set(fields)
+    if unknown:
+        raise _unknown(unknown, param, prefix)
+    for name in list(fields):
+        if name not in tree:
+            fields.pop(name)
+        elif tree[name]:
+            nested = _nested(fields[name])
+            if nested is None:
+                raise _unknown([f'{name}.{child}' for child in tree[name]], param, prefix)
+            keep_fields(nested, tree[name], param, f'{prefix}{name}.')
+
+
+def omit_fields(serializer, tree, param=OMIT_PARAM, prefix=''):
+    """Drop the fields of ``serializer`` that ``tree`` lists"""
+    fields = serializer.fields
+    unknown = set(tree) - set(fields)
+    if unknown:
+        raise _unknown(unknown, param, prefix)
+    for name, children in tree.items():
+        if not children:
+            fields.pop(name)
+            continue
+        nested = _nested(fields[name])
+        if nested is None:
+            raise _unknown([f'{name}.{child}' for child in children], param, prefix)
+        omit_fields(nested, children, param, f'{prefix}{name}.')
+
+
+def requested(request):
+    """Return the ``fields``/``omit`` serializer kwargs a request asks for"""
+    if request is None or request.method not in READ_METHODS:
+        return {}
+    params = getattr(request, 'query_params', request.GET)
+    return {
+        name: params[param] for name, param in (('fields', FIELDS_PARAM), ('omit', OMIT_PARAM))
+        if params.get(param)
+    }
+
+
+class SparseFieldsMixin:
+    """Serializer mixin taking ``fields=``/``omit=`` kwargs or query parameters.
+
+    Explicit kwargs win; otherwise the parameters of a GET/HEAD request in
+    the serializer context are used. Views that do not want the request in
+    the context (it turns file URLs absolute) pass ``**requested(request)``.
+    """
+
+    def __init__(self, *args, fields=None, omit=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is None and omit is None:
+            params = requested(self._context.get('request'))
+            fields, omit = params.get('fields'), params.get('omit')
+        if fields:
+            keep_fields(self, parse(fields) if isinstance(fields, str) else fields)
+        if omit:
+            omit_fields(self, parse(omit) if isinstance(omit, str) else omit)
+
+
+def _model_field(model, name):
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    # Reverse relations and many-to-many fields have no column here
+    return field if field.concrete and not field.many_to_many else False
+
+
+def _joined(select_related, name):
+    """The select_related subtree under ``name``, or None if it is not joined"""
+    if isinstance(select_related, dict):
+        return select_related.get(name)
+    return None
+
+
+def _concrete(model, prefix):
+    return [prefix + field.name for field in model._meta.concrete_fields]
+
+
+def _source_columns(field, model, select_related):
+    """The ``.only()`` paths one field reads, following joined relations"""
+    paths = []
+    prefix = ''
+    attrs = field.source_attrs
+    for position, attr in enumerate(attrs):
+        last = position == len(attrs) - 1
+        display = DISPLAY_RE.match(attr)
+        if display and last and _model_field(model, display.group(1)):
+            attr = display.group(1)
+        model_field = _model_field(model, attr)
+        if model_field is None:
+            if position == 0:
+                return None
+            # A method or property of a joined row needs all of that row
+            return paths + _concrete(model, prefix)
+        if model_field is False:
+            return paths
+        paths.append(prefix + attr)
+        joined = _joined(select_related, attr)
+        if not model_field.is_relation or joined is None:
+            return paths
+        related_model = model_field.related_model
+        if last:
+            nested = _nested(field)
+            related = columns(nested, related_model, joined) if nested is not None else None
+            if related is None:
+                related = _concrete(related_model, '') if nested is not None else [
+                    related_model._meta.pk.name
+                ]
+            return paths + [f'{prefix}{attr}__{path}' for path in related]
+        prefix = f'{prefix}{attr}__'
+        model = related_model
+        select_related = joined
+    return paths
+
+
+def columns(serializer, model, select_related=None):
+    """Return the ``.only()`` paths ``serializer``'s fields read, or None if unknown.
+
+    ``select_related`` is the queryset's select_related tree; fields reached
+    through a joined relation (dotted sources, nested serializers) add the
+    related columns they read under that relation's prefix.
+    """
+    declared = getattr(getattr(serializer, 'Meta', None), 'field_sources', {})
+    paths = {model._meta.pk.name}
+    for name, field in serializer.fields.items():
+        if name in declared:
+            paths.update(declared[name])
+            continue
+        if field.source == '*':
+            return None
+        read = _source_columns(field, model, select_related)
+        if read is None:
+            return None
+        paths.update(read)
+    return sorted(paths)
+
+
+def _relations(select_related, paths, prefix=''):
+    """The select_related lookups whose foreign keys are still loaded"""
+    for name, children in select_related.items():
+        path = prefix + name
+        if path in paths:
+            yield path
+            yield from _relations(children, paths, f'{path}__')
+
+
+def narrow(queryset, serializer, extra=()):
+    """Restrict ``queryset`` to the columns ``serializer`` (plus ``extra``) reads"""
+    select_related = queryset.query.select_related
+    if select_related is True:
+        return queryset
+    paths = columns(serializer, queryset.model, select_related)
+    if paths is None:
+        return queryset
+    if select_related:
+        # A deferred foreign key cannot be traversed by select_related, so
+        # join only the relations that are still read
+        relations = list(_relations(select_related, set(paths) | set(extra)))
+        queryset = queryset.select_related(None)
+        if relations:
+            queryset = queryset.select_related(*relations)
+    return queryset.only(*paths, *extra)
+
+
+def sparse_queryset(queryset, serializer_class, request, extra=()):
+    """Narrow ``queryset`` for ``serializer_class`` under the request's ``?fields=/?omit=``"""
+    params = requested(request)
+    if not params or not issubclass(serializer_class, SparseFieldsMixin):
+        return queryset
+    return narrow(queryset, serializer_class(**params), extra)
+
+
+class SparseFieldsViewSetMixin:
+    """ViewSet mixin narrowing the filtered queryset to the requested fields.
+
+    It hooks ``filter_queryset`` rather than ``get_queryset``, which the
+    viewsets override. The ordering columns are kept as well; keyset
+    pagination reads them off the last row to build the next cursor.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        paginator = self.paginator
+        if paginator is not None and hasattr(paginator, 'get_ordering'):
+            ordering = paginator.get_ordering(self.request, queryset, self)
+        else:
+            ordering = getattr(self, 'ordering', None) or ()
+        extra = [
+            name.lstrip('-').split('__')[0] for name in ordering
+            if isinstance(name, str) and name != '?'
+        ]
+        extra = [name for name in extra if name != 'pk' and _model_field(queryset.model, name)]
+        return sparse_queryset(queryset, self.get_serializer_class(), self.request, extra)
@@ -0,0 +1,25 @@
+from .filters import Near, location_q
+from .gazetteer import (
+    Gazetteer,
+    Place,
+    display_location,
+    get_gazetteer,
+    get_place,
+    resolve,
+    resolve_many,
+)
+from .grid import SpatialGrid, distance_km
+
+__all__ = [
+    'Near',
+    'location_q',
+    'Gazetteer',
+    'Place',
+    'display_location',
+    'get_gazetteer',
+    'get_place',
+    'resolve',
+    'resolve_many',
+    'SpatialGrid',
+    'distance_km',
+]
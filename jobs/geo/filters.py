@@ -0,0 +1,81 @@
+"""Location filters for the job listing.
+
+``location_q`` is the database half of the ``?location=`` filter; the facet
+index applies the same rule in memory, so counts and pages agree. ``Near``
+is the ``?near=&radius=`` radius filter, answered from the gazetteer grid.
+"""
+import re
+
+from django.conf import settings
+from django.db.models import Q
+
+from .gazetteer import get_gazetteer
+
+DEFAULT_RADIUS_KM = getattr(settings, 'GEO_DEFAULT_RADIUS_KM', 50)
+MAX_RADIUS_KM = getattr(settings, 'GEO_MAX_RADIUS_KM', 1000)
+
+POINT_RE = re.compile(r'^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$')
+
+
+def location_q(text):
+    """Match jobs at the place ``text`` names, else by substring.
+
+    An unresolved substring also matches resolved jobs whose canonical
+    label contains it, mirroring the facet index, which sees labels.
+    """
+    gazetteer = get_gazetteer()
+    place = gazetteer.resolve(text)
+    if place is not None:
+        return Q(place_id=place.id)
+    needle = text.strip()
+    place_ids = [
+        candidate.id for candidate in gazetteer.places.values()
+        if needle.lower() in candidate.label.lower()
+    ]
+    return Q(place_id='', location__icontains=needle) | Q(place_id__in=place_ids)
+
+
+class Near:
+    """A ``within radius_km of a point`` filter"""
+
+    __slots__ = ('latitude', 'longitude', 'radius_km', 'place')
+
+    def __init__(self, latitude, longitude, radius_km=DEFAULT_RADIUS_KM, place=None):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.radius_km = radius_km
+        self.place = place
+
+    @classmethod
+    def from_params(cls, params):
+        """Build from ``near`` (a place or "lat,lon") and ``radius`` (km).
+
+        Returns None without ``near``; raises ValueError for an unknown
+        place, bad coordinates or a bad radius.
+        """
+        near = (params.get('near') or '').strip()
+        if not near:
+            return None
+        try:
+            radius = float(params.get('radius') or DEFAULT_RADIUS_KM)
+        except ValueError:
+            raise ValueError(f"Invalid radius: {params.get('radius')!r}")
+        if not 0 <= radius <= MAX_RADIUS_KM:
+            raise ValueError(f'Radius must be between 0 and {MAX_RADIUS_KM} km')
+        point = POINT_RE.match(near)
+        if point:
+            latitude, longitude = float(point.group(1)), float(point.group(2))
+            if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+                raise ValueError(f'Invalid coordinates: {near!r}')
+            return cls(latitude, longitude, radius)
+        place = get_gazetteer().resolve(near)
+        if place is None:
+            raise ValueError(f'Unknown place: {near!r}')
+        return cls(place.latitude, place.longitude, radius, place)
+
+    def key(self):
+        return (round(self.latitude, 5), round(self.longitude, 5), self.radius_km)
+
+    def places(self):
+        """Return ``[(place, distance_km)]`` inside the radius, nearest first"""
+        return get_gazetteer().within(self.latitude, self.longitude, self.radius_km)
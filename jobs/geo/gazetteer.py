@@ -0,0 +1,227 @@
+"""Bundled offline gazetteer: free-text location -> canonical place.
+
+``data/gazetteer.tsv`` lists places with a stable id, admin area, country,
+coordinates, population and aliases ("SF", "NYC", "Bengaluru", ...). Input
+is matched accent- and case-insensitively on its first comma-separated part
+(the place name or an alias); any further parts must name the place's admin
+area or country ("Portland, ME", "London, UK"). When a name is still
+ambiguous the most populous place wins. Anything unrecognised ("Remote",
+"Anywhere in EMEA") resolves to None and stays free text.
+"""
+import csv
+import re
+import threading
+from pathlib import Path
+
+from jobs.search.autocomplete import normalize
+
+from .grid import SpatialGrid
+
+DATA_FILE = Path(__file__).resolve().parent / 'data' / 'gazetteer.tsv'
+
+# Extra spellings of the bundled countries, beyond their code and name
+COUNTRY_ALIASES = {
+    'US': ['USA', 'U.S.', 'U.S.A.', 'United States of America', 'America'],
+    'GB': ['UK', 'U.K.', 'Great Britain', 'Britain'],
+    'AE': ['UAE'],
+    'NL': ['Holland', 'The Netherlands'],
+    'KR': ['Korea', 'Republic of Korea'],
+    'CZ': ['Czech Republic'],
+    'CN': ["People's Republic of China", 'PRC'],
+}
+
+# Countries whose places are conventionally written "City, ST"
+ADMIN_LABEL_COUNTRIES = ('US',)
+
+PARENTHETICAL_RE = re.compile(r'\([^)]*\)')
+LIST_SEPARATOR_RE = re.compile(r'[;|/\n]+')
+
+
+def _key(text):
+    return ' '.join(normalize(text))
+
+
+class Place:
+    """One gazetteer entry"""
+
+    __slots__ = (
+        'id', 'name', 'admin_code', 'admin_name', 'country_code', 'country_name',
+        'latitude', 'longitude', 'population', 'aliases', 'qualifiers',
+    )
+
+    def __init__(self, id, name, admin_code, admin_name, country_code, country_name,
+                 latitude, longitude, population, aliases=()):
+        self.id = id
+        self.name = name
+        self.admin_code = admin_code
+        self.admin_name = admin_name
+        self.country_code = country_code
+        self.country_name = country_name
+        self.latitude = latitude
+        self.longitude = longitude
+        self.population = population
+        self.aliases = tuple(aliases)
+        qualifiers = [admin_code, admin_name, country_code, country_name]
+        qualifiers += COUNTRY_ALIASES.get(country_code, [])
+        self.qualifiers = {_key(text) for text in qualifiers if text}
+
+    def __repr__(self):
+        return f'<Place {self.id}>'
+
+    @property
+    def label(self):
+        """Canonical display form, unique per place"""
+        if self.country_code in ADMIN_LABEL_COUNTRIES:
+            return f'{self.name}, {self.admin_code}'
+        return f'{self.name}, {self.country_name}'
+
+    def qualifies(self, text):
+        """Whether ``text`` (normalized) names this place's admin area/country"""
+        if text in self.qualifiers:
+            return True
+        # "ca usa", "new south wales australia"
+        words = text.split()
+        return any(
+            ' '.join(words[:split]) in self.qualifiers and ' '.join(words[split:]) in self.qualifiers
+            for split in range(1, len(words))
+        )
+
+    def as_dict(self):
+        return {
+            'id': self.id,
+            'label': self.label,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+        }
+
+
+class Gazetteer:
+    """Name/alias lookup plus a spatial grid over a set of places"""
+
+    def __init__(self, places=()):
+        self.places = {}
+        self._names = {}
+        self._grid = SpatialGrid()
+        for place in places:
+            self.add(place)
+
+    def __len__(self):
+        return len(self.places)
+
+    def add(self, place):
+        self.places[place.id] = place
+        for text in (place.name, place.label) + place.aliases:
+            candidates = self._names.setdefault(_key(text), [])
+            if place not in candidates:
+                candidates.append(place)
+        self._grid.add(place.id, place.latitude, place.longitude)
+
+    def get(self, place_id):
+        return self.places.get(place_id)
+
+    def resolve(self, text):
+        """Return the Place ``text`` refers to, or None"""
+        parts = [_key(part) for part in PARENTHETICAL_RE.sub(' ', text or '').split(',')]
+        parts = [part for part in parts if part]
+        if not parts:
+            return None
+        whole = self._names.get(' '.join(parts))
+        if whole:
+            return max(whole, key=lambda place: place.population)
+
+        name, qualifiers = parts[0], parts[1:]
+        if name not in self._names and not qualifiers:
+            # "San Francisco CA": longest leading run of words that is a name
+            words = name.split()
+            for split in range(len(words) - 1, 0, -1):
+                head = ' '.join(words[:split])
+                if head in self._names:
+                    name, qualifiers = head, [' '.join(words[split:])]
+                    break
+        candidates = [
+            place for place in self._names.get(name, ())
+            if all(place.qualifies(qualifier) for qualifier in qualifiers)
+        ]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda place: place.population)
+
+    def resolve_many(self, text):
+        """Resolve a list of locations ("SF, CA; Austin" or "Paris, Berlin").
+
+        Entries are split on ``; | / newline``. Within an entry, commas
+        either qualify a name ("Portland, ME") or separate names ("Paris,
+        Berlin"), so runs of up to three comma parts are tried longest first.
+        Unresolvable parts are skipped; duplicates are dropped.
+        """
+        places = []
+        for chunk in LIST_SEPARATOR_RE.split(text or ''):
+            parts = [part for part in chunk.split(',') if part.strip()]
+            start = 0
+            while start < len(parts):
+                for end in range(min(len(parts), start + 3), start, -1):
+                    place = self.resolve(','.join(parts[start:end]))
+                    if place is not None:
+                        if place not in places:
+                            places.append(place)
+                        start = end
+                        break
+                else:
+                    start += 1
+        return places
+
+    def within(self, latitude, longitude, radius_km):
+        """Return ``[(place, distance_km)]`` within the radius, nearest first"""
+        return [
+            (self.places[place_id], distance)
+            for place_id, distance in self._grid.within(latitude, longitude, radius_km)
+        ]
+
+
+def load(path=DATA_FILE):
+    """Read a gazetteer TSV file"""
+    with open(path, encoding='utf-8', newline='') as handle:
+        rows = csv.DictReader(
+            (line for line in handle if not line.startswith('#')), delimiter='\t'
+        )
+        return Gazetteer(
+            Place(
+                row['id'], row['name'], row['admin_code'], row['admin_name'],
+                row['country_code'], row['country_name'],
+                float(row['latitude']), float(row['longitude']), int(row['population']),
+                [alias for alias in (row['aliases'] or '').split('|') if alias],
+            )
+            for row in rows
+        )
+
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer():
+    """Return the bundled gazetteer, loading it on first use"""
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                _gazetteer = load()
+    return _gazetteer
+
+
+def resolve(text):
+    return get_gazetteer().resolve(text)
+
+
+def resolve_many(text):
+    return get_gazetteer().resolve_many(text)
+
+
+def get_place(place_id):
+    return get_gazetteer().get(place_id) if place_id else None
+
+
+def display_location(location, place_id=''):
+    """The canonical label of a resolved location, else the raw text"""
+    place = get_place(place_id)
+    return place.label if place is not None else (location or '').strip()
@@ -0,0 +1,86 @@
+"""Fixed-size lat/lon grid for "within N km" lookups.
+
+Points are bucketed into ``cell_degrees`` squares. A radius query visits
+only the cells overlapping the circle's bounding box, measures the exact
+great-circle distance to the points found there, and returns them nearest
+first.
+"""
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    """Great-circle (haversine) distance between two points, in km"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class SpatialGrid:
+    """Points keyed by any hashable, bucketed on a lat/lon grid"""
+
+    def __init__(self, cell_degrees=1.0):
+        self.cell_degrees = cell_degrees
+        self._columns = int(math.ceil(360 / cell_degrees))
+        self._cells = {}
+        self._points = {}
+
+    def __len__(self):
+        return len(self._points)
+
+    def _cell(self, lat, lon):
+        row = int(math.floor((lat + 90) / self.cell_degrees))
+        column = int(math.floor((lon + 180) / self.cell_degrees)) % self._columns
+        return row, column
+
+    def add(self, key, lat, lon):
+        self.remove(key)
+        self._points[key] = (lat, lon)
+        self._cells.setdefault(self._cell(lat, lon), set()).add(key)
+
+    def remove(self, key):
+        point = self._points.pop(key, None)
+        if point is None:
+            return
+        cell = self._cell(*point)
+        keys = self._cells[cell]
+        keys.discard(key)
+        if not keys:
+            del self._cells[cell]
+
+    def _cells_near(self, lat, lon, radius_km):
+        size = self.cell_degrees
+        dlat = radius_km / KM_PER_DEGREE
+        rows = range(
+            max(0, int(math.floor((lat - dlat + 90) / size))),
+            int(math.floor((min(lat + dlat, 90) + 90) / size)) + 1,
+        )
+        # Longitude degrees shrink towards the poles; near one, take every column
+        cos_lat = math.cos(math.radians(min(abs(lat) + dlat, 90)))
+        if cos_lat < 1e-6 or radius_km / (KM_PER_DEGREE * cos_lat) >= 180:
+            columns = range(self._columns)
+        else:
+            dlon = radius_km / (KM_PER_DEGREE * cos_lat)
+            first = int(math.floor((lon - dlon + 180) / size))
+            last = int(math.floor((lon + dlon + 180) / size))
+            columns = sorted({column % self._columns for column in range(first, last + 1)})
+        for row in rows:
+            for column in columns:
+                keys = self._cells.get((row, column))
+                if keys:
+                    yield keys
+
+    def within(self, lat, lon, radius_km):
+        """Return ``[(key, distance_km)]`` within ``radius_km``, nearest first"""
+        found = []
+        for keys in self._cells_near(lat, lon, radius_km):
+            for key in keys:
+                distance = distance_km(lat, lon, *self._points[key])
+                if distance <= radius_km:
+                    found.append((key, distance))
+        found.sort(key=lambda item: (item[1], item[0]))
+        return found
@@ -0,0 +1,76 @@
+"""Write-time location normalization for Job, Company, Register and UserDetails.
+
+``normalize_instance`` fills an instance's place fields from its free-text
+location; the pre_save signal handlers call it on every save, and
+``normalize_model`` backfills whole tables (the migration and the
+``normalize_locations`` command). Both work on historical models too, so
+they key off the model name rather than the class.
+"""
+from .gazetteer import get_gazetteer
+
+BATCH_SIZE = 2000
+
+PLACE_FIELDS = ('place_id', 'latitude', 'longitude')
+
+
+def _register_location(register):
+    return ', '.join(part for part in (register.city, register.state, register.country) if part)
+
+
+# model name -> (source fields, function building the text to resolve)
+SOURCES = {
+    'job': (('location',), lambda job: job.location),
+    'company': (('location',), lambda company: company.location),
+    'register': (('city', 'state', 'country'), _register_location),
+}
+
+
+def normalize_instance(instance, update_fields=None):
+    """Resolve ``instance``'s location into its place fields.
+
+    Returns the names of the fields that changed. With ``update_fields``
+    (as passed to save()) nothing happens unless a source field is in it.
+    """
+    model_name = instance._meta.model_name
+    gazetteer = get_gazetteer()
+    if model_name == 'userdetails':
+        if update_fields is not None and 'preferred_locations' not in update_fields:
+            return []
+        place_ids = [place.id for place in gazetteer.resolve_many(instance.preferred_locations)]
+        if place_ids == instance.preferred_place_ids:
+            return []
+        instance.preferred_place_ids = place_ids
+        return ['preferred_place_ids']
+
+    sources, text = SOURCES[model_name]
+    if update_fields is not None and not set(sources) & set(update_fields):
+        return []
+    place = gazetteer.resolve(text(instance))
+    values = (place.id, place.latitude, place.longitude) if place else ('', None, None)
+    changed = []
+    for field, value in zip(PLACE_FIELDS, values):
+        if getattr(instance, field) != value:
+            setattr(instance, field, value)
+            changed.append(field)
+    return changed
+
+
+def normalize_model(model, batch_size=BATCH_SIZE):
+    """Re-resolve every row of ``model``; returns how many rows changed"""
+    if model._meta.model_name == 'userdetails':
+        fields = ['preferred_place_ids']
+    else:
+        fields = list(PLACE_FIELDS)
+    updated = 0
+    pending = []
+    for instance in model._default_manager.order_by('pk').iterator(chunk_size=batch_size):
+        if normalize_instance(instance):
+            pending.append(instance)
+        if len(pending) >= batch_size:
+            model._default_manager.bulk_update(pending, fields)
+            updated += len(pending)
+            pending = []
+    if pending:
+        model._default_manager.bulk_update(pending, fields)
+        updated += len(pending)
+    return updated
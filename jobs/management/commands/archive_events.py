@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from jobs import events
+
+
+class Command(BaseCommand):
+    help = "Move interaction events of past months to gzipped NDJSON files"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep-months', type=int, default=3,
+            help="Number of whole months kept in the table besides the current one",
+        )
+        parser.add_argument(
+            '--dir', default=None,
+            help="Directory for the archive files (default: EVENT_LOG_ARCHIVE_DIR)",
+        )
+
+    def handle(self, *args, **options):
+        events.flush()
+        total = 0
+        for month in events.archivable_months(options['keep_months']):
+            path, rows = events.archive_month(month, options['dir'])
+            if path:
+                self.stdout.write(f"{month}: {rows} events -> {path}")
+                total += rows
+        self.stdout.write(self.style.SUCCESS(f"Archived {total} events"))
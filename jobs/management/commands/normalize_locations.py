@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from jobs.geo.normalize import normalize_model
+from jobs.models import Company, Job, Register, UserDetails
+
+
+class Command(BaseCommand):
+    help = "Re-resolve stored locations against the bundled gazetteer (run after editing it)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help="Number of rows written per batch",
+        )
+
+    def handle(self, *args, **options):
+        for model in (Job, Company, Register, UserDetails):
+            updated = normalize_model(model, batch_size=options['batch_size'])
+            self.stdout.write(f"{model._meta.verbose_name_plural}: {updated} updated")
+        self.stdout.write(self.style.SUCCESS(
+            "Done; restart the app servers so their in-memory indexes pick up the changes"
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from jobs.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the job full-text search index from scratch"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help="Number of jobs written per batch",
+        )
+
+    def handle(self, *args, **options):
+        indexed = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} jobs"))
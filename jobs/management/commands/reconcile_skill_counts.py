@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from jobs import skillcounts
+
+
+class Command(BaseCommand):
+    help = "Recompute Skill.usage_count and Skills.endorsement_count where they drifted"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help="Number of counted rows checked per UPDATE",
+        )
+
+    def handle(self, *args, **options):
+        for field in skillcounts.COUNTS:
+            fixed = skillcounts.reconcile(field, chunk_size=options['chunk_size'])
+            self.stdout.write(f"{field}: {fixed} rows fixed")
+        self.stdout.write(self.style.SUCCESS("Done"))
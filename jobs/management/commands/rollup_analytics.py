@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from jobs import rollups
+
+
+class Command(BaseCommand):
+    help = "Roll new applications and changed hours up into the analytics tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=5000,
+            help="Number of applications read per transaction",
+        )
+
+    def handle(self, *args, **options):
+        applications, days, pruned = rollups.run(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rolled up {applications} applications and {days} daily rows; "
+            f"pruned {pruned} hourly rows"
+        ))
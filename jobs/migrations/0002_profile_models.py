@@ -0,0 +1,237 @@
+# Generated by Django 5.2.4 on 2026-10-18 19:35
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillCategory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('description', models.TextField(blank=True)),
+                ('icon', models.CharField(blank=True, help_text='CSS class or icon name', max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Skill Category',
+                'verbose_name_plural': 'Skill Categories',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Education',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('institution', models.CharField(max_length=200)),
+                ('degree', models.CharField(choices=[('high_school', 'High School'), ('associate', 'Associate Degree'), ('bachelor', "Bachelor's Degree"), ('master', "Master's Degree"), ('phd', 'PhD'), ('certificate', 'Certificate'), ('diploma', 'Diploma')], max_length=20)),
+                ('field_of_study', models.CharField(max_length=200)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('is_current', models.BooleanField(default=False)),
+                ('grade', models.CharField(blank=True, max_length=50)),
+                ('description', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='education', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Education',
+                'verbose_name_plural': 'Education',
+                'ordering': ['-end_date', '-start_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Experience',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_title', models.CharField(max_length=200)),
+                ('company', models.CharField(max_length=200)),
+                ('location', models.CharField(blank=True, max_length=200)),
+                ('employment_type', models.CharField(choices=[('full_time', 'Full-time'), ('part_time', 'Part-time'), ('contract', 'Contract'), ('internship', 'Internship'), ('freelance', 'Freelance'), ('volunteer', 'Volunteer')], max_length=20)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('is_current', models.BooleanField(default=False)),
+                ('description', models.TextField()),
+                ('skills_used', models.TextField(blank=True, help_text='Comma-separated list of skills')),
+                ('achievements', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='experiences', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Work Experience',
+                'verbose_name_plural': 'Work Experiences',
+                'ordering': ['-end_date', '-start_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Register',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phone_number', models.CharField(blank=True, max_length=17, validators=[django.core.validators.RegexValidator(message="Phone number must be entered in the format: '+999999999'. Up to 15 digits allowed.", regex='^\\+?1?\\d{9,15}$')])),
+                ('date_of_birth', models.DateField(blank=True, null=True)),
+                ('gender', models.CharField(blank=True, choices=[('male', 'Male'), ('female', 'Female'), ('other', 'Other'), ('prefer_not_to_say', 'Prefer not to say')], max_length=20)),
+                ('address', models.TextField(blank=True)),
+                ('city', models.CharField(blank=True, max_length=100)),
+                ('state', models.CharField(blank=True, max_length=100)),
+                ('country', models.CharField(blank=True, max_length=100)),
+                ('postal_code', models.CharField(blank=True, max_length=20)),
+                ('profile_picture', models.ImageField(blank=True, null=True, upload_to='profile_pictures/')),
+                ('bio', models.TextField(blank=True, max_length=500)),
+                ('website', models.URLField(blank=True)),
+                ('linkedin_url', models.URLField(blank=True)),
+                ('github_url', models.URLField(blank=True)),
+                ('twitter_url', models.URLField(blank=True)),
+                ('is_profile_complete', models.BooleanField(default=False)),
+                ('email_verified', models.BooleanField(default=False)),
+                ('phone_verified', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='registration_profile', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'User Registration',
+                'verbose_name_plural': 'User Registrations',
+            },
+        ),
+        migrations.CreateModel(
+            name='Resume',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(help_text='Resume title or version name', max_length=200)),
+                ('file', models.FileField(help_text='Upload PDF, DOC, or DOCX files only', upload_to='resumes/', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['pdf', 'doc', 'docx'])])),
+                ('status', models.CharField(choices=[('draft', 'Draft'), ('active', 'Active'), ('archived', 'Archived')], default='draft', max_length=20)),
+                ('is_primary', models.BooleanField(default=False, help_text='Mark as primary resume')),
+                ('file_size', models.PositiveIntegerField(blank=True, help_text='File size in bytes', null=True)),
+                ('file_type', models.CharField(blank=True, max_length=10)),
+                ('description', models.TextField(blank=True, help_text='Description or notes about this resume')),
+                ('parsed_skills', models.TextField(blank=True, help_text='Comma-separated skills extracted from resume')),
+                ('parsed_experience_years', models.PositiveIntegerField(blank=True, null=True)),
+                ('parsed_education_level', models.CharField(blank=True, max_length=100)),
+                ('download_count', models.PositiveIntegerField(default=0)),
+                ('last_downloaded', models.DateTimeField(blank=True, null=True)),
+                ('applications_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumes', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Resume',
+                'verbose_name_plural': 'Resumes',
+                'ordering': ['-is_primary', '-updated_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('description', models.TextField(blank=True)),
+                ('is_trending', models.BooleanField(default=False)),
+                ('usage_count', models.PositiveIntegerField(default=0, help_text='Number of users with this skill')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='skills', to='jobs.skillcategory')),
+            ],
+            options={
+                'verbose_name': 'Skill',
+                'verbose_name_plural': 'Skills',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Skills',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('proficiency_level', models.CharField(choices=[('beginner', 'Beginner'), ('intermediate', 'Intermediate'), ('advanced', 'Advanced'), ('expert', 'Expert')], max_length=20)),
+                ('years_of_experience', models.PositiveIntegerField(blank=True, null=True)),
+                ('verification_status', models.CharField(choices=[('unverified', 'Unverified'), ('self_assessed', 'Self Assessed'), ('certified', 'Certified'), ('endorsed', 'Endorsed')], default='unverified', max_length=20)),
+                ('description', models.TextField(blank=True, help_text='Describe your experience with this skill')),
+                ('projects_used_in', models.TextField(blank=True, help_text='Projects where this skill was used')),
+                ('certifications', models.TextField(blank=True, help_text='Related certifications')),
+                ('endorsement_count', models.PositiveIntegerField(default=0)),
+                ('last_used', models.DateField(blank=True, null=True)),
+                ('is_featured', models.BooleanField(default=False, help_text='Show prominently on profile')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_skills', to='jobs.skill')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_skills', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'User Skill',
+                'verbose_name_plural': 'User Skills',
+                'ordering': ['-is_featured', '-proficiency_level', 'skill__name'],
+                'unique_together': {('user', 'skill')},
+            },
+        ),
+        migrations.CreateModel(
+            name='UserDetails',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('current_job_title', models.CharField(blank=True, max_length=200)),
+                ('current_company', models.CharField(blank=True, max_length=200)),
+                ('industry', models.CharField(blank=True, max_length=100)),
+                ('years_of_experience', models.PositiveIntegerField(blank=True, null=True)),
+                ('desired_job_title', models.CharField(blank=True, max_length=200)),
+                ('desired_industry', models.CharField(blank=True, max_length=100)),
+                ('work_preference', models.CharField(blank=True, choices=[('remote', 'Remote only'), ('hybrid', 'Hybrid'), ('onsite', 'On-site only'), ('flexible', 'Flexible')], max_length=20)),
+                ('employment_type_preference', models.CharField(blank=True, choices=[('full_time', 'Full-time'), ('part_time', 'Part-time'), ('contract', 'Contract'), ('freelance', 'Freelance'), ('internship', 'Internship')], max_length=20)),
+                ('availability', models.CharField(blank=True, choices=[('immediately', 'Immediately'), ('2_weeks', 'Within 2 weeks'), ('1_month', 'Within 1 month'), ('2_months', 'Within 2 months'), ('3_months', 'Within 3 months'), ('not_looking', 'Not actively looking')], max_length=20)),
+                ('expected_salary_min', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('expected_salary_max', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('salary_currency', models.CharField(default='USD', max_length=3)),
+                ('salary_period', models.CharField(choices=[('hourly', 'Per Hour'), ('monthly', 'Per Month'), ('yearly', 'Per Year')], default='yearly', max_length=20)),
+                ('preferred_locations', models.TextField(blank=True, help_text='Comma-separated list of preferred work locations')),
+                ('willing_to_relocate', models.BooleanField(default=False)),
+                ('summary', models.TextField(blank=True, help_text='Professional summary', max_length=1000)),
+                ('career_objectives', models.TextField(blank=True, help_text='Career goals and objectives')),
+                ('achievements', models.TextField(blank=True, help_text='Key achievements and accomplishments')),
+                ('languages', models.TextField(blank=True, help_text='Languages spoken (comma-separated)')),
+                ('profile_visibility', models.CharField(choices=[('public', 'Public'), ('private', 'Private'), ('recruiters_only', 'Recruiters Only')], default='public', max_length=20)),
+                ('allow_recruiter_contact', models.BooleanField(default=True)),
+                ('show_salary_expectations', models.BooleanField(default=False)),
+                ('email_job_alerts', models.BooleanField(default=True)),
+                ('email_application_updates', models.BooleanField(default=True)),
+                ('email_marketing', models.BooleanField(default=False)),
+                ('sms_notifications', models.BooleanField(default=False)),
+                ('profile_completion_percentage', models.PositiveIntegerField(default=0, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('last_profile_update', models.DateTimeField(auto_now=True)),
+                ('last_login', models.DateTimeField(blank=True, null=True)),
+                ('job_search_activity_score', models.PositiveIntegerField(default=0)),
+                ('profile_views_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='details', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'User Details',
+                'verbose_name_plural': 'User Details',
+            },
+        ),
+        migrations.CreateModel(
+            name='SkillEndorsement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message', models.TextField(blank=True, max_length=500)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('endorsed_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='given_endorsements', to=settings.AUTH_USER_MODEL)),
+                ('user_skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='endorsements', to='jobs.skills')),
+            ],
+            options={
+                'verbose_name': 'Skill Endorsement',
+                'verbose_name_plural': 'Skill Endorsements',
+                'ordering': ['-created_at'],
+                'unique_together': {('user_skill', 'endorsed_by')},
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+def create_search_table(apps, schema_editor):
+    from jobs.search.backends import BACKENDS
+    backend = BACKENDS.get(schema_editor.connection.vendor)
+    if backend is None:
+        return
+    with schema_editor.connection.cursor() as cursor:
+        backend = backend()
+        backend.create_table(cursor)
+        Job = apps.get_model('jobs', 'Job')
+        rows = [
+            (job.pk, job.title, job.description, job.requirements, job.company.name)
+            for job in Job.objects.select_related('company').iterator()
+        ]
+        backend.upsert(cursor, rows)
+
+
+def drop_search_table(apps, schema_editor):
+    from jobs.search.backends import BACKENDS
+    backend = BACKENDS.get(schema_editor.connection.vendor)
+    if backend is None:
+        return
+    with schema_editor.connection.cursor() as cursor:
+        backend().drop_table(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_profile_models'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-18 19:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_job_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['is_active', '-created_at', '-id'], name='job_active_recent_idx'),
+        ),
+    ]
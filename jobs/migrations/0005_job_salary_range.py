@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-18 19:57
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_job_active_recent_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='salary_high',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Coalesce('salary_max', 'salary_min'), output_field=models.DecimalField(decimal_places=2, max_digits=10, null=True)),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='salary_low',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Coalesce('salary_min', 'salary_max'), output_field=models.DecimalField(decimal_places=2, max_digits=10, null=True)),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['is_active', 'salary_low', 'salary_high', '-created_at'], name='job_salary_low_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['is_active', 'salary_high', 'salary_low', '-created_at'], name='job_salary_high_idx'),
+        ),
+    ]
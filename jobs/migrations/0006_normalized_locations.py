@@ -0,0 +1,70 @@
+# Generated by Django 5.2.4 on 2026-10-18 20:06
+
+from django.db import migrations, models
+
+
+def resolve_locations(apps, schema_editor):
+    from jobs.geo.normalize import normalize_model
+    for name in ('Job', 'Company', 'Register', 'UserDetails'):
+        normalize_model(apps.get_model('jobs', name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_job_salary_range'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='place_id',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='place_id',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='register',
+            name='latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='register',
+            name='longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='register',
+            name='place_id',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='userdetails',
+            name='preferred_place_ids',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.RunPython(resolve_locations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.4 on 2026-10-18 20:18
+
+from django.db import migrations, models
+
+# Common abbreviations in job titles and descriptions; editable in the admin
+SEED_SYNONYMS = [
+    ('AI', 'artificial intelligence'),
+    ('ML', 'machine learning'),
+    ('NLP', 'natural language processing'),
+    ('CV', 'computer vision'),
+    ('DL', 'deep learning'),
+    ('JS', 'javascript'),
+    ('TS', 'typescript'),
+    ('K8s', 'kubernetes'),
+    ('AWS', 'amazon web services'),
+    ('GCP', 'google cloud platform, google cloud'),
+    ('SRE', 'site reliability engineering, site reliability engineer'),
+    ('QA', 'quality assurance'),
+    ('UX', 'user experience'),
+    ('UI', 'user interface'),
+    ('PM', 'product manager, project manager'),
+    ('HR', 'human resources'),
+    ('SWE', 'software engineer'),
+    ('SDE', 'software development engineer'),
+    ('DB', 'database'),
+    ('DBA', 'database administrator'),
+    ('CI/CD', 'continuous integration, continuous delivery, cicd'),
+    ('Sr', 'senior'),
+    ('Jr', 'junior'),
+    ('Mgr', 'manager'),
+    ('Frontend', 'front end, front-end'),
+    ('Backend', 'back end, back-end'),
+    ('Fullstack', 'full stack, full-stack'),
+    ('Golang', 'go'),
+    ('Postgres', 'postgresql'),
+]
+
+
+def seed_synonyms(apps, schema_editor):
+    SearchSynonym = apps.get_model('jobs', 'SearchSynonym')
+    SearchSynonym.objects.bulk_create(
+        [SearchSynonym(term=term, synonyms=synonyms) for term, synonyms in SEED_SYNONYMS],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_normalized_locations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchSynonym',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(help_text='Word, phrase or acronym, e.g. ML', max_length=100, unique=True)),
+                ('synonyms', models.TextField(help_text='Comma-separated equivalents, e.g. machine learning, deep learning')),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Search Synonym',
+                'verbose_name_plural': 'Search Synonyms',
+                'ordering': ['term'],
+            },
+        ),
+        migrations.RunPython(seed_synonyms, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 20:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_search_synonyms'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
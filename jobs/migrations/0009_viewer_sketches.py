@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 20:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_company_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ViewerSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('profile', 'Profile'), ('job', 'Job')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField(help_text='UserDetails id for profiles, Job id for jobs')),
+                ('day', models.DateField()),
+                ('registers', models.BinaryField(help_text='Encoded sketch, see jobs/sketches.py')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Viewer Sketch',
+                'verbose_name_plural': 'Viewer Sketches',
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id', 'day'), name='viewer_sketch_unique_day')],
+            },
+        ),
+    ]
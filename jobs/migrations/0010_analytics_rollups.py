@@ -0,0 +1,56 @@
+# Generated by Django 5.2.4 on 2026-10-18 20:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_viewer_sketches'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_id', models.PositiveBigIntegerField(default=0, help_text='Last source row rolled up')),
+                ('last_time', models.DateTimeField(blank=True, help_text='Start of the last run', null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(choices=[('profile_view', 'Profile view'), ('resume_download', 'Resume download'), ('job_view', 'Job view'), ('application', 'Job application')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField(help_text='UserDetails, Resume or Job id, by metric')),
+                ('day', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Daily Rollup',
+                'verbose_name_plural': 'Daily Rollups',
+                'constraints': [models.UniqueConstraint(fields=('metric', 'object_id', 'day'), name='daily_rollup_unique_bucket')],
+            },
+        ),
+        migrations.CreateModel(
+            name='HourlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(choices=[('profile_view', 'Profile view'), ('resume_download', 'Resume download'), ('job_view', 'Job view'), ('application', 'Job application')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField(help_text='UserDetails, Resume or Job id, by metric')),
+                ('hour', models.DateTimeField(help_text='Start of the hour')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Hourly Rollup',
+                'verbose_name_plural': 'Hourly Rollups',
+                'indexes': [models.Index(fields=['updated_at'], name='hourly_rollup_updated'), models.Index(fields=['hour'], name='hourly_rollup_hour')],
+                'constraints': [models.UniqueConstraint(fields=('metric', 'object_id', 'hour'), name='hourly_rollup_unique_bucket')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-18 20:56
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0010_analytics_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InteractionEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('view', 'View'), ('download', 'Download'), ('apply', 'Apply'), ('endorse', 'Endorse'), ('search', 'Search')], max_length=10)),
+                ('actor_id', models.PositiveBigIntegerField(blank=True, help_text='User id, empty when anonymous', null=True)),
+                ('object_type', models.CharField(blank=True, choices=[('profile', 'Profile'), ('job', 'Job'), ('resume', 'Resume'), ('user_skill', 'User skill')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('query', models.CharField(blank=True, help_text='Search text, for search events', max_length=200)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('month', models.PositiveIntegerField(help_text='YYYYMM of created_at; the partition key')),
+            ],
+            options={
+                'verbose_name': 'Interaction Event',
+                'verbose_name_plural': 'Interaction Events',
+                'indexes': [models.Index(fields=['month', 'kind'], name='event_month_kind'), models.Index(fields=['object_type', 'object_id', 'created_at'], name='event_object')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-18 21:00
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_rows(apps, schema_editor):
+    # Nothing maintained these counts before; set them from the rows
+    for model, field, counted, link in (
+        ('Skill', 'usage_count', 'Skills', 'skill'),
+        ('Skills', 'endorsement_count', 'SkillEndorsement', 'user_skill'),
+    ):
+        model = apps.get_model('jobs', model)
+        rows = (
+            apps.get_model('jobs', counted).objects.filter(**{link: OuterRef('pk')})
+            .order_by().values(link).annotate(n=Count('pk')).values('n')
+        )
+        model.objects.update(**{field: Coalesce(Subquery(rows), 0)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0011_interaction_events'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['-usage_count', 'id'], name='skill_usage_count'),
+        ),
+        migrations.RunPython(count_rows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-18 21:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0012_skill_usage_count_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skillcategory',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -1,15 +1,35 @@
+from .company import Company
+from .job import Job, JobApplication
+from .userprofile import UserProfile
 from .education import Education
 from .experience import Experience
 from .register import Register
 from .resume import Resume
-from .skills import Skills
+from .skills import Skill, Skills, SkillCategory, SkillEndorsement
+from .searchsynonym import SearchSynonym
 from .userdetails import UserDetails
+from .viewersketch import ViewerSketch
+from .analytics import DailyRollup, HourlyRollup, RollupCheckpoint
+from .events import InteractionEvent
 
 __all__ = [
+    'Company',
+    'Job',
+    'JobApplication',
+    'UserProfile',
     'Education',
     'Experience', 
     'Register',
     'Resume',
+    'Skill',
     'Skills',
-    'UserDetails'
+    'SkillCategory',
+    'SkillEndorsement',
+    'SearchSynonym',
+    'UserDetails',
+    'ViewerSketch',
+    'HourlyRollup',
+    'DailyRollup',
+    'RollupCheckpoint',
+    'InteractionEvent'
 ]
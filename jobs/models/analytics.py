@@ -0,0 +1,61 @@
+from django.db import models
+
+METRIC_CHOICES = [
+    ('profile_view', 'Profile view'),
+    ('resume_download', 'Resume download'),
+    ('job_view', 'Job view'),
+    ('application', 'Job application'),
+]
+
+class HourlyRollup(models.Model):
+    """Number of events of one metric for one object in one hour"""
+    
+    metric = models.CharField(max_length=20, choices=METRIC_CHOICES)
+    object_id = models.PositiveBigIntegerField(help_text="UserDetails, Resume or Job id, by metric")
+    hour = models.DateTimeField(help_text="Start of the hour")
+    count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Hourly Rollup'
+        verbose_name_plural = 'Hourly Rollups'
+        constraints = [
+            models.UniqueConstraint(fields=['metric', 'object_id', 'hour'], name='hourly_rollup_unique_bucket'),
+        ]
+        indexes = [
+            models.Index(fields=['updated_at'], name='hourly_rollup_updated'),
+            models.Index(fields=['hour'], name='hourly_rollup_hour'),
+        ]
+    
+    def __str__(self):
+        return f"{self.metric} {self.object_id} at {self.hour}: {self.count}"
+
+class DailyRollup(models.Model):
+    """Number of events of one metric for one object on one day, summed from the hours"""
+    
+    metric = models.CharField(max_length=20, choices=METRIC_CHOICES)
+    object_id = models.PositiveBigIntegerField(help_text="UserDetails, Resume or Job id, by metric")
+    day = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Daily Rollup'
+        verbose_name_plural = 'Daily Rollups'
+        constraints = [
+            models.UniqueConstraint(fields=['metric', 'object_id', 'day'], name='daily_rollup_unique_bucket'),
+        ]
+    
+    def __str__(self):
+        return f"{self.metric} {self.object_id} on {self.day}: {self.count}"
+
+class RollupCheckpoint(models.Model):
+    """How far a step of the rollup job has got"""
+    
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.PositiveBigIntegerField(default=0, help_text="Last source row rolled up")
+    last_time = models.DateTimeField(null=True, blank=True, help_text="Start of the last run")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return self.name
@@ -0,0 +1,17 @@
+from django.db import models
+
+class Company(models.Model):
+    name = models.CharField(max_length=200)
+    description = models.TextField()
+    website = models.URLField(blank=True)
+    location = models.CharField(max_length=200)
+    # Canonical place resolved from ``location`` on save (see jobs.geo)
+    place_id = models.CharField(max_length=64, blank=True, editable=False, db_index=True)
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
+    logo = models.ImageField(upload_to='company_logos/', blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return self.name
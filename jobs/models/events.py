@@ -0,0 +1,46 @@
+from django.db import models
+from django.utils import timezone
+
+def month_of(moment):
+    """The ``YYYYMM`` partition key of a datetime"""
+    moment = timezone.localtime(moment)
+    return moment.year * 100 + moment.month
+
+class InteractionEvent(models.Model):
+    """One user interaction, appended to the event log (see jobs/events.py)"""
+    
+    KIND_CHOICES = [
+        ('view', 'View'),
+        ('download', 'Download'),
+        ('apply', 'Apply'),
+        ('endorse', 'Endorse'),
+        ('search', 'Search'),
+    ]
+    
+    OBJECT_TYPE_CHOICES = [
+        ('profile', 'Profile'),
+        ('job', 'Job'),
+        ('resume', 'Resume'),
+        ('user_skill', 'User skill'),
+    ]
+    
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    # Plain ids rather than foreign keys: the log outlives the rows it
+    # mentions, and whole months are archived without touching other tables
+    actor_id = models.PositiveBigIntegerField(null=True, blank=True, help_text="User id, empty when anonymous")
+    object_type = models.CharField(max_length=10, choices=OBJECT_TYPE_CHOICES, blank=True)
+    object_id = models.PositiveBigIntegerField(null=True, blank=True)
+    query = models.CharField(max_length=200, blank=True, help_text="Search text, for search events")
+    created_at = models.DateTimeField(default=timezone.now)
+    month = models.PositiveIntegerField(help_text="YYYYMM of created_at; the partition key")
+    
+    class Meta:
+        verbose_name = 'Interaction Event'
+        verbose_name_plural = 'Interaction Events'
+        indexes = [
+            models.Index(fields=['month', 'kind'], name='event_month_kind'),
+            models.Index(fields=['object_type', 'object_id', 'created_at'], name='event_object'),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} {self.object_type} {self.object_id or ''} at {self.created_at}"
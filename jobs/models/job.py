@@ -1,16 +1,8 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 
-class Company(models.Model):
-    name = models.CharField(max_length=200)
-    description = models.TextField()
-    website = models.URLField(blank=True)
-    location = models.CharField(max_length=200)
-    logo = models.ImageField(upload_to='company_logos/', blank=True, null=True)
-    created_at = models.DateTimeField(auto_now_add=True)
-    
-    def __str__(self):
-        return self.name
+from .company import Company
 
 class Job(models.Model):
     JOB_TYPE_CHOICES = [
@@ -25,15 +17,40 @@ class Job(models.Model):
     description = models.TextField()
     company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='jobs')
     location = models.CharField(max_length=200)
+    # Canonical place resolved from ``location`` on save (see jobs.geo)
+    place_id = models.CharField(max_length=64, blank=True, editable=False, db_index=True)
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
     job_type = models.CharField(max_length=20, choices=JOB_TYPE_CHOICES)
     salary_min = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     salary_max = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    # Effective salary bounds for range filtering: a single set bound stands
+    # for both ends (see jobs.search.salary)
+    salary_low = models.GeneratedField(
+        expression=Coalesce('salary_min', 'salary_max'),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2, null=True),
+        db_persist=True,
+    )
+    salary_high = models.GeneratedField(
+        expression=Coalesce('salary_max', 'salary_min'),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2, null=True),
+        db_persist=True,
+    )
     requirements = models.TextField()
     benefits = models.TextField(blank=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            # Backs keyset pagination of the active listing on (created_at, id)
+            models.Index(fields=['is_active', '-created_at', '-id'], name='job_active_recent_idx'),
+            # Back salary range filters on the effective bounds
+            models.Index(fields=['is_active', 'salary_low', 'salary_high', '-created_at'], name='job_salary_low_idx'),
+            models.Index(fields=['is_active', 'salary_high', 'salary_low', '-created_at'], name='job_salary_high_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.title} at {self.company.name}"
 
@@ -54,18 +71,3 @@ class JobApplication(models.Model):
     
     def __str__(self):
         return f"{self.user.username} - {self.job.title}"
-
-class UserProfile(models.Model):
-    user = models.OneToOneField(User, on_delete=models.CASCADE)
-    bio = models.TextField(blank=True)
-    skills = models.TextField(help_text="Comma-separated list of skills")
-    experience = models.TextField(blank=True)
-    education = models.TextField(blank=True)
-    location = models.CharField(max_length=200, blank=True)
-    phone = models.CharField(max_length=20, blank=True)
-    linkedin_url = models.URLField(blank=True)
-    portfolio_url = models.URLField(blank=True)
-    profile_picture = models.ImageField(upload_to='profile_pictures/', blank=True, null=True)
-    
-    def __str__(self):
-        return f"{self.user.username}'s Profile"
@@ -25,6 +25,10 @@ class Register(models.Model):
     state = models.CharField(max_length=100, blank=True)
     country = models.CharField(max_length=100, blank=True)
     postal_code = models.CharField(max_length=20, blank=True)
+    # Canonical place resolved from city/state/country on save (see jobs.geo)
+    place_id = models.CharField(max_length=64, blank=True, editable=False, db_index=True)
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
     profile_picture = models.ImageField(upload_to='profile_pictures/', blank=True, null=True)
     bio = models.TextField(max_length=500, blank=True)
     website = models.URLField(blank=True)
@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import FileExtensionValidator
+from django.utils import timezone
+from jobs.counters import BufferedCounter
 
 class Resume(models.Model):
     """Model to store user resumes with version control"""
@@ -32,6 +34,7 @@ class Resume(models.Model):
     # Usage tracking
     download_count = models.PositiveIntegerField(default=0)
     last_downloaded = models.DateTimeField(null=True, blank=True)
+    downloads = BufferedCounter('download_count', stamp='last_downloaded')
     applications_count = models.PositiveIntegerField(default=0)
     
     created_at = models.DateTimeField(auto_now_add=True)
@@ -54,7 +57,9 @@ class Resume(models.Model):
         
         # Ensure only one primary resume per user
         if self.is_primary:
-            Resume.objects.filter(user=self.user, is_primary=True).exclude(pk=self.pk).update(is_primary=False)
+            Resume.objects.filter(user=self.user, is_primary=True).exclude(pk=self.pk).update(
+                is_primary=False, updated_at=timezone.now()
+            )
         
         super().save(*args, **kwargs)
     
@@ -70,8 +75,5 @@ class Resume(models.Model):
         return f"{self.file_size:.1f} TB"
     
     def increment_download_count(self):
-        """Increment download counter"""
-        from django.utils import timezone
-        self.download_count += 1
-        self.last_downloaded = timezone.now()
-        self.save(update_fields=['download_count', 'last_downloaded'])
+        """Count a download (written in batches, see jobs/counters.py); returns the count"""
+        return Resume.downloads.incr(self)
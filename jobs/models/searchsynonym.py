@@ -0,0 +1,21 @@
+from django.db import models
+
+class SearchSynonym(models.Model):
+    """Editable group of equivalent job search terms (synonyms, acronyms)"""
+    term = models.CharField(max_length=100, unique=True, help_text="Word, phrase or acronym, e.g. ML")
+    synonyms = models.TextField(help_text="Comma-separated equivalents, e.g. machine learning, deep learning")
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Search Synonym'
+        verbose_name_plural = 'Search Synonyms'
+        ordering = ['term']
+    
+    def __str__(self):
+        return f"{self.term}: {self.synonyms}"
+    
+    def get_terms(self):
+        """The term followed by its synonyms, blanks dropped"""
+        return [self.term] + [synonym.strip() for synonym in self.synonyms.split(',') if synonym.strip()]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 
 class SkillCategory(models.Model):
@@ -7,6 +7,7 @@ class SkillCategory(models.Model):
     description = models.TextField(blank=True)
     icon = models.CharField(max_length=50, blank=True, help_text="CSS class or icon name")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name = 'Skill Category'
@@ -24,11 +25,15 @@ class Skill(models.Model):
     is_trending = models.BooleanField(default=False)
     usage_count = models.PositiveIntegerField(default=0, help_text="Number of users with this skill")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name = 'Skill'
         verbose_name_plural = 'Skills'
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['-usage_count', 'id'], name='skill_usage_count'),
+        ]
     
     def __str__(self):
         return self.name
@@ -79,6 +84,11 @@ class Skills(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.skill.name} ({self.proficiency_level})"
     
+    def save(self, *args, **kwargs):
+        # The skill's usage_count is updated by the save signals, in this transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+    
     def get_proficiency_percentage(self):
         """Convert proficiency level to percentage for UI display"""
         proficiency_map = {
@@ -104,3 +114,8 @@ class SkillEndorsement(models.Model):
     
     def __str__(self):
         return f"{self.endorsed_by.username} endorsed {self.user_skill.user.username} for {self.user_skill.skill.name}"
+    
+    def save(self, *args, **kwargs):
+        # The user skill's endorsement_count is updated by the save signals, in this transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
+from jobs.counters import BufferedCounter
 
 class UserDetails(models.Model):
     """Comprehensive user details and preferences"""
@@ -56,6 +57,8 @@ class UserDetails(models.Model):
     
     # Location Preferences
     preferred_locations = models.TextField(blank=True, help_text="Comma-separated list of preferred work locations")
+    # Canonical place ids resolved from preferred_locations on save (see jobs.geo)
+    preferred_place_ids = models.JSONField(default=list, blank=True, editable=False)
     willing_to_relocate = models.BooleanField(default=False)
     
     # Additional Information
@@ -90,6 +93,7 @@ class UserDetails(models.Model):
     last_login = models.DateTimeField(null=True, blank=True)
     job_search_activity_score = models.PositiveIntegerField(default=0)
     profile_views_count = models.PositiveIntegerField(default=0)
+    profile_views = BufferedCounter('profile_views_count')
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -136,7 +140,7 @@ class UserDetails(models.Model):
         
         percentage = int((completed_fields / total_fields) * 100) if total_fields > 0 else 0
         self.profile_completion_percentage = percentage
-        self.save(update_fields=['profile_completion_percentage'])
+        self.save(update_fields=['profile_completion_percentage', 'updated_at'])
         return percentage
     
     def get_experience_level(self):
@@ -154,6 +158,5 @@ class UserDetails(models.Model):
             return "Executive Level"
     
     def increment_profile_views(self):
-        """Increment profile views counter"""
-        self.profile_views_count += 1
-        self.save(update_fields=['profile_views_count'])
+        """Count a profile view (written in batches, see jobs/counters.py); returns the count"""
+        return UserDetails.profile_views.incr(self)
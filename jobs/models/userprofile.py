@@ -0,0 +1,17 @@
+from django.db import models
+from django.contrib.auth.models import User
+
+class UserProfile(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE)
+    bio = models.TextField(blank=True)
+    skills = models.TextField(help_text="Comma-separated list of skills")
+    experience = models.TextField(blank=True)
+    education = models.TextField(blank=True)
+    location = models.CharField(max_length=200, blank=True)
+    phone = models.CharField(max_length=20, blank=True)
+    linkedin_url = models.URLField(blank=True)
+    portfolio_url = models.URLField(blank=True)
+    profile_picture = models.ImageField(upload_to='profile_pictures/', blank=True, null=True)
+    
+    def __str__(self):
+        return f"{self.user.username}'s Profile"
@@ -0,0 +1,25 @@
+from django.db import models
+
+class ViewerSketch(models.Model):
+    """HyperLogLog sketch of the distinct viewers of a profile or job on one day"""
+    
+    KIND_CHOICES = [
+        ('profile', 'Profile'),
+        ('job', 'Job'),
+    ]
+    
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField(help_text="UserDetails id for profiles, Job id for jobs")
+    day = models.DateField()
+    registers = models.BinaryField(help_text="Encoded sketch, see jobs/sketches.py")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Viewer Sketch'
+        verbose_name_plural = 'Viewer Sketches'
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id', 'day'], name='viewer_sketch_unique_day'),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} {self.object_id} on {self.day}"
@@ -0,0 +1,286 @@
+"""Keyset (cursor) pagination.
+
+Instead of ``COUNT(*)`` + ``OFFSET n``, each page is fetched with a
+``WHERE (key...) < (last key...)`` predicate on the ordering columns plus the
+primary key, so every page costs the same however deep it is. Cursors are
+signed, opaque tokens; a request without one is the first page, so existing
+first-page URLs keep working. Counts are optional and come from a short-lived
+cached estimate rather than a COUNT per page.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+CURSOR_SALT = 'jobs.pagination.cursor'
+DEFAULT_ORDERING = ('-created_at',)
+COUNT_CACHE_TIMEOUT = getattr(settings, 'PAGINATION_COUNT_CACHE_TIMEOUT', 60)
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(payload):
+    return signing.dumps(payload, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(token):
+    try:
+        return signing.loads(token, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        raise InvalidCursor(token)
+
+
+def approximate_count(queryset, timeout=COUNT_CACHE_TIMEOUT):
+    """Return a cached row count for ``queryset``.
+
+    The count is exact when computed but is then served from the cache for
+    ``timeout`` seconds, so it may lag recent writes by that much.
+    """
+    query = queryset.order_by().query
+    digest = hashlib.md5(f'{queryset.db}:{query}'.encode()).hexdigest()
+    return cache.get_or_set(f'pagination:count:{digest}', queryset.count, timeout)
+
+
+def _value(obj, field):
+    """Follow a ``a__b__c`` ordering path on a model instance"""
+    for attr in field.split('__'):
+        if obj is None:
+            return None
+        obj = getattr(obj, attr)
+    return obj
+
+
+def _serialize(value):
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def _parse_ordering(ordering):
+    keys = []
+    for field in ordering:
+        if not isinstance(field, str) or field == '?':
+            continue
+        descending = field.startswith('-')
+        name = field.lstrip('-')
+        keys.append(('pk' if name in ('id', 'pk') else name, descending))
+    if not any(name == 'pk' for name, _ in keys):
+        keys.append(('pk', keys[0][1] if keys else True))
+    else:
+        keys = keys[:[name for name, _ in keys].index('pk') + 1]
+    return keys
+
+
+def _beyond(field, descending, value):
+    """Rows strictly past ``value`` on one key; NULL sorts lowest"""
+    if not descending:
+        if value is None:
+            return Q(**{f'{field}__isnull': False})
+        return Q(**{f'{field}__gt': value})
+    if value is None:
+        return Q(pk__in=[])
+    return Q(**{f'{field}__lt': value}) | Q(**{f'{field}__isnull': True})
+
+
+def _after(keys, values):
+    """Rows strictly after ``values`` in the ``keys`` order"""
+    condition = Q(pk__in=[])
+    equal = Q()
+    for (field, descending), value in zip(keys, values):
+        condition |= equal & _beyond(field, descending, value)
+        if value is None:
+            equal &= Q(**{f'{field}__isnull': True})
+        else:
+            equal &= Q(**{field: value})
+    return condition
+
+
+def _order_by(keys):
+    return [
+        F(field).desc(nulls_last=True) if descending else F(field).asc(nulls_first=True)
+        for field, descending in keys
+    ]
+
+
+class KeysetPage:
+    """One page of results plus the cursors needed to move from it"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Paginate a queryset by keyset on ``ordering`` (+ primary key)"""
+
+    def __init__(self, ordering=DEFAULT_ORDERING, page_size=10):
+        self.keys = _parse_ordering(ordering)
+        self.page_size = page_size
+
+    def _cursor(self, obj, reverse):
+        values = [_serialize(_value(obj, field)) for field, _ in self.keys]
+        return encode_cursor({'k': values, 'r': reverse})
+
+    def paginate(self, queryset, cursor=None):
+        """Return the page after (or before) ``cursor``; raises InvalidCursor"""
+        keys = self.keys
+        reverse = False
+        if cursor:
+            position = decode_cursor(cursor)
+            values, reverse = position.get('k'), bool(position.get('r'))
+            if not isinstance(values, list) or len(values) != len(keys):
+                raise InvalidCursor(cursor)
+            if reverse:
+                keys = [(field, not descending) for field, descending in keys]
+            queryset = queryset.filter(_after(keys, values))
+
+        rows = list(queryset.order_by(*_order_by(keys))[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+        if not rows:
+            return KeysetPage(rows)
+
+        more_after = has_more if not reverse else True
+        more_before = bool(cursor) if not reverse else has_more
+        return KeysetPage(
+            rows,
+            next_cursor=self._cursor(rows[-1], False) if more_after else None,
+            previous_cursor=self._cursor(rows[0], True) if more_before else None,
+        )
+
+
+def paginate_ranked(ids, cursor=None, page_size=10):
+    """Page through an already ranked id list (e.g. search results)"""
+    offset = 0
+    if cursor:
+        position = decode_cursor(cursor)
+        offset = position.get('o')
+        if not isinstance(offset, int) or offset < 0:
+            raise InvalidCursor(cursor)
+    end = offset + page_size
+    return KeysetPage(
+        ids[offset:end],
+        next_cursor=encode_cursor({'o': end}) if end < len(ids) else None,
+        previous_cursor=encode_cursor({'o': max(offset - page_size, 0)}) if offset else None,
+    )
+
+
+class KeysetPagination(BasePagination):
+    """DRF pagination class backed by ``KeysetPaginator``.
+
+    Pages follow the view's ordering (``?ordering=`` via OrderingFilter,
+    the view's ``ordering``, the model's Meta ordering, else newest first),
+    always tie-broken on the primary key. ``?count=true`` adds a cached,
+    approximate total.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    count_query_param = 'count'
+
+    def get_page_size(self, request):
+        page_size = getattr(settings, 'REST_FRAMEWORK', {}).get('PAGE_SIZE') or 20
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return page_size
+        return max(1, min(requested, self.max_page_size))
+
+    def get_ordering(self, request, queryset, view):
+        if view is not None and OrderingFilter in getattr(view, 'filter_backends', []):
+            ordering = OrderingFilter().get_ordering(request, queryset, view)
+            if ordering:
+                return ordering
+        if view is not None and getattr(view, 'ordering', None):
+            ordering = view.ordering
+            return (ordering,) if isinstance(ordering, str) else ordering
+        return queryset.query.order_by or queryset.model._meta.ordering or DEFAULT_ORDERING
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        paginator = KeysetPaginator(
+            self.get_ordering(request, queryset, view), self.get_page_size(request)
+        )
+        try:
+            self.page = paginator.paginate(
+                queryset, request.query_params.get(self.cursor_query_param)
+            )
+        except InvalidCursor:
+            raise NotFound('Invalid cursor')
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ('1', 'true', 'True'):
+            self.count = approximate_count(queryset)
+        return list(self.page)
+
+    def set_page(self, request, page, total=None):
+        """Use an already computed ``KeysetPage`` (e.g. from a result cache).
+
+        ``total`` is reported only when ``?count=true`` asks for it.
+        """
+        self.request = request
+        self.page = page
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ('1', 'true', 'True'):
+            self.count = total
+        return list(page)
+
+    def get_link(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_data(self, data):
+        payload = {
+            'next': self.get_link(self.page.next_cursor),
+            'previous': self.get_link(self.page.previous_cursor),
+        }
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['results'] = data
+        return payload
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'count': {'type': 'integer'},
+                'results': schema,
+            },
+        }
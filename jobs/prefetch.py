@@ -0,0 +1,108 @@
+"""Declared select_related/prefetch_related for serializers.
+
+A serializer lists the relations its fields traverse in its Meta::
+
+    class Meta:
+        select_related = ['skill__category']
+        prefetch_related = ['endorsements']
+
+Nested serializers contribute theirs under the field's source, and a nested
+serializer over a foreign key is joined without being declared, so
+``JobSerializer`` gets ``company`` for free. ``with_relations`` applies all
+of it to a queryset; the viewsets do that in ``get_queryset`` through
+``SerializerRelationsMixin``, which keeps the query count of a page
+independent of its size. It also adds the annotations the serializer's
+``CountField``s read (see ``jobs.counts``).
+"""
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+from .counts import counted_fields, with_counts
+
+
+def _prefixed(lookup, prefix):
+    if not prefix:
+        return lookup
+    if isinstance(lookup, Prefetch):
+        return Prefetch(
+            prefix + lookup.prefetch_through, queryset=lookup.queryset, to_attr=lookup.to_attr
+        )
+    return prefix + lookup
+
+
+def related_lookups(serializer, prefix=''):
+    """Return the ``(select_related, prefetch_related)`` lookups of a serializer"""
+    if isinstance(serializer, type):
+        serializer = serializer()
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    meta = getattr(serializer, 'Meta', None)
+    model = getattr(meta, 'model', None)
+    select = [_prefixed(lookup, prefix) for lookup in getattr(meta, 'select_related', ())]
+    prefetch = [_prefixed(lookup, prefix) for lookup in getattr(meta, 'prefetch_related', ())]
+    if model is None:
+        return select, prefetch
+
+    for field in serializer.fields.values():
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        if not isinstance(nested, serializers.Serializer) or field.source == '*':
+            continue
+        source = field.source.replace('.', '__')
+        try:
+            model_field = model._meta.get_field(field.source_attrs[0])
+        except FieldDoesNotExist:
+            model_field = None
+        if len(field.source_attrs) == 1 and model_field is not None and (
+            model_field.many_to_one or model_field.one_to_one
+        ):
+            select.append(prefix + source)
+            nested_select, nested_prefetch = related_lookups(nested, f'{prefix}{source}__')
+            select += nested_select
+        else:
+            # A list or reverse relation: prefetch it, and its own relations
+            # under the prefetch
+            prefetch.append(prefix + source)
+            nested_select, nested_prefetch = related_lookups(nested, f'{prefix}{source}__')
+            prefetch += nested_select
+        prefetch += nested_prefetch
+    return select, prefetch
+
+
+@lru_cache(maxsize=None)
+def _class_lookups(serializer_class):
+    return related_lookups(serializer_class)
+
+
+@lru_cache(maxsize=None)
+def _class_counts(serializer_class):
+    return counted_fields(serializer_class())
+
+
+def with_relations(queryset, serializer):
+    """Apply the relations and counts ``serializer`` (a class or instance) declares"""
+    if isinstance(serializer, type):
+        select, prefetch = _class_lookups(serializer)
+        counted = _class_counts(serializer)
+    else:
+        select, prefetch = related_lookups(serializer)
+        counted = counted_fields(serializer)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    if counted:
+        queryset = with_counts(queryset, counted)
+    return queryset
+
+
+class SerializerRelationsMixin:
+    """ViewSet mixin joining/prefetching what the action's serializer reads.
+
+    Viewsets call ``super().get_queryset()`` from their own ``get_queryset``.
+    """
+
+    def get_queryset(self):
+        return with_relations(super().get_queryset(), self.get_serializer_class())
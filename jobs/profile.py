@@ -0,0 +1,131 @@
+"""The aggregated profile: a user's whole profile in one response.
+
+``GET /api/v1/profile/`` returns the registration profile, details,
+education, experience, skills, the endorsements those skills received and
+the resumes. Each section is rendered by the serializer its own endpoint
+uses, so it reads the same as there. ``?include=skills,experience`` picks
+sections; by default every section is included.
+
+The number of queries does not depend on how many rows the user has. One
+query reads the validators of every included section, then each section
+is one query with its serializer's declared relations joined. The
+validators are each section's newest ``updated_at`` (``created_at`` for
+endorsements, which are never edited), its row count and the newest
+``updated_at`` of the rows it embeds (the skill and category names). The
+ETag built from them changes on every insert, update and delete, so a
+conditional request for an unchanged profile is answered 304 after that
+first query.
+"""
+from django.contrib.auth.models import User
+from django.db.models import Count, Max, OuterRef, Subquery
+from rest_framework.exceptions import ValidationError
+
+from .conditional import make_etag
+from .counters import epoch
+from .models.education import Education
+from .models.experience import Experience
+from .models.register import Register
+from .models.resume import Resume
+from .models.skills import SkillEndorsement, Skills
+from .models.userdetails import UserDetails
+from .prefetch import with_relations
+from .serializers.education_serializer import EducationSerializer
+from .serializers.experience_serializer import ExperienceSerializer
+from .serializers.register_serializer import RegisterSerializer
+from .serializers.resume_serializer import ResumeSerializer
+from .serializers.skills_serializer import SkillEndorsementSerializer, SkillsSerializer
+from .serializers.userdetails_serializer import UserDetailsSerializer
+
+INCLUDE_PARAM = 'include'
+
+
+class Section:
+    """One part of the profile document: a model's rows for the user"""
+
+    def __init__(self, name, model, serializer_class, many=True, user_lookup='user',
+                 validator_field='updated_at', related=()):
+        self.name = name
+        self.model = model
+        self.serializer_class = serializer_class
+        self.many = many
+        self.user_lookup = user_lookup
+        self.validator_field = validator_field
+        # updated_at lookups of the rows the serializer embeds
+        self.related = related
+
+    def queryset(self, user):
+        return self.model.objects.filter(**{self.user_lookup: user})
+
+    def validators(self):
+        """Subqueries of the newest validator fields and row count, per outer user"""
+        rows = self.model.objects.filter(**{self.user_lookup: OuterRef('pk')}).order_by()
+        grouped = rows.values(self.user_lookup)
+        validators = {
+            f'{self.name}_latest': Subquery(
+                grouped.annotate(value=Max(self.validator_field)).values('value')
+            ),
+            f'{self.name}_count': Subquery(grouped.annotate(value=Count('pk')).values('value')),
+        }
+        for number, lookup in enumerate(self.related):
+            validators[f'{self.name}_related_{number}'] = Subquery(
+                grouped.annotate(value=Max(lookup)).values('value')
+            )
+        return validators
+
+    def render(self, user, context):
+        instance = with_relations(self.queryset(user), self.serializer_class)
+        if not self.many:
+            instance = instance.first()
+            if instance is None:
+                return None
+        # Explicit omit=() keeps the request's ?fields= away from the sections
+        serializer = self.serializer_class(instance, many=self.many, context=context, omit=())
+        return serializer.data
+
+
+SECTIONS = (
+    Section('registration', Register, RegisterSerializer, many=False),
+    Section('details', UserDetails, UserDetailsSerializer, many=False),
+    Section('education', Education, EducationSerializer),
+    Section('experience', Experience, ExperienceSerializer),
+    Section(
+        'skills', Skills, SkillsSerializer,
+        related=('skill__updated_at', 'skill__category__updated_at'),
+    ),
+    Section(
+        'endorsements', SkillEndorsement, SkillEndorsementSerializer,
+        user_lookup='user_skill__user', validator_field='created_at',
+        related=('user_skill__skill__updated_at',),
+    ),
+    Section('resumes', Resume, ResumeSerializer),
+)
+
+
+def included(request):
+    """The sections ``?include=`` asks for (all of them by default)"""
+    value = request.query_params.get(INCLUDE_PARAM)
+    if not value:
+        return SECTIONS
+    names = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = names - {section.name for section in SECTIONS}
+    if unknown:
+        raise ValidationError({INCLUDE_PARAM: f"Unknown section(s): {', '.join(sorted(unknown))}"})
+    return tuple(section for section in SECTIONS if section.name in names)
+
+
+def profile_etag(request, sections):
+    """The ETag of the user's profile, from one query over every section"""
+    annotations = {}
+    for section in sections:
+        annotations.update(section.validators())
+    values = (
+        User.objects.filter(pk=request.user.pk).annotate(**annotations)
+        .values_list(*annotations).get()
+    )
+    # The counters' pending increments are in the document but not yet in updated_at
+    return make_etag(request, request.user.pk, epoch(request.user.pk), *values)
+
+
+def profile_document(request, sections):
+    context = {'request': request}
+    return {section.name: section.render(request.user, context) for section in sections}
@@ -0,0 +1,240 @@
+"""Hourly and daily analytics rollups for views, downloads and applications.
+
+Four metrics are counted per object and time bucket:
+
+* ``profile_view``: ``increment_views`` on a UserDetails row;
+* ``resume_download``: the resume ``download`` action;
+* ``job_view``: a ``job_detail`` page view;
+* ``application``: a ``JobApplication`` submitted for a job.
+
+The hits go through the write-behind buffer of ``jobs/counters.py`` as
+``RollupCounter`` deltas keyed by object and hour. A flush adds them to
+``HourlyRollup`` rows with one ``F()`` UPDATE per hour and batch. The
+rollup job (``run()``, the ``rollup_analytics`` management command, run
+from cron every few minutes) does the rest incrementally, from
+checkpoints:
+
+1. It folds the applications submitted since the last run into the hourly
+   rows of their jobs.
+2. It recomputes the ``DailyRollup`` of every (metric, object, day) with an
+   hourly row changed since its last run, as the sum of that day's hours.
+   Recomputing rather than adding means late flushes and reruns cannot
+   double count.
+3. It drops hourly rows older than ``ANALYTICS_HOURLY_RETENTION_DAYS``
+   (default 30). Daily rows are kept.
+
+``series()`` reads a metric's counts for the last N hours or days. It costs
+a fixed number of queries, whose size depends on the buckets, not on the
+events. Days the rollup job has not covered yet are summed from the hourly
+rows. Hours follow the local time zone, so they nest in local days.
+"""
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from . import counters
+from .models.analytics import DailyRollup, HourlyRollup, RollupCheckpoint
+from .models.job import JobApplication
+
+HOURLY_RETENTION = timedelta(days=getattr(settings, 'ANALYTICS_HOURLY_RETENTION_DAYS', 30))
+
+# How far back each run looks again, to catch rows committed during the last one
+OVERLAP = timedelta(minutes=10)
+
+# Applications newer than this are left for the next run, which lets
+# transactions that allocated lower ids commit first
+SETTLE = timedelta(minutes=1)
+
+BATCH_SIZE = counters.BATCH_SIZE
+
+INTERVALS = {'hour': 48, 'day': 90}
+
+MAX_BUCKETS = {'hour': 24 * HOURLY_RETENTION.days, 'day': 731}
+
+
+def hour_of(moment):
+    """The start of the local hour ``moment`` falls in"""
+    return timezone.localtime(moment).replace(minute=0, second=0, microsecond=0)
+
+
+def day_range(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def add_hourly(metric, hour, counts):
+    """Add ``{object_id: n}`` to the ``metric`` rows of ``hour``, creating missing ones"""
+    now = timezone.now()
+    items = sorted(counts.items())
+    for start in range(0, len(items), BATCH_SIZE):
+        batch = items[start:start + BATCH_SIZE]
+        ids = [object_id for object_id, _ in batch]
+        HourlyRollup.objects.bulk_create(
+            [HourlyRollup(metric=metric, object_id=object_id, hour=hour) for object_id in ids],
+            ignore_conflicts=True,
+        )
+        HourlyRollup.objects.filter(metric=metric, hour=hour, object_id__in=ids).update(
+            count=F('count') + counters.increment(batch, 'object_id'), updated_at=now,
+        )
+
+
+class RollupCounter:
+    """Buffered hourly counts of one metric, added to ``HourlyRollup`` at flush time"""
+
+    def __init__(self, metric):
+        self.metric = metric
+
+    def key(self, pk):
+        object_id, hour = pk
+        return f'rollup:{self.metric}:{object_id}:{hour:%Y%m%d%H}'
+
+    def incr(self, object_id, delta=1):
+        counters.add(self, (object_id, hour_of(timezone.now())), delta)
+
+    def write(self, deltas):
+        by_hour = defaultdict(dict)
+        for (object_id, hour), delta in deltas.items():
+            by_hour[hour][object_id] = delta
+        with transaction.atomic():
+            for hour, counts in by_hour.items():
+                add_hourly(self.metric, hour, counts)
+
+
+PROFILE_VIEWS = RollupCounter('profile_view')
+RESUME_DOWNLOADS = RollupCounter('resume_download')
+JOB_VIEWS = RollupCounter('job_view')
+APPLICATIONS = 'application'
+
+
+def _checkpoint(name):
+    """The checkpoint ``name``, locked until the transaction ends"""
+    RollupCheckpoint.objects.get_or_create(name=name)
+    return RollupCheckpoint.objects.select_for_update().get(name=name)
+
+
+def roll_applications(chunk_size=5000):
+    """Add applications submitted since the last run to the hourly rows; returns how many"""
+    settled = timezone.now() - SETTLE
+    rolled = 0
+    while True:
+        with transaction.atomic():
+            checkpoint = _checkpoint('applications')
+            rows = list(
+                JobApplication.objects.filter(pk__gt=checkpoint.last_id, applied_at__lt=settled)
+                .order_by('pk').values_list('pk', 'job_id', 'applied_at')[:chunk_size]
+            )
+            if not rows:
+                return rolled
+            by_hour = defaultdict(Counter)
+            for _, job_id, applied_at in rows:
+                by_hour[hour_of(applied_at)][job_id] += 1
+            for hour, counts in by_hour.items():
+                add_hourly(APPLICATIONS, hour, counts)
+            checkpoint.last_id = rows[-1][0]
+            checkpoint.save(update_fields=['last_id', 'updated_at'])
+        rolled += len(rows)
+
+
+def roll_days():
+    """Recompute the daily rows whose hours changed since the last run; returns how many"""
+    started = timezone.now()
+    with transaction.atomic():
+        checkpoint = _checkpoint('daily')
+        changed = HourlyRollup.objects.all()
+        if checkpoint.last_time is not None:
+            changed = changed.filter(updated_at__gte=checkpoint.last_time - OVERLAP)
+        touched = defaultdict(set)
+        for metric, object_id, hour in changed.values_list('metric', 'object_id', 'hour').iterator():
+            touched[metric, timezone.localdate(hour)].add(object_id)
+
+        rolled = 0
+        for (metric, day), object_ids in touched.items():
+            start, end = day_range(day)
+            object_ids = sorted(object_ids)
+            for offset in range(0, len(object_ids), BATCH_SIZE):
+                totals = (
+                    HourlyRollup.objects.filter(
+                        metric=metric, object_id__in=object_ids[offset:offset + BATCH_SIZE],
+                        hour__gte=start, hour__lt=end,
+                    ).values('object_id').annotate(total=Sum('count')).order_by()
+                )
+                rows = [
+                    DailyRollup(metric=metric, object_id=row['object_id'], day=day,
+                                count=row['total'], updated_at=started)
+                    for row in totals
+                ]
+                DailyRollup.objects.bulk_create(
+                    rows, update_conflicts=True, unique_fields=['metric', 'object_id', 'day'],
+                    update_fields=['count', 'updated_at'],
+                )
+                rolled += len(rows)
+        checkpoint.last_time = started
+        checkpoint.save(update_fields=['last_time', 'updated_at'])
+    return rolled
+
+
+def prune_hours():
+    """Delete hourly rows past the retention period; returns how many"""
+    deleted, _ = HourlyRollup.objects.filter(hour__lt=timezone.now() - HOURLY_RETENTION).delete()
+    return deleted
+
+
+def run(chunk_size=5000):
+    """One pass of the rollup job: ``(applications, daily rows, pruned hourly rows)``"""
+    return roll_applications(chunk_size), roll_days(), prune_hours()
+
+
+def series_params(request):
+    """``interval`` and ``buckets`` from the query string, checked"""
+    interval = request.query_params.get('interval', 'day')
+    if interval not in INTERVALS:
+        raise ValidationError({'interval': f"Must be one of: {', '.join(INTERVALS)}"})
+    buckets = request.query_params.get('buckets', INTERVALS[interval])
+    try:
+        buckets = int(buckets)
+    except (TypeError, ValueError):
+        buckets = 0
+    if not 1 <= buckets <= MAX_BUCKETS[interval]:
+        raise ValidationError({
+            'buckets': f'Must be a whole number from 1 to {MAX_BUCKETS[interval]}'
+        })
+    return {'interval': interval, 'buckets': buckets}
+
+
+def series(metric, object_id, interval='day', buckets=90):
+    """``metric`` counts for ``object_id`` over the last ``buckets`` hours or days, oldest first"""
+    rows = HourlyRollup.objects.filter(metric=metric, object_id=object_id)
+    if interval == 'hour':
+        first = hour_of(timezone.now()) - timedelta(hours=buckets - 1)
+        counts = dict(rows.filter(hour__gte=first).values_list('hour', 'count'))
+        keys = [first + timedelta(hours=offset) for offset in range(buckets)]
+        start = first.isoformat()
+    else:
+        first = timezone.localdate() - timedelta(days=buckets - 1)
+        last_run = (
+            RollupCheckpoint.objects.filter(name='daily').values_list('last_time', flat=True).first()
+        )
+        # Days from the last run's on may have hours not summed into them yet
+        fresh = max(first, timezone.localdate(last_run - OVERLAP)) if last_run else first
+        counts = dict(
+            DailyRollup.objects.filter(metric=metric, object_id=object_id, day__gte=first, day__lt=fresh)
+            .values_list('day', 'count')
+        )
+        counts.update(
+            rows.filter(hour__gte=day_range(fresh)[0])
+            .annotate(day=TruncDate('hour')).values('day').annotate(total=Sum('count'))
+            .order_by().values_list('day', 'total')
+        )
+        keys = [first + timedelta(days=offset) for offset in range(buckets)]
+        start = first.isoformat()
+    values = [counts.get(key, 0) for key in keys]
+    return {
+        'metric': metric, 'interval': interval, 'start': start,
+        'total': sum(values), 'counts': values,
+    }
@@ -0,0 +1,28 @@
+from .backends import get_backend, tokenize_query
+from .index import (
+    filter_ranked,
+    index_jobs,
+    load_in_order,
+    rank_queryset,
+    rebuild_index,
+    reindex_company,
+    remove_jobs,
+    search,
+    search_capped,
+    search_job_ids,
+)
+
+__all__ = [
+    'get_backend',
+    'tokenize_query',
+    'filter_ranked',
+    'index_jobs',
+    'load_in_order',
+    'rank_queryset',
+    'rebuild_index',
+    'reindex_company',
+    'remove_jobs',
+    'search',
+    'search_capped',
+    'search_job_ids',
+]
@@ -0,0 +1,273 @@
+"""Query analysis for job search: stemming, synonyms and acronyms.
+
+``analyze()`` turns a search box value into *groups* that are ANDed
+together. Each group is a tuple of alternatives that are ORed together,
+and each alternative is a ``(words, exact)`` pair: a non-exact alternative
+matches when every word is the prefix of an indexed word (the index's
+usual "dev" -> "developer" behaviour), an exact one is a phrase. For
+"ML engineers" that is::
+
+    [((('ml',), False), (('machine', 'learning'), True)),
+     ((('engineer',), False),)]
+
+The synonym dictionary is compiled from the editable ``SearchSynonym``
+table plus the ``Skill`` names (initials as acronyms, "Node.js" as
+"nodejs") into a dict keyed by word tuples, so expanding a query costs a
+few dict lookups. Each process compiles it once and recompiles it when its
+version moves: the SearchSynonym/Skill signal handlers bump the version in
+the shared cache, and processes look at it at most every
+``CHECK_INTERVAL`` seconds (at once for the process that made the change).
+The recompile runs in a background thread and requests keep expanding
+with the old dictionary until it is swapped in, so search suggestions
+never wait on the database for it.
+"""
+import logging
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from . import cache as result_cache
+from .autocomplete import normalize
+
+logger = logging.getLogger(__name__)
+
+# Most alternatives (original included) a single query group expands to
+MAX_ALTERNATIVES = getattr(settings, 'JOB_SEARCH_MAX_EXPANSIONS', 8)
+
+# Seconds between checks of the shared dictionary version
+CHECK_INTERVAL = getattr(settings, 'JOB_SEARCH_SYNONYMS_CHECK_INTERVAL', 5)
+
+VERSION_KEY = 'jobsearch:synonyms:version'
+
+# Longest phrase, in words, looked up as one dictionary key
+MAX_PHRASE_WORDS = 4
+
+# Inflectional endings, tried in order: (suffix, replacement)
+SUFFIXES = (
+    ('sses', 'ss'),
+    ('ies', 'y'),
+    ('ied', 'y'),
+    ('ings', ''),
+    ('ing', ''),
+    ('ed', ''),
+    ('s', ''),
+)
+# Words ending like this keep their final "s" ("business", "status", "analysis")
+KEEP_S = ('ss', 'us', 'is')
+MIN_STEM = 4
+
+ACRONYM_STOP_WORDS = frozenset({'and', 'for', 'in', 'of', 'on', 'the', 'to', 'with'})
+
+# Punctuation inside a name: "Node.js", "CI/CD", "Objective-C"
+COMPOUND_RE = re.compile(r'\w[^\w\s]+\w')
+
+
+def stem(word):
+    """Strip English inflections: "developers" -> "developer", "running" -> "run".
+
+    Deliberately light; stems are prefix-matched, so only endings that
+    stop a prefix from matching need removing.
+    """
+    if len(word) <= MIN_STEM or not word.isalpha():
+        return word
+    for suffix, replacement in SUFFIXES:
+        if not word.endswith(suffix):
+            continue
+        if suffix == 's' and word.endswith(KEEP_S):
+            return word
+        base = word[:-len(suffix)] + replacement
+        if len(base) < MIN_STEM:
+            return word
+        if not replacement and suffix != 's' and base[-1] == base[-2] and base[-1] not in 'lsz':
+            base = base[:-1]
+        return base
+    return word
+
+
+def skill_variants(name):
+    """Other spellings of a skill name: its acronym or its compound form"""
+    words = normalize(name)
+    if len(words) < 2:
+        return []
+    if COMPOUND_RE.search(name):
+        return [''.join(words)]
+    initials = [word[0] for word in words if word not in ACRONYM_STOP_WORDS]
+    if 2 <= len(initials) <= MAX_PHRASE_WORDS and all(word[0].isalpha() for word in words):
+        return [''.join(initials)]
+    return []
+
+
+class SynonymDictionary:
+    """Word tuple -> equivalent word tuples, with the stemmed form as a second key"""
+
+    def __init__(self, version=0):
+        self.version = version
+        self._synonyms = {}
+        self._max_words = 1
+
+    def __len__(self):
+        return len(self._synonyms)
+
+    def add(self, phrases):
+        """Make the given texts (words, phrases or acronyms) equivalent"""
+        entries = []
+        for phrase in phrases:
+            words = tuple(normalize(phrase))
+            if words and words not in entries:
+                entries.append(words)
+        if len(entries) < 2:
+            return
+        for words in entries:
+            if len(words) > MAX_PHRASE_WORDS:
+                continue
+            self._max_words = max(self._max_words, len(words))
+            for key in {words, tuple(stem(word) for word in words)}:
+                synonyms = self._synonyms.setdefault(key, [])
+                for other in entries:
+                    if other != words and other not in synonyms:
+                        synonyms.append(other)
+
+    def synonyms(self, words):
+        """Return the word tuples equivalent to ``words``"""
+        return (
+            self._synonyms.get(words)
+            or self._synonyms.get(tuple(stem(word) for word in words))
+            or ()
+        )
+
+    def analyze(self, text):
+        """Return the query groups for ``text`` (see the module docstring)"""
+        tokens = normalize(text)
+        groups = []
+        start = 0
+        while start < len(tokens):
+            # Longest dictionary phrase starting here, else the single word
+            for size in range(min(self._max_words, len(tokens) - start), 0, -1):
+                words = tuple(tokens[start:start + size])
+                synonyms = self.synonyms(words)
+                if synonyms or size == 1:
+                    break
+            alternatives = [(words, False)]
+            # Dictionary words ("nodejs", "devops") are left unstemmed
+            if size == 1 and words not in self._synonyms:
+                stemmed = stem(words[0])
+                if stemmed != words[0]:
+                    # A stem that is a prefix of the word already matches it
+                    stemmed_alternative = ((stemmed,), False)
+                    if words[0].startswith(stemmed):
+                        alternatives = [stemmed_alternative]
+                    else:
+                        alternatives.append(stemmed_alternative)
+            alternatives += [
+                (synonym, True) for synonym in synonyms
+                if (synonym, False) not in alternatives
+            ]
+            groups.append(tuple(alternatives[:MAX_ALTERNATIVES]))
+            start += size
+        return groups
+
+
+def build_dictionary(version=0):
+    """Compile the dictionary from the Skill and SearchSynonym tables"""
+    from jobs.models.searchsynonym import SearchSynonym
+    from jobs.models.skills import Skill
+
+    dictionary = SynonymDictionary(version)
+    for name in Skill.objects.values_list('name', flat=True).iterator():
+        variants = skill_variants(name)
+        if variants:
+            dictionary.add([name] + variants)
+    for synonym in SearchSynonym.objects.filter(is_active=True).iterator():
+        dictionary.add(synonym.get_terms())
+    return dictionary
+
+
+_dictionary = None
+_checked_at = 0.0
+_dictionary_lock = threading.Lock()
+_rebuilder = None
+
+
+def current_version():
+    return cache.get(VERSION_KEY, 0)
+
+
+def get_dictionary():
+    """Return the process-wide dictionary, compiling it on first use.
+
+    When the version has moved, the dictionary is recompiled in the
+    background and the old one is returned meanwhile.
+    """
+    global _checked_at
+    dictionary = _dictionary
+    now = time.monotonic()
+    if dictionary is not None and now - _checked_at < CHECK_INTERVAL:
+        return dictionary
+    with _dictionary_lock:
+        if _dictionary is None:
+            _swap(build_dictionary(current_version()))
+        else:
+            _checked_at = now
+            if _dictionary.version != current_version():
+                _rebuild_later()
+        return _dictionary
+
+
+def _swap(dictionary):
+    global _dictionary, _checked_at
+    _dictionary = dictionary
+    _checked_at = time.monotonic()
+
+
+def _rebuild_later():
+    global _rebuilder
+    if _rebuilder is not None and _rebuilder.is_alive():
+        return
+    _rebuilder = threading.Thread(target=_rebuild, name='synonym-rebuild', daemon=True)
+    _rebuilder.start()
+
+
+def _rebuild():
+    try:
+        dictionary = build_dictionary(current_version())
+        with _dictionary_lock:
+            _swap(dictionary)
+    except Exception:
+        # Requests keep the old dictionary; the next check retries
+        logger.exception('Could not rebuild the search synonym dictionary')
+    finally:
+        connection.close()
+
+
+def warm_dictionary():
+    """(Re)compile the process-wide dictionary and swap it in"""
+    dictionary = build_dictionary(current_version())
+    with _dictionary_lock:
+        _swap(dictionary)
+    return dictionary
+
+
+def _bump_version():
+    global _checked_at
+    result_cache.incr(VERSION_KEY)
+    _checked_at = 0.0
+
+
+def invalidate_dictionary():
+    """Have every process recompile the dictionary; called on synonym/skill writes.
+
+    As with the result cache generation, the version is bumped again once
+    the surrounding transaction commits, so a dictionary compiled by another
+    request before the commit is not kept.
+    """
+    transaction.on_commit(_bump_version)
+    _bump_version()
+
+
+def analyze(query):
+    """Return the expanded query groups for a search box value"""
+    return get_dictionary().analyze(query)
@@ -0,0 +1,331 @@
+"""Process-local autocomplete over job titles, company names and skills.
+
+Every word of every suggestion is indexed under each of its prefixes (up
+to ``MAX_PREFIX`` characters), and the posting list of a prefix is kept in
+popularity order once it has been asked for, so a lookup is a dict hit plus
+a short walk down an already sorted list. Queries are expanded with the
+search synonym dictionary first ("ML" also suggests "Machine Learning"),
+which is compiled in memory too, so nothing on the lookup path touches the
+database.
+
+The index is built from the database once per process (see
+``warm_autocomplete``, called from wsgi/asgi start-up, or lazily on first
+use) and then kept current by the Job/Company/Skill signal handlers. The
+handlers only reach this process; writes made by other workers are picked
+up by a rebuild (see ``ProcessIndex`` in ``jobs.search.cache``).
+"""
+import heapq
+import threading
+import unicodedata
+from collections import defaultdict
+from urllib.parse import urlencode
+
+from django.conf import settings
+
+from .backends import TERM_RE
+from .cache import ProcessIndex
+
+MAX_PREFIX = getattr(settings, 'AUTOCOMPLETE_MAX_PREFIX', 12)
+
+JOB_TITLE = 'job'
+COMPANY = 'company'
+SKILL = 'skill'
+
+
+def normalize(text):
+    """Lower-case, strip accents and split into word tokens"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return TERM_RE.findall(text.lower())
+
+
+class Suggestion:
+    """One completion candidate and its popularity"""
+
+    __slots__ = ('key', 'kind', 'text', 'count', 'object_id', 'jobs', 'words', 'prefixes')
+
+    def __init__(self, key, kind, text, count=0, object_id=None):
+        self.key = key
+        self.kind = kind
+        self.text = text
+        self.count = count
+        self.object_id = object_id
+        # Job titles only: job id -> (company id, location) of each job
+        self.jobs = {}
+        self.words = normalize(text)
+        self.prefixes = {
+            word[:length]
+            for word in self.words
+            for length in range(1, min(len(word), MAX_PREFIX) + 1)
+        }
+
+    @property
+    def url(self):
+        if self.kind == COMPANY:
+            return f'/companies/{self.object_id}/'
+        return '/jobs/?' + urlencode({'search': self.text})
+
+    def as_dict(self):
+        return {
+            'title': self.text,
+            'type': self.kind,
+            'count': self.count,
+            'url': self.url,
+        }
+
+
+class AutocompleteIndex:
+    """Prefix index with popularity-ordered posting lists"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._postings = defaultdict(set)
+        self._ranked = {}
+        # job id -> (title key, company id) of what the job contributed
+        self._jobs = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    # Maintenance
+
+    def _add(self, suggestion):
+        self._entries[suggestion.key] = suggestion
+        for prefix in suggestion.prefixes:
+            self._postings[prefix].add(suggestion.key)
+        self._invalidate(suggestion)
+
+    def _discard(self, key):
+        suggestion = self._entries.pop(key, None)
+        if suggestion is None:
+            return
+        for prefix in suggestion.prefixes:
+            keys = self._postings.get(prefix)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[prefix]
+        self._invalidate(suggestion)
+
+    def _invalidate(self, suggestion):
+        for prefix in suggestion.prefixes:
+            self._ranked.pop(prefix, None)
+
+    def _bump(self, key, delta):
+        suggestion = self._entries.get(key)
+        if suggestion is None:
+            return
+        suggestion.count += delta
+        if suggestion.kind == JOB_TITLE and suggestion.count <= 0:
+            self._discard(key)
+        else:
+            self._invalidate(suggestion)
+
+    def _add_job(self, job_id, title, company_id, location):
+        words = normalize(title)
+        if not words:
+            return
+        key = (JOB_TITLE, ' '.join(words))
+        if key not in self._entries:
+            self._add(Suggestion(key, JOB_TITLE, title.strip()))
+        self._entries[key].jobs[job_id] = (company_id, location)
+        self._bump(key, 1)
+        self._bump((COMPANY, company_id), 1)
+        self._jobs[job_id] = (key, company_id)
+
+    def update_job(self, job_id, title, company_id, location, is_active):
+        with self._lock:
+            self.remove_job(job_id)
+            if is_active:
+                self._add_job(job_id, title, company_id, location)
+
+    def remove_job(self, job_id):
+        with self._lock:
+            previous = self._jobs.pop(job_id, None)
+            if previous is not None:
+                title_key, company_id = previous
+                title = self._entries.get(title_key)
+                if title is not None:
+                    title.jobs.pop(job_id, None)
+                self._bump(title_key, -1)
+                self._bump((COMPANY, company_id), -1)
+
+    def update_company(self, company_id, name):
+        key = (COMPANY, company_id)
+        with self._lock:
+            previous = self._entries.get(key)
+            count = previous.count if previous is not None else 0
+            self._discard(key)
+            self._add(Suggestion(key, COMPANY, name, count, company_id))
+
+    def remove_company(self, company_id):
+        with self._lock:
+            self._discard((COMPANY, company_id))
+
+    def update_skill(self, skill_id, name, usage_count):
+        key = (SKILL, skill_id)
+        with self._lock:
+            self._discard(key)
+            self._add(Suggestion(key, SKILL, name, usage_count, skill_id))
+
+    def remove_skill(self, skill_id):
+        with self._lock:
+            self._discard((SKILL, skill_id))
+
+    # Lookup
+
+    def describe(self, suggestion):
+        """The response item of ``suggestion``.
+
+        Job titles keep the keys this endpoint returned when it listed single
+        jobs (``company``, ``location`` and ``url`` of the newest job with
+        the title), and link to the title search as ``search_url``.
+        """
+        item = suggestion.as_dict()
+        if suggestion.kind == JOB_TITLE:
+            with self._lock:
+                job_id = max(suggestion.jobs, default=None)
+                if job_id is not None:
+                    company_id, location = suggestion.jobs[job_id]
+                    company = self._entries.get((COMPANY, company_id))
+            item['search_url'] = item['url']
+            if job_id is not None:
+                item.update(
+                    company=company.text if company is not None else '',
+                    location=location,
+                    url=f'/jobs/{job_id}/',
+                )
+        return item
+
+    def _ranked_keys(self, prefix):
+        ranked = self._ranked.get(prefix)
+        if ranked is None:
+            entries = self._entries
+            ranked = sorted(
+                self._postings.get(prefix, ()),
+                key=lambda key: (-entries[key].count, entries[key].text),
+            )
+            self._ranked[prefix] = ranked
+        return ranked
+
+    def _matching(self, words):
+        """Keys of the suggestions with a word starting with each of ``words``"""
+        postings = sorted(
+            (self._postings.get(word[:MAX_PREFIX], set()) for word in words), key=len
+        )
+        keys = set(postings[0])
+        for other in postings[1:]:
+            keys &= other
+        long_words = [word for word in words if len(word) > MAX_PREFIX]
+        if long_words:
+            keys = {
+                key for key in keys
+                if all(
+                    any(word.startswith(token) for word in self._entries[key].words)
+                    for token in long_words
+                )
+            }
+        return keys
+
+    def _suggest_expanded(self, groups, limit):
+        keys = None
+        for group in sorted(groups, key=len):
+            matched = set().union(*(self._matching(words) for words, _ in group))
+            keys = matched if keys is None else keys & matched
+            if not keys:
+                return []
+        entries = self._entries
+        ranked = heapq.nsmallest(
+            limit, keys, key=lambda key: (-entries[key].count, entries[key].text)
+        )
+        return [entries[key] for key in ranked]
+
+    def suggest(self, query, limit=5, groups=None):
+        """Return up to ``limit`` suggestions matching every query word.
+
+        Each query word must be the prefix of some word of the suggestion;
+        results are ordered by popularity. ``groups`` is the analyzed query
+        (see ``analysis``); a group with several alternatives matches when
+        any of them does.
+        """
+        if groups is None:
+            tokens = normalize(query)
+        elif any(len(group) > 1 for group in groups):
+            with self._lock:
+                return self._suggest_expanded(groups, limit)
+        else:
+            tokens = [word for group in groups for word in group[0][0]]
+        if not tokens:
+            return []
+        with self._lock:
+            prefixes = sorted(
+                {token[:MAX_PREFIX] for token in tokens},
+                key=lambda prefix: len(self._postings.get(prefix, ())),
+            )
+            others = [self._postings.get(prefix, set()) for prefix in prefixes[1:]]
+            # Tokens longer than MAX_PREFIX need checking against the words
+            long_tokens = [token for token in tokens if len(token) > MAX_PREFIX]
+            results = []
+            for key in self._ranked_keys(prefixes[0]):
+                if any(key not in keys for keys in others):
+                    continue
+                suggestion = self._entries[key]
+                if long_tokens and not all(
+                    any(word.startswith(token) for word in suggestion.words)
+                    for token in long_tokens
+                ):
+                    continue
+                results.append(suggestion)
+                if len(results) >= limit:
+                    break
+            return results
+
+
+def build_index():
+    """Build a fresh index from the database"""
+    from jobs.models.company import Company
+    from jobs.models.job import Job
+    from jobs.models.skills import Skill
+
+    index = AutocompleteIndex()
+    for company_id, name in Company.objects.values_list('id', 'name').iterator():
+        index.update_company(company_id, name)
+    for skill_id, name, usage_count in Skill.objects.values_list(
+        'id', 'name', 'usage_count'
+    ).iterator():
+        index.update_skill(skill_id, name, usage_count)
+    jobs = Job.objects.filter(is_active=True).values_list('id', 'title', 'company_id', 'location')
+    for job_id, title, company_id, location in jobs.iterator(chunk_size=5000):
+        index._add_job(job_id, title, company_id, location)
+    return index
+
+
+_index = ProcessIndex(build_index)
+
+
+def get_autocomplete():
+    """Return the process-wide index, building it on first use"""
+    return _index.get()
+
+
+def warm_autocomplete():
+    """(Re)build the process-wide index and swap it in"""
+    return _index.warm()
+
+
+def loaded_autocomplete():
+    """Return the index if this process has built one, else ``None``.
+
+    Signal handlers use this so a save never triggers a full build; an
+    unbuilt index will read the change from the database when it is built.
+    """
+    return _index.loaded()
+
+
+def suggest(query, limit=5):
+    from .analysis import analyze
+
+    index = get_autocomplete()
+    suggestions = index.suggest(query, limit, analyze(query))
+    return [index.describe(suggestion) for suggestion in suggestions]
@@ -0,0 +1,186 @@
+import re
+
+from django.db import connection
+
+TABLE_NAME = 'jobs_job_search'
+
+# Per-column weights handed to the ranking function, in column order:
+# title, description, requirements, company_name
+COLUMN_WEIGHTS = (10.0, 1.0, 2.0, 5.0)
+
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize_query(query):
+    """Split a raw search box value into plain word terms.
+
+    Everything that is not a word character is dropped, so user input can
+    never reach the backend as MATCH / tsquery syntax.
+    """
+    return [term.lower() for term in TERM_RE.findall(query or '')]
+
+
+def document_for(job):
+    """Return the indexed columns for a job, in column order"""
+    return (
+        job.title or '',
+        job.description or '',
+        job.requirements or '',
+        job.company.name if job.company_id else '',
+    )
+
+
+class SQLiteSearchBackend:
+    """FTS5 backend for the default SQLite database.
+
+    Uses a regular FTS5 table keyed by ``rowid = jobs_job.id`` and orders
+    matches with the built-in ``bm25()`` function.
+    """
+
+    vendor = 'sqlite'
+
+    def create_table(self, cursor):
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE_NAME} USING fts5("
+            "title, description, requirements, company_name, "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+
+    def drop_table(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE_NAME}")
+
+    def build_query(self, groups):
+        # Every word is quoted (so it is never parsed as an operator) and,
+        # unless the alternative is an exact phrase, prefix-matched, which
+        # keeps "dev" finding "developer" the way the old icontains did.
+        def alternative(words, exact):
+            if exact:
+                return '"%s"' % ' '.join(words)
+            return ' AND '.join('"%s"*' % word for word in words)
+        return ' AND '.join(
+            '(%s)' % ' OR '.join('(%s)' % alternative(*alt) for alt in group)
+            for group in groups
+        )
+
+    def upsert(self, cursor, rows):
+        rows = list(rows)
+        if not rows:
+            return
+        self.delete(cursor, [row[0] for row in rows])
+        cursor.executemany(
+            f"INSERT INTO {TABLE_NAME} "
+            "(rowid, title, description, requirements, company_name) "
+            "VALUES (%s, %s, %s, %s, %s)",
+            rows,
+        )
+
+    def delete(self, cursor, job_ids):
+        cursor.executemany(
+            f"DELETE FROM {TABLE_NAME} WHERE rowid = %s",
+            [(job_id,) for job_id in job_ids],
+        )
+
+    def clear(self, cursor):
+        cursor.execute(f"DELETE FROM {TABLE_NAME}")
+
+    def search(self, cursor, groups, limit):
+        weights = ', '.join(str(weight) for weight in COLUMN_WEIGHTS)
+        # bm25() is "lower is better", so negate it to hand back a score
+        # where higher means more relevant, like the Postgres backend.
+        cursor.execute(
+            f"SELECT s.rowid, -bm25({TABLE_NAME}, {weights}) AS score "
+            f"FROM {TABLE_NAME} s "
+            "INNER JOIN jobs_job j ON j.id = s.rowid "
+            f"WHERE {TABLE_NAME} MATCH %s AND j.is_active "
+            "ORDER BY score DESC, s.rowid DESC LIMIT %s",
+            [self.build_query(groups), limit],
+        )
+        return cursor.fetchall()
+
+
+class PostgresSearchBackend:
+    """tsvector + GIN backend for PostgreSQL.
+
+    PostgreSQL has no BM25 built in; ``ts_rank_cd`` with document length
+    normalisation (flag 1) over A-D weighted columns is the closest native
+    equivalent and is what this backend ranks with.
+    """
+
+    vendor = 'postgresql'
+    config = 'english'
+
+    def create_table(self, cursor):
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {TABLE_NAME} ("
+            "job_id bigint PRIMARY KEY REFERENCES jobs_job (id) "
+            "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "document tsvector NOT NULL)"
+        )
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {TABLE_NAME}_document_idx "
+            f"ON {TABLE_NAME} USING GIN (document)"
+        )
+
+    def drop_table(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE_NAME}")
+
+    def build_query(self, groups):
+        def alternative(words, exact):
+            if exact:
+                return ' <-> '.join(words)
+            return ' & '.join('%s:*' % word for word in words)
+        return ' & '.join(
+            '(%s)' % ' | '.join('(%s)' % alternative(*alt) for alt in group)
+            for group in groups
+        )
+
+    def upsert(self, cursor, rows):
+        document = (
+            "setweight(to_tsvector(%(config)s, %%s), 'A') || "
+            "setweight(to_tsvector(%(config)s, %%s), 'C') || "
+            "setweight(to_tsvector(%(config)s, %%s), 'B') || "
+            "setweight(to_tsvector(%(config)s, %%s), 'B')"
+        ) % {'config': "'%s'" % self.config}
+        cursor.executemany(
+            f"INSERT INTO {TABLE_NAME} (job_id, document) "
+            f"VALUES (%s, {document}) "
+            "ON CONFLICT (job_id) DO UPDATE SET document = EXCLUDED.document",
+            list(rows),
+        )
+
+    def delete(self, cursor, job_ids):
+        cursor.execute(
+            f"DELETE FROM {TABLE_NAME} WHERE job_id = ANY(%s)", [list(job_ids)]
+        )
+
+    def clear(self, cursor):
+        cursor.execute(f"TRUNCATE {TABLE_NAME}")
+
+    def search(self, cursor, groups, limit):
+        cursor.execute(
+            "SELECT s.job_id, ts_rank_cd(s.document, q, 1) AS score "
+            f"FROM {TABLE_NAME} s "
+            "INNER JOIN jobs_job j ON j.id = s.job_id, "
+            f"to_tsquery('{self.config}', %s) q "
+            "WHERE s.document @@ q AND j.is_active "
+            "ORDER BY score DESC, s.job_id DESC LIMIT %s",
+            [self.build_query(groups), limit],
+        )
+        return cursor.fetchall()
+
+
+BACKENDS = {
+    SQLiteSearchBackend.vendor: SQLiteSearchBackend,
+    PostgresSearchBackend.vendor: PostgresSearchBackend,
+}
+
+
+def get_backend(vendor=None):
+    """Return the search backend for the given (or default) database vendor"""
+    vendor = vendor or connection.vendor
+    try:
+        return BACKENDS[vendor]()
+    except KeyError:
+        raise NotImplementedError(
+            f"Full-text job search is not available on '{vendor}' databases"
+        )
@@ -0,0 +1,243 @@
+"""Result cache for job listing/search pages.
+
+Entries are keyed by the normalized ``(search, location, job_type, cursor,
+page_size, salary, near, sort, preferences)`` tuple and hold the page's
+ordered job ids, its cursors and the facet block (which carries the total
+count). Every key also embeds the current *generation*, a counter bumped
+by the Job/Company save and delete signals, so a write makes every older
+entry unreachable at once and a stale page is never served. Old entries
+simply age out of the cache.
+
+Hit and miss counters are kept in the same cache for monitoring (see
+``stats()`` and the ``search_cache_stats`` API view).
+
+The generation only reaches other processes through a shared cache
+(Redis, Memcached, the database cache). With the default local-memory
+cache each worker has its own generation and its own entries, so a write
+in one worker leaves the others serving their old pages until
+``JOB_SEARCH_CACHE_TIMEOUT`` (300 seconds) expires them. The ``jobs.W001``
+system check warns about this. A multi-process deployment must configure
+a shared ``CACHES['default']``.
+
+The autocomplete, facet and ranking indexes are process-local too. The
+signal handlers only update them in the worker that made the write. Each
+is held in a ``ProcessIndex``, which rebuilds it when another process has
+moved the shared generation since it was built, checking at most every
+``JOB_SEARCH_INDEX_MAX_AGE`` seconds (default 60). That bounds how far
+behind another worker's writes an index can be. Each process counts its
+own bumps, so when the generation moved by exactly that many the signals
+have already applied every change and nothing is rebuilt. A rebuild runs
+in a background thread; readers keep the old index until the new one is
+swapped in. With a local cache there is nothing to compare against, so
+the indexes follow only the writes of their own process.
+"""
+import hashlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from . import analysis
+
+logger = logging.getLogger(__name__)
+
+TIMEOUT = getattr(settings, 'JOB_SEARCH_CACHE_TIMEOUT', 300)
+
+INDEX_MAX_AGE = getattr(settings, 'JOB_SEARCH_INDEX_MAX_AGE', 60)
+
+# Cache backends that are not shared between processes
+LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+GENERATION_KEY = 'jobsearch:generation'
+HITS_KEY = 'jobsearch:hits'
+MISSES_KEY = 'jobsearch:misses'
+
+# Generation bumps made by this process, applied to its indexes by the signals
+_own_bumps = 0
+_own_lock = threading.Lock()
+
+
+def is_shared():
+    """Whether the default cache is shared between processes"""
+    backend = settings.CACHES.get('default', {}).get('BACKEND', LOCAL_BACKENDS[0])
+    return backend not in LOCAL_BACKENDS
+
+
+def normalize(search='', location='', job_type='', cursor='', page_size=None,
+              salary=None, near=None, sort='', preferences=None):
+    """Return the canonical cache tuple for a listing request.
+
+    Search terms are ANDed and ranked order-independently, so the analyzed
+    query groups are de-duplicated and sorted; location matching is
+    case-insensitive.
+    """
+    return (
+        tuple(sorted(set(analysis.analyze(search)))),
+        ' '.join((location or '').lower().split()),
+        job_type or '',
+        cursor or '',
+        page_size,
+        salary.key() if salary else None,
+        near.key() if near else None,
+        sort or '',
+        preferences.key() if preferences else None,
+    )
+
+
+def incr(key, delta=1):
+    """Add ``delta`` to the counter ``key`` in the default cache; returns the new value"""
+    # cache.incr() refuses missing keys; add() is a no-op when present
+    cache.add(key, 0, timeout=None)
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        cache.set(key, delta, timeout=None)
+        return delta
+
+
+def generation():
+    value = cache.get(GENERATION_KEY)
+    if value is None:
+        cache.add(GENERATION_KEY, 1, timeout=None)
+        value = cache.get(GENERATION_KEY, 1)
+    return value
+
+
+def bump_generation():
+    """Invalidate every cached page; called on Job/Company writes.
+
+    The counter is bumped again once the surrounding transaction commits,
+    so a page computed by another request before the commit is not kept.
+    """
+    transaction.on_commit(_bump)
+    return _bump()
+
+
+def _bump():
+    global _own_bumps
+    # Counted first: a check in between sees the bump as another process's
+    with _own_lock:
+        _own_bumps += 1
+    return incr(GENERATION_KEY)
+
+
+def own_bumps():
+    return _own_bumps
+
+
+def _key(params):
+    digest = hashlib.md5(repr(params).encode()).hexdigest()
+    return f'jobsearch:{generation()}:{digest}'
+
+
+def get_or_compute(params, compute):
+    """Return the cached entry for ``params`` or store ``compute()``"""
+    key = _key(params)
+    entry = cache.get(key)
+    if entry is not None:
+        incr(HITS_KEY)
+        return entry
+    incr(MISSES_KEY)
+    entry = compute()
+    cache.set(key, entry, TIMEOUT)
+    return entry
+
+
+def stats():
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / lookups if lookups else None,
+        'miss_ratio': misses / lookups if lookups else None,
+        'generation': generation(),
+    }
+
+
+def reset_stats():
+    cache.delete_many([HITS_KEY, MISSES_KEY])
+
+
+class ProcessIndex:
+    """A process-local index, built on first use and rebuilt after other processes' writes"""
+
+    def __init__(self, build):
+        self.build = build
+        self.index = None
+        self.generation = None
+        self.own = 0
+        self.checked = 0
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def get(self):
+        index = self.index
+        if index is not None and (
+            not is_shared() or time.monotonic() - self.checked < INDEX_MAX_AGE
+        ):
+            return index
+        with self.lock:
+            if self.index is None:
+                self._swap(*self._build())
+            elif time.monotonic() - self.checked >= INDEX_MAX_AGE:
+                self.checked = time.monotonic()
+                if not self._current():
+                    self._rebuild_later()
+            return self.index
+
+    def _current(self):
+        """Whether the generation moved only by this process's own bumps since the build"""
+        if self.generation is None:
+            return False
+        own = own_bumps()
+        current = generation()
+        if current - self.generation != own - self.own:
+            return False
+        self.generation, self.own = current, own
+        return True
+
+    def _build(self):
+        # Read first: a write during the build moves them again
+        own, current = own_bumps(), generation()
+        return self.build(), current, own
+
+    def _swap(self, index, current, own):
+        self.index, self.checked = index, time.monotonic()
+        # An own write during the build went to the old index only
+        self.generation = current if own_bumps() == own else None
+        self.own = own
+
+    def _rebuild_later(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.thread = threading.Thread(target=self._rebuild, name='index-rebuild', daemon=True)
+        self.thread.start()
+
+    def _rebuild(self):
+        try:
+            built = self._build()
+            with self.lock:
+                self._swap(*built)
+        except Exception:
+            # Readers keep the old index; the next check retries
+            logger.exception('Could not rebuild a search index')
+        finally:
+            connection.close()
+
+    def warm(self):
+        """(Re)build the index now and swap it in"""
+        built = self._build()
+        with self.lock:
+            self._swap(*built)
+        return self.index
+
+    def loaded(self):
+        return self.index
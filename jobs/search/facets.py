@@ -0,0 +1,322 @@
+"""Facet counts for the job listing, computed from in-memory posting lists.
+
+For every facet value (each job type, location, company and salary band)
+the index keeps the set of active job ids carrying it, plus a per-field
+``job id -> value`` column. Filters are applied by intersecting the search
+result set with the posting lists of the selected values; every facet is
+then counted in one pass over the surviving ids using the columns. With no
+filters the posting list sizes already are the answer. None of this
+touches the database.
+
+Facets are disjunctive: the job type counts ignore the selected job type,
+the location counts ignore the location filter and the salary band counts
+ignore the salary filter, so the sidebar shows what each alternative choice
+would return. Salary range filters are answered from a ``SalaryGrid`` (see
+``jobs.search.salary``). Jobs whose location resolved to a gazetteer place
+(``jobs.geo``) are counted under the place's canonical label, and those
+posting lists double as the per-place job lists of the radius search.
+
+Like the autocomplete index this is process-local, built on first use and
+kept current by the Job/Company signal handlers, and rebuilt after other
+workers' writes (see ``ProcessIndex`` in ``jobs.search.cache``).
+"""
+import threading
+from collections import Counter
+
+from django.conf import settings
+
+from jobs.models.job import Job
+
+from jobs.geo.gazetteer import display_location, get_gazetteer
+
+from .cache import ProcessIndex
+from .salary import SalaryGrid, effective_range
+
+TOP_N = 10
+
+# (lower, upper) in salary units; ``None`` means unbounded
+SALARY_BANDS = getattr(settings, 'JOB_SALARY_BANDS', [
+    (None, 50000),
+    (50000, 100000),
+    (100000, 150000),
+    (150000, 200000),
+    (200000, None),
+])
+UNSPECIFIED_SALARY = 'unspecified'
+
+
+def band_key(lower, upper):
+    return f"{lower or ''}-{upper or ''}"
+
+
+def band_label(lower, upper):
+    if lower is None:
+        return f"Under ${upper // 1000}k"
+    if upper is None:
+        return f"${lower // 1000}k+"
+    return f"${lower // 1000}k - ${upper // 1000}k"
+
+
+def salary_bands_for(salary_min, salary_max):
+    """Return the keys of every band the job's salary range overlaps.
+
+    Bands are inclusive at both ends, like an ``overlap`` salary filter on
+    the band's bounds, so a band's count is what its filter link returns.
+    """
+    salary = effective_range(salary_min, salary_max)
+    if salary is None:
+        return [UNSPECIFIED_SALARY]
+    low, high = salary
+    return [
+        band_key(lower, upper)
+        for lower, upper in SALARY_BANDS
+        if (upper is None or low <= upper) and (lower is None or high >= lower)
+    ]
+
+
+class FacetIndex:
+    """Per-value posting lists and per-job columns of active jobs"""
+
+    FIELDS = ('job_type', 'location', 'company', 'salary')
+    # Fields a job can carry several values of
+    MULTI_VALUED = ('salary',)
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = {field: {} for field in self.FIELDS}
+        self._columns = {field: {} for field in self.FIELDS}
+        self._salary = SalaryGrid()
+        self.company_names = {}
+
+    def __len__(self):
+        return len(self._columns['job_type'])
+
+    def _values(self, field, value):
+        return value if field in self.MULTI_VALUED else (value,)
+
+    def update_job(self, job_id, job_type, location, company_id,
+                   salary_min, salary_max, is_active, place_id=''):
+        with self._lock:
+            self.remove_job(job_id)
+            if not is_active:
+                return
+            row = {
+                'job_type': job_type,
+                # Resolved places count under their canonical label
+                'location': display_location(location, place_id),
+                'company': company_id,
+                'salary': salary_bands_for(salary_min, salary_max),
+            }
+            for field, value in row.items():
+                self._columns[field][job_id] = value
+                postings = self._postings[field]
+                for item in self._values(field, value):
+                    postings.setdefault(item, set()).add(job_id)
+            salary = effective_range(salary_min, salary_max)
+            if salary is not None:
+                self._salary.add(job_id, *salary)
+
+    def remove_job(self, job_id):
+        with self._lock:
+            self._salary.remove(job_id)
+            for field in self.FIELDS:
+                value = self._columns[field].pop(job_id, None)
+                if value is None:
+                    continue
+                postings = self._postings[field]
+                for item in self._values(field, value):
+                    ids = postings.get(item)
+                    if ids is not None:
+                        ids.discard(job_id)
+                        if not ids:
+                            del postings[item]
+
+    def update_company(self, company_id, name):
+        with self._lock:
+            self.company_names[company_id] = name
+
+    def remove_company(self, company_id):
+        with self._lock:
+            self.company_names.pop(company_id, None)
+
+    def _restrict(self, ids, field, accepted):
+        """Return the jobs of ``ids`` (``None`` = all) whose ``field`` is accepted"""
+        if ids is None:
+            postings = self._postings[field]
+            return set().union(*(postings.get(value, ()) for value in accepted))
+        column = self._columns[field]
+        return [job_id for job_id in ids if column[job_id] in accepted]
+
+    def _count(self, field, ids):
+        """Count the values of ``field`` over ``ids`` (``None`` = all)"""
+        if ids is None:
+            return Counter({value: len(jobs) for value, jobs in self._postings[field].items()})
+        column = self._columns[field]
+        if field in self.MULTI_VALUED:
+            return Counter(value for job_id in ids for value in column[job_id])
+        return Counter(column[job_id] for job_id in ids)
+
+    def _locations(self, location):
+        """The location values a ``?location=`` filter accepts.
+
+        A place name matches that place's label exactly (mirroring
+        ``jobs.geo.location_q``), anything else by substring.
+        """
+        place = get_gazetteer().resolve(location)
+        if place is not None:
+            return {place.label}
+        needle = location.strip().lower()
+        return {value for value in self._postings['location'] if needle in value.lower()}
+
+    def jobs_at(self, place):
+        """Return the ids of active jobs resolved to ``place``"""
+        return self._postings['location'].get(place.label, set())
+
+    def location_of(self, job_id):
+        return self._columns['location'].get(job_id)
+
+    def jobs_near(self, places, ranked=None):
+        """Return the ids of jobs at ``places`` (``[(place, km)]``), nearest first.
+
+        Jobs at the same place keep their order in ``ranked`` (search
+        results) and drop out if absent from it; without ``ranked`` the
+        newest (highest id) come first.
+        """
+        rank = None if ranked is None else {job_id: position for position, job_id in enumerate(ranked)}
+        ids = []
+        with self._lock:
+            for place, _ in places:
+                here = self.jobs_at(place)
+                if rank is None:
+                    ids.extend(sorted(here, reverse=True))
+                else:
+                    ids.extend(sorted((job_id for job_id in here if job_id in rank), key=rank.__getitem__))
+        return ids
+
+    def matching(self, ids, location='', job_type='', salary=None):
+        """Return the jobs of the ``ids`` list passing the filters, in order.
+
+        ``ids`` of None stands for every active job, in no particular order.
+        """
+        with self._lock:
+            active = self._columns['job_type']
+            if ids is None:
+                ids = list(active)
+            else:
+                ids = [job_id for job_id in ids if job_id in active]
+            if salary is not None:
+                ids = self._salary.filter(ids, salary)
+            if location:
+                ids = self._restrict(ids, 'location', self._locations(location))
+            if job_type:
+                ids = self._restrict(ids, 'job_type', {job_type})
+            return ids
+
+    def _filter_salary(self, ids, salary):
+        if ids is None:
+            return self._salary.select(salary)
+        return self._salary.filter(ids, salary)
+
+    def facets(self, ids=None, location='', job_type='', salary=None, top=TOP_N):
+        """Return facet counts for the jobs matching the given filters.
+
+        ``ids`` is the full-text result set (``None`` when not searching);
+        ``location`` and ``job_type`` follow ``job_list`` semantics and
+        ``salary`` is a ``SalaryRange`` or None.
+        """
+        with self._lock:
+            base = None
+            if ids is not None:
+                active = self._columns['job_type']
+                base = [job_id for job_id in ids if job_id in active]
+            unsalaried = base
+            if salary is not None:
+                base = self._filter_salary(base, salary)
+            by_location = base
+            if location:
+                accepted_locations = self._locations(location)
+                by_location = self._restrict(base, 'location', accepted_locations)
+            by_type = base
+            selected = by_location
+            if job_type:
+                by_type = self._restrict(base, 'job_type', {job_type})
+                selected = self._restrict(by_location, 'job_type', {job_type})
+
+            # Disjunctive facets ignore their own filter, so job type and
+            # location are counted over slightly wider sets than the rest.
+            job_types = self._count('job_type', by_location)
+            locations = self._count('location', by_type)
+            companies = self._count('company', selected)
+            if salary is None:
+                salaries = self._count('salary', selected)
+            else:
+                if location:
+                    unsalaried = self._restrict(unsalaried, 'location', accepted_locations)
+                if job_type:
+                    unsalaried = self._restrict(unsalaried, 'job_type', {job_type})
+                salaries = self._count('salary', unsalaried)
+            locations.pop('', None)
+
+            bands = [(band_key(lower, upper), band_label(lower, upper), lower, upper)
+                     for lower, upper in SALARY_BANDS]
+            bands.append((UNSPECIFIED_SALARY, 'Not specified', None, None))
+            return {
+                'total': len(self) if selected is None else len(selected),
+                'job_type': [
+                    {'value': value, 'label': label, 'count': job_types[value]}
+                    for value, label in Job.JOB_TYPE_CHOICES
+                ],
+                'location': [
+                    {'value': value, 'count': count}
+                    for value, count in locations.most_common(top)
+                ],
+                'company': [
+                    {'id': value, 'name': self.company_names.get(value, ''), 'count': count}
+                    for value, count in companies.most_common(top)
+                ],
+                'salary': [
+                    {
+                        'value': key,
+                        'label': label,
+                        'min': lower,
+                        'max': upper,
+                        'count': salaries[key],
+                    }
+                    for key, label, lower, upper in bands
+                ],
+            }
+
+
+def build_index():
+    """Build a fresh facet index from the database"""
+    from jobs.models.company import Company
+
+    index = FacetIndex()
+    for company_id, name in Company.objects.values_list('id', 'name').iterator():
+        index.update_company(company_id, name)
+    jobs = Job.objects.filter(is_active=True).values_list(
+        'id', 'job_type', 'location', 'company_id', 'salary_min', 'salary_max', 'place_id'
+    )
+    for job_id, job_type, location, company_id, salary_min, salary_max, place_id in jobs.iterator(chunk_size=5000):
+        index.update_job(
+            job_id, job_type, location, company_id, salary_min, salary_max, True, place_id
+        )
+    return index
+
+
+_index = ProcessIndex(build_index)
+
+
+def get_facets():
+    """Return the process-wide facet index, building it on first use"""
+    return _index.get()
+
+
+def warm_facets():
+    """(Re)build the process-wide facet index and swap it in"""
+    return _index.warm()
+
+
+def loaded_facets():
+    """Return the facet index if this process has built one, else ``None``"""
+    return _index.loaded()
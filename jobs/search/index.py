@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.db import connection, transaction
+
+from jobs.models.job import Job
+from .analysis import analyze
+from .backends import document_for, get_backend
+
+# Upper bound on how many ranked hits a single query returns; job lists that
+# reach it are flagged as truncated (see ``search_capped``)
+MAX_RESULTS = getattr(settings, 'JOB_SEARCH_MAX_RESULTS', 1000)
+
+# Rows per INSERT batch when (re)building the index
+BATCH_SIZE = 2000
+
+
+def index_jobs(jobs):
+    """Add or refresh the index entries for the given jobs"""
+    backend = get_backend()
+    rows = [(job.pk,) + document_for(job) for job in jobs]
+    with connection.cursor() as cursor:
+        backend.upsert(cursor, rows)
+
+
+def remove_jobs(job_ids):
+    """Drop the index entries for the given job ids"""
+    job_ids = list(job_ids)
+    if not job_ids:
+        return
+    backend = get_backend()
+    with connection.cursor() as cursor:
+        backend.delete(cursor, job_ids)
+
+
+def reindex_company(company):
+    """Refresh every job of a company, e.g. after it was renamed"""
+    jobs = Job.objects.filter(company=company).select_related('company')
+    index_jobs(jobs.iterator(chunk_size=BATCH_SIZE))
+
+
+def rebuild_index(batch_size=BATCH_SIZE):
+    """Rebuild the whole index from the Job table. Returns the row count."""
+    backend = get_backend()
+    jobs = Job.objects.select_related('company').order_by('pk')
+    indexed = 0
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            backend.clear(cursor)
+            batch = []
+            for job in jobs.iterator(chunk_size=batch_size):
+                batch.append((job.pk,) + document_for(job))
+                if len(batch) >= batch_size:
+                    backend.upsert(cursor, batch)
+                    indexed += len(batch)
+                    batch = []
+            backend.upsert(cursor, batch)
+            indexed += len(batch)
+    return indexed
+
+
+def search(query, limit=None):
+    """Return ``[(job_id, score), ...]`` for active jobs, best match first.
+
+    The query is expanded first (stems, synonyms, acronyms; see
+    ``analysis``). Scores are only comparable within one result list;
+    higher is better.
+    """
+    groups = analyze(query)
+    if not groups:
+        return []
+    backend = get_backend()
+    with connection.cursor() as cursor:
+        return backend.search(cursor, groups, limit or MAX_RESULTS)
+
+
+def search_capped(query):
+    """``search(query)`` and whether more than ``MAX_RESULTS`` jobs matched"""
+    hits = search(query, MAX_RESULTS + 1)
+    return hits[:MAX_RESULTS], len(hits) > MAX_RESULTS
+
+
+def search_job_ids(query, limit=None):
+    """Return matching active job ids in rank order"""
+    return [job_id for job_id, _ in search(query, limit)]
+
+
+def rank_queryset(queryset, query, limit=None):
+    """Return the ids of ``queryset`` rows matching ``query``, best first.
+
+    The index supplies the ranking; ``queryset`` supplies any other filters
+    (location, job type, ...) so the two can be combined freely.
+    """
+    return filter_ranked(queryset, search_job_ids(query, limit))
+
+
+def filter_ranked(queryset, ranked_ids):
+    """Return the ids in ``ranked_ids`` that ``queryset`` contains, in order"""
+    if not ranked_ids:
+        return []
+    matched = set(queryset.filter(pk__in=ranked_ids).values_list('pk', flat=True))
+    return [pk for pk in ranked_ids if pk in matched]
+
+
+def load_in_order(queryset, ids):
+    """Fetch ``ids`` from ``queryset`` and return the objects in that order"""
+    objects = queryset.in_bulk(ids)
+    return [objects[pk] for pk in ids if pk in objects]
@@ -0,0 +1,394 @@
+"""Second-stage ranking of job listing/search candidates.
+
+A candidate id set (search hits or every job passing the filters) is scored
+in bulk over per-job feature columns kept in memory:
+
+* ``text``: the full-text score of the query, scaled to 0..1 by its best hit;
+* ``recency``: exponential decay on ``created_at``, halving every
+  ``HALF_LIFE_DAYS``;
+* ``salary``: 1 when the job states a salary;
+* ``company``: company profile quality, 0..1 (website, logo, a real
+  description, a resolved location);
+* ``match``: the share of the viewer's UserDetails preferences (places,
+  employment type, remote work, expected salary) the job meets.
+
+The score is ``sum(weight * feature)`` with the weights of
+``JOB_RANKING_WEIGHTS``, and the result is the top ``k`` ids. Every feature
+is an ``array.array`` column indexed by a per-job slot, and every scoring
+step is one operation over the gathered column: numpy when it is installed,
+otherwise ``map`` over C-level callables, which gives the same scores a
+small constant factor slower. Recency is stored as
+``exp((created_at - epoch) / tau)``, so the decay at query time is that
+column times one scalar.
+
+Like the facet index this is process-local, built on first use and kept
+current by the Job/Company signal handlers, and rebuilt after other
+workers' writes (see ``ProcessIndex`` in ``jobs.search.cache``).
+"""
+import heapq
+import math
+import operator
+import threading
+import time
+from array import array
+from itertools import repeat
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+
+from .cache import ProcessIndex
+from .salary import effective_range
+
+try:
+    import numpy
+except ImportError:  # optional: the pure Python path gives the same results
+    numpy = None
+
+DEFAULT_WEIGHTS = {
+    'text': 1.0,
+    'recency': 0.5,
+    'salary': 0.1,
+    'company': 0.2,
+    'match': 0.4,
+}
+WEIGHTS = {**DEFAULT_WEIGHTS, **getattr(settings, 'JOB_RANKING_WEIGHTS', {})}
+
+HALF_LIFE_DAYS = getattr(settings, 'JOB_RANKING_HALF_LIFE_DAYS', 14)
+
+# Seconds the cached base scores' recency may lag behind the clock
+REFRESH_SECONDS = getattr(settings, 'JOB_RANKING_REFRESH_SECONDS', 300)
+
+# Length of the ranked list a listing pages through; listings with more
+# candidates are flagged as truncated (see jobs.views._job_results)
+TOP_K = getattr(settings, 'JOB_RANKING_TOP_K', 1000)
+
+# ``?sort=`` values of the job listing
+RELEVANCE = 'relevance'
+NEWEST = 'newest'
+SORTS = (RELEVANCE, NEWEST)
+
+# UserDetails.employment_type_preference -> Job.job_type
+EMPLOYMENT_JOB_TYPES = {
+    'full_time': 'full-time',
+    'part_time': 'part-time',
+    'contract': 'contract',
+    'freelance': 'contract',
+    'internship': 'internship',
+}
+
+# Company descriptions shorter than this count as placeholders
+MIN_DESCRIPTION = 100
+
+
+def company_quality(website, logo, description, place_id):
+    """Share of the company profile quality signals present, 0..1"""
+    signals = (
+        bool(website),
+        bool(logo),
+        len((description or '').strip()) >= MIN_DESCRIPTION,
+        bool(place_id),
+    )
+    return sum(signals) / len(signals)
+
+
+def is_remote(job_type, location):
+    return job_type == 'remote' or 'remote' in (location or '').lower()
+
+
+class Preferences:
+    """The parts of a viewer's UserDetails scored by the ``match`` feature"""
+
+    __slots__ = ('place_ids', 'job_type', 'remote', 'salary')
+
+    def __init__(self, place_ids=(), job_type='', remote=False, salary=None):
+        self.place_ids = frozenset(place_ids)
+        self.job_type = job_type
+        self.remote = remote
+        # (low, high) like ``effective_range``, or None
+        self.salary = salary
+
+    @classmethod
+    def for_user(cls, user):
+        """Build from ``user``'s UserDetails; None when there is nothing to match"""
+        if user is None or not user.is_authenticated:
+            return None
+        try:
+            details = user.details
+        except ObjectDoesNotExist:
+            return None
+        preferences = cls(
+            details.preferred_place_ids or (),
+            EMPLOYMENT_JOB_TYPES.get(details.employment_type_preference, ''),
+            details.work_preference == 'remote',
+            effective_range(details.expected_salary_min, details.expected_salary_max),
+        )
+        return preferences if len(preferences) else None
+
+    def __len__(self):
+        """How many preferences are set"""
+        return (
+            bool(self.place_ids) + bool(self.job_type) + self.remote
+            + (self.salary is not None)
+        )
+
+    def key(self):
+        return (tuple(sorted(self.place_ids)), self.job_type, self.remote, self.salary)
+
+
+class RankingIndex:
+    """Per-job feature columns plus the bulk scorer over them.
+
+    ``_base`` holds each job's query-independent score (recency, salary
+    and company under the configured weights) as of ``_base_time`` and is
+    recomputed every ``REFRESH_SECONDS``; calls with other weights compute
+    it from the raw columns instead. The job attributes ``match`` compares
+    with equality (place, job type, remote) are interned as one *profile*
+    code per job, so a viewer's preferences are evaluated once per distinct
+    profile rather than once per job.
+    """
+
+    # Float columns, one value per slot
+    COLUMNS = ('_base', '_recency', '_salary', '_quality', '_low', '_high')
+
+    def __init__(self, epoch=None):
+        self._lock = threading.RLock()
+        self.epoch = time.time() if epoch is None else epoch
+        self._tau = HALF_LIFE_DAYS * 86400 / math.log(2)
+        self._base_time = self.epoch
+        self._slots = {}
+        self._free = []
+        self._ids = array('q')
+        self._companies = array('q')
+        self._profile = array('q')
+        # (place_id, job_type, remote) -> profile code
+        self._profiles = {}
+        for column in self.COLUMNS:
+            setattr(self, column, array('d'))
+        self._qualities = {}
+        self._company_slots = {}
+
+    def __len__(self):
+        return len(self._slots)
+
+    def _decay(self, now):
+        return math.exp((self.epoch - now) / self._tau)
+
+    def _base_score(self, slot, decay):
+        return (
+            WEIGHTS['recency'] * decay * self._recency[slot]
+            + WEIGHTS['salary'] * self._salary[slot]
+            + WEIGHTS['company'] * self._quality[slot]
+        )
+
+    def _refresh(self, now):
+        """Recompute every job's base score as of ``now``"""
+        decay = self._decay(now)
+        self._base = array('d', [self._base_score(slot, decay) for slot in range(len(self._ids))])
+        self._base_time = now
+
+    def update_job(self, job_id, created_at, job_type, location, place_id, company_id,
+                   salary_min, salary_max, is_active):
+        with self._lock:
+            self.remove_job(job_id)
+            if not is_active:
+                return
+            salary = effective_range(salary_min, salary_max)
+            low, high = salary if salary is not None else (math.inf, -math.inf)
+            profile = (place_id or '', job_type, is_remote(job_type, location))
+            values = {
+                '_ids': job_id,
+                '_companies': company_id,
+                '_profile': self._profiles.setdefault(profile, len(self._profiles)),
+                '_base': 0.0,
+                '_recency': math.exp((created_at.timestamp() - self.epoch) / self._tau),
+                '_salary': 0.0 if salary is None else 1.0,
+                '_quality': self._qualities.get(company_id, 0.0),
+                '_low': low,
+                '_high': high,
+            }
+            if self._free:
+                slot = self._free.pop()
+                for column, value in values.items():
+                    getattr(self, column)[slot] = value
+            else:
+                slot = len(self._ids)
+                for column, value in values.items():
+                    getattr(self, column).append(value)
+            self._base[slot] = self._base_score(slot, self._decay(self._base_time))
+            self._slots[job_id] = slot
+            self._company_slots.setdefault(company_id, set()).add(slot)
+
+    def remove_job(self, job_id):
+        with self._lock:
+            slot = self._slots.pop(job_id, None)
+            if slot is None:
+                return
+            company_id = self._companies[slot]
+            slots = self._company_slots[company_id]
+            slots.discard(slot)
+            if not slots:
+                del self._company_slots[company_id]
+            self._free.append(slot)
+
+    def update_company(self, company_id, quality):
+        with self._lock:
+            self._qualities[company_id] = quality
+            decay = self._decay(self._base_time)
+            for slot in self._company_slots.get(company_id, ()):
+                self._quality[slot] = quality
+                self._base[slot] = self._base_score(slot, decay)
+
+    def remove_company(self, company_id):
+        with self._lock:
+            self._qualities.pop(company_id, None)
+
+    # Scoring
+
+    def _profile_matches(self, preferences):
+        """Preferences met by each profile, indexed by profile code"""
+        matches = [0] * len(self._profiles)
+        for (place_id, job_type, remote), code in self._profiles.items():
+            matches[code] = (
+                (place_id in preferences.place_ids)
+                + (bool(preferences.job_type) and job_type == preferences.job_type)
+                + (preferences.remote and remote)
+            )
+        return matches
+
+    def top(self, ids, k=TOP_K, text_scores=None, preferences=None, weights=None, now=None):
+        """Return the ``k`` best of ``ids``, best first.
+
+        ``text_scores`` maps job ids to full-text scores (None when not
+        searching), ``preferences`` is the viewer's ``Preferences`` and
+        ``weights`` overrides ``WEIGHTS`` per feature. Ids of unknown or
+        inactive jobs are dropped; ties go to the newest (highest) id.
+        """
+        weights = WEIGHTS if weights is None else {**WEIGHTS, **weights}
+        now = time.time() if now is None else now
+        with self._lock:
+            try:
+                slots = list(map(self._slots.__getitem__, ids))
+            except KeyError:
+                # Some ids are unknown or inactive: drop them
+                slots = [slot for slot in map(self._slots.get, ids) if slot is not None]
+                ids = list(map(self._ids.__getitem__, slots))
+            if not slots or k <= 0:
+                return []
+            # Base scores from the cache, or from the columns for other weights
+            decay = None
+            if weights is WEIGHTS:
+                if abs(now - self._base_time) > REFRESH_SECONDS:
+                    self._refresh(now)
+            else:
+                decay = self._decay(now)
+            text = None
+            if text_scores and weights['text']:
+                text = list(map(text_scores.get, ids, repeat(0.0)))
+            matches = None
+            if preferences and weights['match']:
+                matches = self._profile_matches(preferences)
+            scorer = self._top_numpy if numpy is not None else self._top_python
+            return scorer(slots, ids, k, weights, decay, text, matches, preferences)
+
+    def _top_python(self, slots, ids, k, weights, decay, text, matches, preferences):
+        # Lazy map() pipelines: one pass over the candidates in nlargest()
+        add = operator.add
+
+        def gather(column):
+            return map(column.__getitem__, slots)
+
+        def scaled(weight, values):
+            return map(float(weight).__mul__, values)
+
+        if decay is None:
+            scores = gather(self._base)
+        else:
+            scores = map(add, map(
+                add,
+                scaled(weights['recency'] * decay, gather(self._recency)),
+                scaled(weights['salary'], gather(self._salary)),
+            ), scaled(weights['company'], gather(self._quality)))
+        if text is not None:
+            best = max(text)
+            if best > 0:
+                scores = map(add, scores, scaled(weights['text'] / best, text))
+        if matches is not None:
+            met = map(matches.__getitem__, gather(self._profile))
+            if preferences.salary is not None:
+                low, high = preferences.salary
+                met = map(add, met, map(
+                    operator.and_,
+                    map(float(high).__ge__, gather(self._low)),
+                    map(float(low).__le__, gather(self._high)),
+                ))
+            scores = map(add, scores, scaled(weights['match'] / len(preferences), met))
+        return [job_id for _, job_id in heapq.nlargest(k, zip(scores, ids))]
+
+    def _top_numpy(self, slots, ids, k, weights, decay, text, matches, preferences):
+        slots = numpy.fromiter(slots, dtype=numpy.intp, count=len(slots))
+        ids = numpy.fromiter(ids, dtype=numpy.int64, count=len(ids))
+
+        def gather(column):
+            dtype = numpy.float64 if column.typecode == 'd' else numpy.int64
+            return numpy.frombuffer(column, dtype=dtype)[slots]
+
+        if decay is None:
+            scores = gather(self._base)
+        else:
+            scores = (weights['recency'] * decay) * gather(self._recency)
+            scores += weights['salary'] * gather(self._salary)
+            scores += weights['company'] * gather(self._quality)
+        if text is not None:
+            text = numpy.fromiter(text, dtype=numpy.float64, count=len(text))
+            best = text.max()
+            if best > 0:
+                scores += (weights['text'] / best) * text
+        if matches is not None:
+            met = numpy.asarray(matches, dtype=numpy.int64)[gather(self._profile)]
+            if preferences.salary is not None:
+                low, high = preferences.salary
+                met += (gather(self._low) <= high) & (gather(self._high) >= low)
+            scores += (weights['match'] / len(preferences)) * met
+        if k < len(scores):
+            # Everything scoring at least the k-th best, then exact ordering
+            threshold = numpy.partition(scores, len(scores) - k)[len(scores) - k]
+            keep = scores >= threshold
+            scores, ids = scores[keep], ids[keep]
+        order = numpy.lexsort((ids, scores))[::-1][:k]
+        return ids[order].tolist()
+
+
+def build_index():
+    """Build a fresh ranking index from the database"""
+    from jobs.models.company import Company
+    from jobs.models.job import Job
+
+    index = RankingIndex()
+    companies = Company.objects.values_list('id', 'website', 'logo', 'description', 'place_id')
+    for company_id, website, logo, description, place_id in companies.iterator():
+        index.update_company(company_id, company_quality(website, logo, description, place_id))
+    jobs = Job.objects.filter(is_active=True).values_list(
+        'id', 'created_at', 'job_type', 'location', 'place_id', 'company_id',
+        'salary_min', 'salary_max',
+    )
+    for row in jobs.iterator(chunk_size=5000):
+        index.update_job(*row, True)
+    return index
+
+
+_index = ProcessIndex(build_index)
+
+
+def get_ranking():
+    """Return the process-wide ranking index, building it on first use"""
+    return _index.get()
+
+
+def warm_ranking():
+    """(Re)build the process-wide ranking index and swap it in"""
+    return _index.warm()
+
+
+def loaded_ranking():
+    """Return the ranking index if this process has built one, else ``None``"""
+    return _index.loaded()
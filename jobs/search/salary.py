@@ -0,0 +1,192 @@
+"""Salary range filtering.
+
+A job's salary is the interval ``[salary_min, salary_max]``. When only one
+bound is set the job is treated as paying exactly that amount, and a job
+with neither bound never matches a salary filter. A filter is a
+``SalaryRange`` with optional ``lower``/``upper`` bounds and one of two
+match modes:
+
+* ``overlap`` (the default): the job's interval meets ``[lower, upper]``;
+  with only ``lower`` set this is "pays up to at least X".
+* ``within``: the job's interval lies inside ``[lower, upper]``; with only
+  ``lower`` set this is "minimum is at least X", with only ``upper`` set
+  "maximum is at most Y".
+
+The database side filters on ``Job.salary_low``/``salary_high``, generated
+columns holding those effective bounds, through the ``job_salary_low_idx``
+and ``job_salary_high_idx`` indexes. The facet
+index keeps a ``SalaryGrid`` of the same intervals bucketed on both bounds,
+so in-memory counts only inspect the jobs of the cells a bound cuts through.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db.models import Q
+
+OVERLAP = 'overlap'
+WITHIN = 'within'
+MATCH_MODES = (OVERLAP, WITHIN)
+
+# Bucket width of the in-memory grid, in salary units
+BUCKET_WIDTH = getattr(settings, 'JOB_SALARY_BUCKET_WIDTH', 5000)
+
+
+def effective_range(salary_min, salary_max):
+    """Return a job's ``(low, high)`` salary as floats, or None if unset"""
+    if salary_min is None and salary_max is None:
+        return None
+    low = salary_min if salary_min is not None else salary_max
+    high = salary_max if salary_max is not None else salary_min
+    return float(low), float(high)
+
+
+def _parse_bound(value):
+    if value in (None, ''):
+        return None
+    try:
+        bound = Decimal(str(value).replace(',', '').strip())
+    except InvalidOperation:
+        raise ValueError(f'Invalid salary: {value!r}')
+    if not bound.is_finite() or bound < 0:
+        raise ValueError(f'Invalid salary: {value!r}')
+    return bound
+
+
+class SalaryRange:
+    """A salary filter: optional bounds plus a match mode"""
+
+    __slots__ = ('lower', 'upper', 'match', 'bounds')
+
+    def __init__(self, lower=None, upper=None, match=OVERLAP):
+        if match not in MATCH_MODES:
+            raise ValueError(f'Invalid salary match: {match!r}')
+        if lower is not None and upper is not None and lower > upper:
+            lower, upper = upper, lower
+        self.lower = lower
+        self.upper = upper
+        self.match = match
+        # Float copies for the in-memory comparisons, which run per job;
+        # a missing bound is infinite so no None checks are needed there
+        self.bounds = (
+            float('-inf') if lower is None else float(lower),
+            float('inf') if upper is None else float(upper),
+        )
+
+    @classmethod
+    def from_params(cls, params):
+        """Build a range from ``salary_min``/``salary_max``/``salary_match``.
+
+        Returns None when neither bound is given; raises ValueError for
+        malformed values.
+        """
+        lower = _parse_bound(params.get('salary_min'))
+        upper = _parse_bound(params.get('salary_max'))
+        if lower is None and upper is None:
+            return None
+        return cls(lower, upper, params.get('salary_match') or OVERLAP)
+
+    def key(self):
+        return self.bounds + (self.match,)
+
+    def matches(self, low, high):
+        """Whether a job paying ``[low, high]`` passes the filter"""
+        lower, upper = self.bounds
+        if self.match == OVERLAP:
+            return low <= upper and high >= lower
+        return low >= lower and high <= upper
+
+    def q(self):
+        """Filter on the indexed ``salary_low``/``salary_high`` columns"""
+        condition = Q()
+        if self.match == OVERLAP:
+            if self.upper is not None:
+                condition &= Q(salary_low__lte=self.upper)
+            if self.lower is not None:
+                condition &= Q(salary_high__gte=self.lower)
+        else:
+            if self.lower is not None:
+                condition &= Q(salary_low__gte=self.lower)
+            if self.upper is not None:
+                condition &= Q(salary_high__lte=self.upper)
+        return condition
+
+    def apply(self, queryset):
+        """Restrict a Job queryset to jobs whose salary passes the filter"""
+        return queryset.filter(self.q())
+
+
+class SalaryGrid:
+    """Job salary intervals bucketed on ``(low, high)``.
+
+    A query takes whole cells that lie entirely inside the filter, skips
+    cells entirely outside it, and checks job by job only in the cells a
+    filter bound passes through.
+    """
+
+    def __init__(self, width=BUCKET_WIDTH):
+        self.width = width
+        self._cells = {}
+        self._ranges = {}
+
+    def __len__(self):
+        return len(self._ranges)
+
+    def _cell(self, low, high):
+        return int(low // self.width), int(high // self.width)
+
+    def add(self, job_id, low, high):
+        self.remove(job_id)
+        self._ranges[job_id] = (low, high)
+        self._cells.setdefault(self._cell(low, high), set()).add(job_id)
+
+    def remove(self, job_id):
+        previous = self._ranges.pop(job_id, None)
+        if previous is None:
+            return
+        cell = self._cell(*previous)
+        ids = self._cells[cell]
+        ids.discard(job_id)
+        if not ids:
+            del self._cells[cell]
+
+    def range_of(self, job_id):
+        return self._ranges.get(job_id)
+
+    def filter(self, ids, salary):
+        """Return the jobs of ``ids`` whose salary passes ``salary``"""
+        # ``matches`` inlined: this runs once per job in the edge cells
+        get = self._ranges.get
+        lower, upper = salary.bounds
+        if salary.match == OVERLAP:
+            return [
+                job_id for job_id in ids
+                if (bounds := get(job_id)) is not None
+                and bounds[0] <= upper and bounds[1] >= lower
+            ]
+        return [
+            job_id for job_id in ids
+            if (bounds := get(job_id)) is not None
+            and bounds[0] >= lower and bounds[1] <= upper
+        ]
+
+    def select(self, salary):
+        """Return the set of all job ids whose salary passes ``salary``"""
+        width = self.width
+        # ``matches`` falls as ``low`` rises and rises with ``high`` under
+        # overlap, and the reverse under within, so testing the cell's two
+        # extreme corners decides it for every job inside.
+        overlap = salary.match == OVERLAP
+        whole = []
+        selected = set()
+        for (low_cell, high_cell), ids in self._cells.items():
+            low_min, low_max = low_cell * width, (low_cell + 1) * width
+            high_min, high_max = high_cell * width, (high_cell + 1) * width
+            if overlap:
+                best, worst = (low_min, high_max), (low_max, high_min)
+            else:
+                best, worst = (low_max, high_min), (low_min, high_max)
+            if salary.matches(*worst):
+                whole.append(ids)
+            elif salary.matches(*best):
+                selected.update(self.filter(ids, salary))
+        return selected.union(*whole)
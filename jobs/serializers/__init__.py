@@ -1,3 +1,5 @@
+from .job_serializer import CompanySerializer, JobSerializer
+from .userprofile_serializer import UserProfileSerializer
 from .education_serializer import EducationSerializer
 from .experience_serializer import ExperienceSerializer
 from .register_serializer import RegisterSerializer
@@ -6,6 +8,9 @@ from .skills_serializer import SkillSerializer, SkillsSerializer, SkillEndorseme
 from .userdetails_serializer import UserDetailsSerializer
 
 __all__ = [
+    'CompanySerializer',
+    'JobSerializer',
+    'UserProfileSerializer',
     'EducationSerializer',
     'ExperienceSerializer',
     'RegisterSerializer',
@@ -0,0 +1,296 @@
+"""Compiled read serializers: ``.values_list()`` rows straight to dicts.
+
+A stock ``ModelSerializer`` builds a model instance per row, then walks
+its Field objects calling ``get_attribute`` and ``to_representation`` on
+each. For read-only listings of plain columns that is most of the time
+spent. ``compile_serializer`` looks at a serializer's fields once, works
+out the column each one reads and how DRF would render its value, and
+generates a single function turning a batch of ``values_list()`` tuples
+into dicts, with no Field objects involved. The output is the same as the
+stock serializer's, so the rendered JSON is byte-identical.
+
+It is opt-in: a serializer sets ``Meta.compiled_reads = True``. Only
+fields backed by one model column (plus nested serializers over a
+foreign key) can be compiled; anything else (method fields, dotted
+sources, many-to-many) makes ``compiled_reader`` return None and the
+caller keeps using the stock serializer.
+"""
+import datetime
+import decimal
+import threading
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.utils import timezone
+from rest_framework import fields as drf_fields
+from rest_framework import relations, serializers
+from rest_framework.settings import api_settings
+
+
+# Fields whose to_representation is int()/float()/bool()/str() of the column
+PLAIN_FIELDS = (
+    drf_fields.IntegerField, drf_fields.FloatField, drf_fields.BooleanField, drf_fields.CharField,
+)
+
+
+class NotCompilable(ValueError):
+    pass
+
+
+def _decimal(field):
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if field.localize:
+        raise NotCompilable(f'{field.field_name}: localized decimals')
+    quantum = None
+    context = None
+    if field.decimal_places is not None:
+        quantum = decimal.Decimal('.1') ** field.decimal_places
+        context = decimal.getcontext().copy()
+        if field.max_digits is not None:
+            context.prec = field.max_digits
+    rounding = field.rounding
+    normalize = field.normalize_output
+
+    def convert(value):
+        if not isinstance(value, decimal.Decimal):
+            value = decimal.Decimal(str(value).strip())
+        if quantum is not None:
+            value = value.quantize(quantum, rounding=rounding, context=context)
+        if normalize:
+            value = value.normalize()
+        return '{:f}'.format(value) if coerce_to_string else value
+    return convert
+
+
+def _datetime(field):
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if output_format is None:
+        return None
+    iso = output_format.lower() == drf_fields.ISO_8601
+    field_timezone = getattr(field, 'timezone', False)
+
+    def convert(value, tz):
+        if not value:
+            return None
+        if isinstance(value, str):
+            return value
+        if field_timezone is not False:
+            tz = field_timezone
+        if tz is not None:
+            value = value.astimezone(tz) if timezone.is_aware(value) else timezone.make_aware(value, tz)
+        elif timezone.is_aware(value):
+            value = timezone.make_naive(value, datetime.timezone.utc)
+        if not iso:
+            return value.strftime(output_format)
+        value = value.isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+def _date(field):
+    output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+    if output_format is None:
+        return None
+    iso = output_format.lower() == drf_fields.ISO_8601
+
+    def convert(value):
+        if not value:
+            return None
+        if isinstance(value, str):
+            return value
+        return value.isoformat() if iso else value.strftime(output_format)
+    return convert
+
+
+def _file(field, model_field):
+    use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+    storage = model_field.storage
+
+    def convert(name, absolute):
+        if not name:
+            return None
+        if not use_url:
+            return name
+        url = storage.url(name)
+        return absolute(url) if absolute is not None else url
+    return convert
+
+
+def _choice(field):
+    choices = field.choice_strings_to_values
+    if all(isinstance(key, str) and value == key for key, value in choices.items()):
+        return None
+
+    def convert(value):
+        if value == '':
+            return value
+        return choices.get(str(value), value)
+    return convert
+
+
+def _model_field(model, source_attrs):
+    if len(source_attrs) != 1:
+        return None
+    try:
+        model_field = model._meta.get_field(source_attrs[0])
+    except FieldDoesNotExist:
+        return None
+    if not model_field.concrete or model_field.many_to_many:
+        return None
+    return model_field
+
+
+class _Builder:
+    """Walks a serializer's fields, collecting lookups and expression code"""
+
+    def __init__(self):
+        self.lookups = ['pk']
+        self.namespace = {}
+
+    def column(self, lookup):
+        self.lookups.append(lookup)
+        return f'row[{len(self.lookups) - 1}]'
+
+    def converter(self, convert):
+        name = f'_c{len(self.namespace)}'
+        self.namespace[name] = convert
+        return name
+
+    def field(self, field, model, prefix):
+        if isinstance(field, serializers.BaseSerializer):
+            return self.nested(field, model, prefix)
+        model_field = _model_field(model, field.source_attrs)
+        if model_field is None:
+            raise NotCompilable(f'{prefix}{field.field_name}: not a model column')
+        value = self.column(prefix + field.source)
+
+        if isinstance(field, relations.PrimaryKeyRelatedField):
+            if field.pk_field is not None:
+                raise NotCompilable(f'{prefix}{field.field_name}: pk_field')
+            return value
+        if isinstance(field, (relations.RelatedField, relations.ManyRelatedField)):
+            raise NotCompilable(f'{prefix}{field.field_name}: {type(field).__name__}')
+
+        if isinstance(field, drf_fields.FileField):
+            convert = self.converter(_file(field, model_field))
+            return f'{convert}({value}, absolute)'
+        if isinstance(field, drf_fields.DateTimeField):
+            convert = _datetime(field)
+            return value if convert is None else f'{self.converter(convert)}({value}, tz)'
+        if isinstance(field, drf_fields.DateField):
+            convert = _date(field)
+        elif isinstance(field, drf_fields.DecimalField):
+            convert = _decimal(field)
+        elif isinstance(field, drf_fields.ChoiceField):
+            convert = _choice(field)
+        elif isinstance(field, PLAIN_FIELDS):
+            # The column already comes back as the type DRF would return
+            convert = None
+        else:
+            raise NotCompilable(f'{prefix}{field.field_name}: {type(field).__name__}')
+        if convert is None:
+            return value
+        return f'(None if {value} is None else {self.converter(convert)}({value}))'
+
+    def nested(self, serializer, model, prefix):
+        if isinstance(serializer, serializers.ListSerializer):
+            raise NotCompilable(f'{prefix}{serializer.field_name}: nested list')
+        model_field = _model_field(model, serializer.source_attrs)
+        if model_field is None or not model_field.many_to_one:
+            raise NotCompilable(f'{prefix}{serializer.field_name}: not a foreign key')
+        related_prefix = f'{prefix}{serializer.source}__'
+        related_pk = self.column(related_prefix + 'pk')
+        body = self.body(serializer, model_field.related_model, related_prefix)
+        return f'(None if {related_pk} is None else {body})'
+
+    def body(self, serializer, model, prefix=''):
+        if not isinstance(serializer, serializers.ModelSerializer):
+            raise NotCompilable(f'{type(serializer).__name__}: not a ModelSerializer')
+        items = [
+            f'{name!r}: {self.field(field, model, prefix)}'
+            for name, field in serializer.fields.items()
+            if not field.write_only
+        ]
+        return '{' + ', '.join(items) + '}'
+
+
+class CompiledSerializer:
+    """The compiled form of one serializer (with its current field set)"""
+
+    def __init__(self, serializer):
+        model = serializer.Meta.model
+        builder = _Builder()
+        body = builder.body(serializer, model)
+        source = (
+            'def rows_to_dicts(rows, tz, absolute):\n'
+            f'    return [{body} for row in rows]\n'
+        )
+        namespace = dict(builder.namespace)
+        exec(compile(source, f'<compiled {type(serializer).__name__}>', 'exec'), namespace)
+        self.model = model
+        self.lookups = tuple(builder.lookups)
+        self.source = source
+        self._rows_to_dicts = namespace['rows_to_dicts']
+
+    def values(self, queryset):
+        """``queryset`` as the ``values_list()`` rows the compiled function reads"""
+        return queryset.values_list(*self.lookups)
+
+    def to_representation(self, rows, context=None):
+        """Turn ``values()`` rows into the dicts the stock serializer would produce"""
+        request = (context or {}).get('request')
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        absolute = request.build_absolute_uri if request is not None else None
+        return self._rows_to_dicts(rows, tz, absolute)
+
+    def serialize(self, queryset, context=None):
+        return self.to_representation(self.values(queryset), context)
+
+    def rows_in_order(self, queryset, ids):
+        """The ``values()`` rows of ``queryset`` with these ids, in ``ids`` order"""
+        rows = {row[0]: row for row in self.values(queryset.filter(pk__in=ids))}
+        return [rows[pk] for pk in ids if pk in rows]
+
+    def serialize_in_order(self, queryset, ids, context=None):
+        return self.to_representation(self.rows_in_order(queryset, ids), context)
+
+
+def _signature(serializer):
+    return tuple(
+        (name, _signature(field) if isinstance(field, serializers.Serializer) else None)
+        for name, field in serializer.fields.items()
+    )
+
+
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+def compile_serializer(serializer):
+    """Return the (cached) ``CompiledSerializer`` for a serializer class or instance.
+
+    Raises NotCompilable when a field cannot be compiled.
+    """
+    if isinstance(serializer, type):
+        serializer = serializer()
+    key = (type(serializer), _signature(serializer))
+    compiled = _compiled.get(key)
+    if compiled is None:
+        compiled = CompiledSerializer(serializer)
+        with _compiled_lock:
+            _compiled[key] = compiled
+    return compiled
+
+
+def compiled_reader(serializer_class, **kwargs):
+    """The compiled serializer for an opted-in class, else None.
+
+    ``kwargs`` (e.g. ``fields=``/``omit=``) are passed to the serializer so
+    the compiled form matches its field set.
+    """
+    if not getattr(getattr(serializer_class, 'Meta', None), 'compiled_reads', False):
+        return None
+    try:
+        return compile_serializer(serializer_class(**kwargs))
+    except NotCompilable:
+        return None
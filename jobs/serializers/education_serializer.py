@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from jobs.fieldsets import SparseFieldsMixin
 from jobs.models.education import Education
 
-class EducationSerializer(serializers.ModelSerializer):
+class EducationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for Education model with additional computed fields"""
     
     duration_months = serializers.SerializerMethodField()
@@ -26,6 +27,7 @@ class EducationSerializer(serializers.ModelSerializer):
             'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+        field_sources = {'duration_months': ['start_date', 'end_date']}
     
     def get_duration_months(self, obj):
         """Calculate duration in months"""
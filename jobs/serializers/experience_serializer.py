@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from jobs.fieldsets import SparseFieldsMixin
 from jobs.models.experience import Experience
 
-class ExperienceSerializer(serializers.ModelSerializer):
+class ExperienceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for Experience model with computed fields"""
     
     duration_months = serializers.SerializerMethodField()
@@ -30,6 +31,10 @@ class ExperienceSerializer(serializers.ModelSerializer):
             'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+        field_sources = {
+            'duration_months': ['start_date', 'end_date'],
+            'skills_list': ['skills_used'],
+        }
     
     def get_duration_months(self, obj):
         """Calculate duration in months"""
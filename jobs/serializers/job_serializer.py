@@ -0,0 +1,25 @@
+from rest_framework import serializers
+from jobs.fieldsets import SparseFieldsMixin
+from jobs.models.company import Company
+from jobs.models.job import Job
+
+class CompanySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Company
+        fields = [
+            'id', 'name', 'description', 'website', 'location', 'place_id',
+            'latitude', 'longitude', 'logo', 'created_at'
+        ]
+        compiled_reads = True
+
+class JobSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    company = CompanySerializer(read_only=True)
+    
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'title', 'description', 'company', 'location', 
+            'place_id', 'latitude', 'longitude', 'job_type', 'salary_min', 'salary_max', 'requirements', 
+            'benefits', 'is_active', 'created_at', 'updated_at'
+        ]
+        compiled_reads = True
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from jobs.fieldsets import SparseFieldsMixin
 from django.contrib.auth.models import User
 from jobs.models.register import Register
 
@@ -10,7 +11,7 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'date_joined']
         read_only_fields = ['id', 'date_joined']
 
-class RegisterSerializer(serializers.ModelSerializer):
+class RegisterSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for Register model with user information"""
     
     user = UserSerializer(read_only=True)
@@ -31,6 +32,9 @@ class RegisterSerializer(serializers.ModelSerializer):
             'state',
             'country',
             'postal_code',
+            'place_id',
+            'latitude',
+            'longitude',
             'profile_picture',
             'profile_picture_url',
             'bio',
@@ -45,6 +49,10 @@ class RegisterSerializer(serializers.ModelSerializer):
             'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'is_profile_complete']
+        field_sources = {
+            'full_name': ['user'],
+            'profile_picture_url': ['profile_picture'],
+        }
     
     def get_full_name(self, obj):
         """Return user's full name"""
@@ -1,13 +1,16 @@
 from rest_framework import serializers
+from jobs.counters import BufferedCounterField
+from jobs.fieldsets import SparseFieldsMixin
 from jobs.models.resume import Resume
 
-class ResumeSerializer(serializers.ModelSerializer):
+class ResumeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for Resume model with computed fields"""
     
     file_size_display = serializers.SerializerMethodField()
     file_type_display = serializers.CharField(source='get_file_type_display', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     download_url = serializers.SerializerMethodField()
+    download_count = BufferedCounterField()
     
     class Meta:
         model = Resume
@@ -38,6 +41,11 @@ class ResumeSerializer(serializers.ModelSerializer):
             'id', 'file_size', 'file_type', 'download_count', 
             'last_downloaded', 'applications_count', 'created_at', 'updated_at'
         ]
+        field_sources = {
+            'file_size_display': ['file_size'],
+            'download_url': ['file'],
+            'download_count': ['download_count'],
+        }
     
     def get_file_size_display(self, obj):
         """Return human-readable file size"""
@@ -1,21 +1,20 @@
 from rest_framework import serializers
+from jobs.counts import CountField
+from jobs.fieldsets import SparseFieldsMixin
 from jobs.models.skills import Skill, Skills, SkillCategory, SkillEndorsement
 
-class SkillCategorySerializer(serializers.ModelSerializer):
+class SkillCategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for SkillCategory model"""
     
-    skill_count = serializers.SerializerMethodField()
+    skill_count = CountField('skills')
     
     class Meta:
         model = SkillCategory
         fields = ['id', 'name', 'description', 'icon', 'skill_count', 'created_at']
         read_only_fields = ['id', 'created_at']
-    
-    def get_skill_count(self, obj):
-        """Return count of skills in this category"""
-        return obj.skills.count()
+        field_sources = {'skill_count': []}
 
-class SkillSerializer(serializers.ModelSerializer):
+class SkillSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for Skill model"""
     
     category_name = serializers.CharField(source='category.name', read_only=True)
@@ -33,8 +32,9 @@ class SkillSerializer(serializers.ModelSerializer):
             'created_at'
         ]
         read_only_fields = ['id', 'usage_count', 'created_at']
+        select_related = ['category']
 
-class SkillsSerializer(serializers.ModelSerializer):
+class SkillsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for User Skills model"""
     
     skill_name = serializers.CharField(source='skill.name', read_only=True)
@@ -67,6 +67,8 @@ class SkillsSerializer(serializers.ModelSerializer):
             'updated_at'
         ]
         read_only_fields = ['id', 'endorsement_count', 'created_at', 'updated_at']
+        field_sources = {'proficiency_percentage': ['proficiency_level']}
+        select_related = ['skill__category']
     
     def get_proficiency_percentage(self, obj):
         """Return proficiency as percentage"""
@@ -100,7 +102,7 @@ class SkillsCreateSerializer(serializers.ModelSerializer):
         validated_data['user'] = self.context['request'].user
         return super().create(validated_data)
 
-class SkillEndorsementSerializer(serializers.ModelSerializer):
+class SkillEndorsementSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for Skill Endorsements"""
     
     endorsed_by_name = serializers.CharField(source='endorsed_by.get_full_name', read_only=True)
@@ -120,6 +122,7 @@ class SkillEndorsementSerializer(serializers.ModelSerializer):
             'created_at'
         ]
         read_only_fields = ['id', 'created_at']
+        select_related = ['endorsed_by', 'user_skill__skill', 'user_skill__user']
     
     def validate(self, data):
         """Custom validation"""
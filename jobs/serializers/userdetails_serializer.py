@@ -1,7 +1,10 @@
 from rest_framework import serializers
+from jobs.counters import BufferedCounterField
+from jobs.fieldsets import SparseFieldsMixin
+from jobs.geo import get_place
 from jobs.models.userdetails import UserDetails
 
-class UserDetailsSerializer(serializers.ModelSerializer):
+class UserDetailsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for UserDetails model with computed fields"""
     
     work_preference_display = serializers.CharField(source='get_work_preference_display', read_only=True)
@@ -11,7 +14,9 @@ class UserDetailsSerializer(serializers.ModelSerializer):
     salary_period_display = serializers.CharField(source='get_salary_period_display', read_only=True)
     experience_level = serializers.SerializerMethodField()
     preferred_locations_list = serializers.SerializerMethodField()
+    preferred_places = serializers.SerializerMethodField()
     languages_list = serializers.SerializerMethodField()
+    profile_views_count = BufferedCounterField()
     
     class Meta:
         model = UserDetails
@@ -38,6 +43,7 @@ class UserDetailsSerializer(serializers.ModelSerializer):
             'salary_period_display',
             'preferred_locations',
             'preferred_locations_list',
+            'preferred_places',
             'willing_to_relocate',
             'summary',
             'career_objectives',
@@ -64,6 +70,13 @@ class UserDetailsSerializer(serializers.ModelSerializer):
             'id', 'profile_completion_percentage', 'last_profile_update',
             'job_search_activity_score', 'profile_views_count', 'created_at', 'updated_at'
         ]
+        field_sources = {
+            'experience_level': ['years_of_experience'],
+            'preferred_locations_list': ['preferred_locations'],
+            'preferred_places': ['preferred_place_ids'],
+            'languages_list': ['languages'],
+            'profile_views_count': ['profile_views_count'],
+        }
     
     def get_experience_level(self, obj):
         """Return experience level based on years of experience"""
@@ -75,6 +88,11 @@ class UserDetailsSerializer(serializers.ModelSerializer):
             return [location.strip() for location in obj.preferred_locations.split(',')]
         return []
     
+    def get_preferred_places(self, obj):
+        """Return the resolved preferred locations with coordinates"""
+        places = (get_place(place_id) for place_id in obj.preferred_place_ids)
+        return [place.as_dict() for place in places if place is not None]
+    
     def get_languages_list(self, obj):
         """Return languages as a list"""
         if obj.languages:
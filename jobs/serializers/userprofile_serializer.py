@@ -0,0 +1,10 @@
+from rest_framework import serializers
+from jobs.models.userprofile import UserProfile
+
+class UserProfileSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UserProfile
+        fields = [
+            'id', 'user', 'bio', 'skills', 'experience', 'education',
+            'location', 'phone', 'linkedin_url', 'portfolio_url', 'profile_picture'
+        ]
@@ -0,0 +1,205 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models.company import Company
+from .models.job import Job
+from .models.register import Register
+from .models.searchsynonym import SearchSynonym
+from .models.skills import Skill, SkillCategory, SkillEndorsement, Skills
+from .models.userdetails import UserDetails
+from . import search, skillcounts
+from .geo.normalize import normalize_instance
+from .search import cache as result_cache
+from .search.analysis import invalidate_dictionary
+from .search.autocomplete import loaded_autocomplete
+from .search.facets import loaded_facets
+from .search.ranking import company_quality, loaded_ranking
+from .taxonomy import bump_version as bump_taxonomy_version
+
+
+@receiver(pre_save, sender=Job)
+@receiver(pre_save, sender=Company)
+@receiver(pre_save, sender=Register)
+@receiver(pre_save, sender=UserDetails)
+def resolve_location(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Resolve free-text locations to gazetteer places before writing.
+
+    A save limited by ``update_fields`` must list the place fields itself
+    for a location change to reach them.
+    """
+    if not raw:
+        normalize_instance(instance, update_fields)
+
+
+@receiver(post_save, sender=Job)
+def index_job_on_save(sender, instance, raw=False, **kwargs):
+    """Keep the search index in step with the saved job"""
+    result_cache.bump_generation()
+    if raw:
+        return
+    search.index_jobs([instance])
+    autocomplete = loaded_autocomplete()
+    if autocomplete is not None:
+        autocomplete.update_job(
+            instance.pk, instance.title, instance.company_id, instance.location,
+            instance.is_active,
+        )
+    facets = loaded_facets()
+    if facets is not None:
+        facets.update_job(
+            instance.pk, instance.job_type, instance.location, instance.company_id,
+            instance.salary_min, instance.salary_max, instance.is_active,
+            place_id=instance.place_id,
+        )
+    ranking = loaded_ranking()
+    if ranking is not None:
+        ranking.update_job(
+            instance.pk, instance.created_at, instance.job_type, instance.location,
+            instance.place_id, instance.company_id, instance.salary_min,
+            instance.salary_max, instance.is_active,
+        )
+
+
+@receiver(post_delete, sender=Job)
+def remove_job_from_index(sender, instance, **kwargs):
+    """Drop a deleted job from the search index"""
+    result_cache.bump_generation()
+    search.remove_jobs([instance.pk])
+    autocomplete = loaded_autocomplete()
+    if autocomplete is not None:
+        autocomplete.remove_job(instance.pk)
+    facets = loaded_facets()
+    if facets is not None:
+        facets.remove_job(instance.pk)
+    ranking = loaded_ranking()
+    if ranking is not None:
+        ranking.remove_job(instance.pk)
+
+
+@receiver(post_save, sender=Company)
+def reindex_company_jobs(sender, instance, created=False, raw=False, **kwargs):
+    """Re-index a company's jobs so name changes are searchable"""
+    result_cache.bump_generation()
+    if raw:
+        return
+    autocomplete = loaded_autocomplete()
+    if autocomplete is not None:
+        autocomplete.update_company(instance.pk, instance.name)
+    facets = loaded_facets()
+    if facets is not None:
+        facets.update_company(instance.pk, instance.name)
+    ranking = loaded_ranking()
+    if ranking is not None:
+        ranking.update_company(instance.pk, company_quality(
+            instance.website, instance.logo, instance.description, instance.place_id
+        ))
+    if not created:
+        search.reindex_company(instance)
+
+
+@receiver(post_delete, sender=Company)
+def remove_company_from_autocomplete(sender, instance, **kwargs):
+    result_cache.bump_generation()
+    autocomplete = loaded_autocomplete()
+    if autocomplete is not None:
+        autocomplete.remove_company(instance.pk)
+    facets = loaded_facets()
+    if facets is not None:
+        facets.remove_company(instance.pk)
+    ranking = loaded_ranking()
+    if ranking is not None:
+        ranking.remove_company(instance.pk)
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+@receiver(post_save, sender=SkillCategory)
+@receiver(post_delete, sender=SkillCategory)
+def invalidate_taxonomy(sender, instance, **kwargs):
+    """Retire the cached taxonomy snapshot and responses"""
+    bump_taxonomy_version()
+
+
+@receiver(pre_save, sender=Skill)
+def remember_skill_name(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Note the stored name, so only a rename recompiles the synonym dictionary"""
+    instance._stored_name = None
+    if raw or instance._state.adding or (update_fields is not None and 'name' not in update_fields):
+        return
+    instance._stored_name = sender._base_manager.filter(pk=instance.pk).values_list(
+        'name', flat=True
+    ).first()
+
+
+@receiver(post_save, sender=Skill)
+def update_skill_autocomplete(sender, instance, created=False, raw=False, update_fields=None,
+                              **kwargs):
+    renamed = getattr(instance, '_stored_name', None) not in (None, instance.name)
+    if created or renamed:
+        # Skill names seed the search synonym dictionary
+        refresh_search_synonyms(sender, instance)
+    autocomplete = loaded_autocomplete()
+    if autocomplete is not None and not raw:
+        autocomplete.update_skill(instance.pk, instance.name, instance.usage_count)
+
+
+@receiver(post_delete, sender=Skill)
+def remove_skill_from_autocomplete(sender, instance, **kwargs):
+    refresh_search_synonyms(sender, instance)
+    autocomplete = loaded_autocomplete()
+    if autocomplete is not None:
+        autocomplete.remove_skill(instance.pk)
+
+
+# The counted foreign key of each counted row: (field, counter)
+COUNTED_BY = {
+    Skills: ('skill', 'usage_count'),
+    SkillEndorsement: ('user_skill', 'endorsement_count'),
+}
+
+
+@receiver(pre_save, sender=Skills)
+@receiver(pre_save, sender=SkillEndorsement)
+def remember_counted_target(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Note the row a re-pointed skill or endorsement was counted on"""
+    field, _ = COUNTED_BY[sender]
+    instance._counted_target = None
+    # update_fields may name the foreign key by its attname ("skill_id") too
+    if raw or instance._state.adding or (
+        update_fields is not None and not {field, f'{field}_id'} & set(update_fields)
+    ):
+        return
+    instance._counted_target = sender._base_manager.filter(pk=instance.pk).values_list(
+        f'{field}_id', flat=True
+    ).first()
+
+
+@receiver(post_save, sender=Skills)
+@receiver(post_save, sender=SkillEndorsement)
+def count_saved(sender, instance, created=False, raw=False, **kwargs):
+    """Keep usage_count / endorsement_count in step with a new or re-pointed row"""
+    if raw:
+        return
+    field, counter = COUNTED_BY[sender]
+    target = getattr(instance, f'{field}_id')
+    if created:
+        skillcounts.adjust(counter, {target: 1})
+    else:
+        before = getattr(instance, '_counted_target', None)
+        if before is not None:
+            skillcounts.adjust(counter, skillcounts.moves({instance.pk: before}, {instance.pk: target}))
+
+
+@receiver(post_delete, sender=Skills)
+@receiver(post_delete, sender=SkillEndorsement)
+def count_deleted(sender, instance, **kwargs):
+    field, counter = COUNTED_BY[sender]
+    skillcounts.adjust(counter, {getattr(instance, f'{field}_id'): -1})
+
+
+@receiver(post_save, sender=SearchSynonym)
+@receiver(post_delete, sender=SearchSynonym)
+def refresh_search_synonyms(sender, instance, **kwargs):
+    """Recompile the query expansion dictionary; cached results used the old one"""
+    invalidate_dictionary()
+    result_cache.bump_generation()
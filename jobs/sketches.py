@@ -0,0 +1,208 @@
+"""Unique viewers of profiles and jobs, counted with HyperLogLog sketches.
+
+``profile_views_count`` counts hits, so one recruiter refreshing a page
+inflates it. Remembering every viewer of every profile would need a row per
+viewer. Instead each (profile, day) and (job, day) keeps a HyperLogLog
+sketch of its viewers in a ``ViewerSketch`` row:
+
+* There are ``2 ** PRECISION`` = 4096 registers. Each holds the longest
+  run of leading zero bits seen among the 64-bit hashes routed to it.
+* A count has a standard error of ``1.04 / sqrt(4096)``, about 1.6%. It
+  is within 3.3% about 95% of the time and within 4.9% about 99.7% of the
+  time. Below about 10,000 viewers, linear counting is used and is closer
+  still: counts up to a few hundred are practically exact.
+* Storage: a sketch with few viewers is stored sparse, as 3 bytes per
+  register that was set. It switches to dense once that would be bigger:
+  one byte per register, 4 KiB, whatever the number of viewers. A parsed
+  sketch in memory is a 4 KiB ``bytearray``.
+* Sketches merge by taking the larger of each pair of registers. Merging
+  the days of a week or a month counts the viewers of the whole period,
+  each viewer once, with the same error bound.
+
+A view hashes the viewer: a signed-in user's id, otherwise the client
+address and user agent. The request path never touches the database.
+``record_view()`` adds the hash to a sketch this process keeps in memory
+for the row, and a counter flush (``jobs/counters.py``) merges each of those
+into its row, one locked read-merge-write per row per flush interval
+rather than per view. Counts read in this process include its unflushed
+views. Views buffered by a process that is killed before it flushes are
+lost, as with the ``'local'`` counter buffer.
+"""
+import hashlib
+import math
+import threading
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import counters
+from .models.viewersketch import ViewerSketch
+
+PRECISION = 12
+REGISTERS = 1 << PRECISION
+RANK_BITS = 64 - PRECISION
+
+STANDARD_ERROR = 1.04 / math.sqrt(REGISTERS)
+
+ALPHA = 0.7213 / (1 + 1.079 / REGISTERS)
+
+SPARSE, DENSE = 0, 1
+
+# 2 ** -rank for every rank a register can hold
+POWERS = [2.0 ** -rank for rank in range(RANK_BITS + 2)]
+
+# The rolling windows the API reports, in days ending today
+WINDOWS = (('today', 1), ('last_7_days', 7), ('last_30_days', 30))
+
+# (kind, object id, day) -> HyperLogLog of the views not yet written
+_pending = {}
+_pending_lock = threading.Lock()
+
+
+def viewer_hash(viewer):
+    """The 64-bit hash of a viewer identifier"""
+    return int.from_bytes(hashlib.blake2b(viewer.encode(), digest_size=8).digest(), 'big')
+
+
+def viewer_id(request):
+    """Who is viewing: the signed-in user, else the client's address and user agent"""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f'user:{user.pk}'
+    return 'anon:{}:{}'.format(
+        request.META.get('REMOTE_ADDR', ''), request.META.get('HTTP_USER_AGENT', '')
+    )
+
+
+class HyperLogLog:
+    """A HyperLogLog sketch over 64-bit hashes, with ``2 ** PRECISION`` registers"""
+
+    def __init__(self, registers=None):
+        self.registers = registers if registers is not None else bytearray(REGISTERS)
+
+    @classmethod
+    def from_bytes(cls, data):
+        data = bytes(data)
+        if data[0] == DENSE:
+            return cls(bytearray(data[1:]))
+        registers = bytearray(REGISTERS)
+        for offset in range(1, len(data), 3):
+            registers[int.from_bytes(data[offset:offset + 2], 'big')] = data[offset + 2]
+        return cls(registers)
+
+    def to_bytes(self):
+        """The sparse encoding while it is smaller than the dense one"""
+        registers = self.registers
+        used = [index for index in range(REGISTERS) if registers[index]]
+        if 3 * len(used) >= REGISTERS:
+            return bytes([DENSE]) + bytes(registers)
+        return bytes([SPARSE]) + b''.join(
+            index.to_bytes(2, 'big') + bytes([registers[index]]) for index in used
+        )
+
+    def add(self, value):
+        """Add a 64-bit hash; returns whether the sketch changed"""
+        index = value >> RANK_BITS
+        rank = RANK_BITS - (value & ((1 << RANK_BITS) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def merge(self, other):
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def estimate(self):
+        registers = self.registers
+        estimate = ALPHA * REGISTERS * REGISTERS / sum(POWERS[rank] for rank in registers)
+        zeros = registers.count(0)
+        if zeros and estimate <= 2.5 * REGISTERS:
+            # Linear counting is more accurate while registers are still empty
+            estimate = REGISTERS * math.log(REGISTERS / zeros)
+        return round(estimate)
+
+
+def record_view(kind, object_id, viewer, day=None):
+    """Add ``viewer`` to the sketch of ``(kind, object_id)`` for ``day`` (today), at the next flush"""
+    key = (kind, object_id, day or timezone.localdate())
+    value = viewer_hash(viewer)
+    with _pending_lock:
+        sketch = _pending.get(key)
+        if sketch is None:
+            sketch = _pending[key] = HyperLogLog()
+        changed = sketch.add(value)
+        waiting = len(_pending)
+    if changed:
+        counters.wake(waiting)
+
+
+def _merge_row(kind, object_id, day, sketch):
+    rows = ViewerSketch.objects.filter(kind=kind, object_id=object_id, day=day)
+    data = rows.select_for_update().values_list('registers', flat=True).first()
+    if data is None:
+        try:
+            with transaction.atomic():
+                ViewerSketch.objects.create(
+                    kind=kind, object_id=object_id, day=day, registers=sketch.to_bytes()
+                )
+            return
+        except IntegrityError:
+            # Created by another process since the read
+            data = rows.select_for_update().values_list('registers', flat=True).get()
+    stored = HyperLogLog.from_bytes(data)
+    merged = HyperLogLog(bytearray(stored.registers)).merge(sketch)
+    if merged.registers != stored.registers:
+        rows.update(registers=merged.to_bytes(), updated_at=timezone.now())
+
+
+@counters.register_flush
+def flush():
+    """Merge the views this process has buffered into their rows; returns how many rows"""
+    global _pending
+    with _pending_lock:
+        taken, _pending = _pending, {}
+    keys = sorted(taken)
+    for position, key in enumerate(keys):
+        try:
+            with transaction.atomic():
+                _merge_row(*key, taken[key])
+        except Exception:
+            # Put back every sketch not written yet
+            with _pending_lock:
+                for unwritten in keys[position:]:
+                    sketch = _pending.get(unwritten)
+                    _pending[unwritten] = (
+                        taken[unwritten] if sketch is None else sketch.merge(taken[unwritten])
+                    )
+            raise
+    return len(keys)
+
+
+def unique_viewers(kind, object_id, today=None):
+    """Distinct viewers of ``(kind, object_id)`` over each of ``WINDOWS``, from one query"""
+    today = today or timezone.localdate()
+    since = today - timedelta(days=max(days for _, days in WINDOWS))
+    rows = list(ViewerSketch.objects.filter(
+        kind=kind, object_id=object_id, day__gt=since, day__lte=today,
+    ).values_list('day', 'registers'))
+    # This process's views that are not written yet
+    with _pending_lock:
+        rows.extend(
+            (day, bytes([DENSE]) + bytes(sketch.registers))
+            for (pending_kind, pending_id, day), sketch in _pending.items()
+            if (pending_kind, pending_id) == (kind, object_id) and since < day <= today
+        )
+    rows.sort(key=lambda row: row[0], reverse=True)
+    merged = HyperLogLog()
+    counts = {}
+    position = 0
+    for name, days in sorted(WINDOWS, key=lambda window: window[1]):
+        start = today - timedelta(days=days)
+        while position < len(rows) and rows[position][0] > start:
+            merged.merge(HyperLogLog.from_bytes(rows[position][1]))
+            position += 1
+        counts[name] = merged.estimate()
+    counts['standard_error'] = round(STANDARD_ERROR, 4)
+    return counts
@@ -0,0 +1,124 @@
+"""``Skill.usage_count`` and ``Skills.endorsement_count``, kept up to date on write.
+
+``usage_count`` is the number of users with a skill (``Skills`` rows) and
+``endorsement_count`` the number of endorsements of a user's skill
+(``SkillEndorsement`` rows). Reading them is a column read, and
+``SkillViewSet`` orders by ``usage_count`` from an index. Writes keep them
+exact:
+
+* Creating, deleting or re-pointing a ``Skills`` or ``SkillEndorsement``
+  row adds ``+1``/``-1`` to the counted row with an ``UPDATE ... SET n = n
+  + <delta>`` (the save and delete signals in ``jobs/signals.py``). The
+  models save in a transaction, and deletes run in one, so the count
+  changes commit or roll back with the row.
+* ``bulk_create`` sends no signals, so the bulk routes of ``SkillsViewSet``
+  adjust the counts themselves. Inside ``deferred()`` the deltas of a whole
+  batch are summed and written as one ``UPDATE`` per 500 counted rows,
+  with a ``CASE`` over their keys.
+
+A count never goes below zero. Rows written around these paths (raw SQL,
+fixtures, ``QuerySet.update()`` of the foreign key) leave the counts
+drifting. ``reconcile()`` (the ``reconcile_skill_counts`` command)
+recomputes them set-based, a chunk of rows per statement, and only writes
+the rows that are wrong.
+
+``usage_count`` is part of the skill taxonomy snapshot, but writing it
+leaves the taxonomy version alone; the snapshot picks counts up within
+``TAXONOMY_COUNT_TTL`` seconds (``jobs/taxonomy.py``). An endorsement also
+moves its ``Skills`` row's ``updated_at``, which ETags are made from.
+"""
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from . import counters
+from .counts import Counted
+from .models.skills import Skill, Skills
+
+BATCH_SIZE = counters.BATCH_SIZE
+
+# Counted field -> (model, the relation it counts, the field moved with it)
+COUNTS = {
+    'usage_count': (Skill, 'user_skills', None),
+    'endorsement_count': (Skills, 'endorsements', 'updated_at'),
+}
+
+_local = threading.local()
+
+
+def _write(field, deltas):
+    """Add ``{pk: delta}`` to ``field``, never going below zero"""
+    model, _, touch = COUNTS[field]
+    items = sorted((pk, delta) for pk, delta in deltas.items() if pk is not None and delta)
+    if not items:
+        return
+    now = timezone.now()
+    for start in range(0, len(items), BATCH_SIZE):
+        batch = items[start:start + BATCH_SIZE]
+        update = {field: Greatest(F(field) + counters.increment(batch), Value(0))}
+        if touch:
+            update[touch] = now
+        model._base_manager.filter(pk__in=[pk for pk, _ in batch]).update(**update)
+
+
+def adjust(field, deltas):
+    """Add ``{pk: delta}`` to ``field``, now or when the enclosing ``deferred()`` ends"""
+    pending = getattr(_local, 'pending', None)
+    if pending is not None:
+        pending[field].update(deltas)
+    else:
+        _write(field, deltas)
+
+
+@contextmanager
+def deferred():
+    """Sum the ``adjust()`` calls of the block and write them together at its end"""
+    if getattr(_local, 'pending', None) is not None:
+        # The outermost block writes
+        yield
+        return
+    _local.pending = defaultdict(Counter)
+    try:
+        yield
+        pending = _local.pending
+    finally:
+        _local.pending = None
+    for field, deltas in pending.items():
+        _write(field, deltas)
+
+
+def moves(before, after):
+    """Deltas for rows re-pointed from ``before`` to ``after`` (``{pk: foreign key}``)"""
+    deltas = Counter()
+    for pk, target in after.items():
+        if before.get(pk, target) != target:
+            deltas[before[pk]] -= 1
+            deltas[target] += 1
+    return deltas
+
+
+def reconcile(field, chunk_size=1000):
+    """Recompute ``field`` a chunk of rows per UPDATE; returns how many rows were wrong"""
+    model, relation, _ = COUNTS[field]
+    actual = Counted(relation).expression(model)
+    fixed = 0
+    last = 0
+    while True:
+        ids = list(
+            model._base_manager.filter(pk__gt=last).order_by('pk')
+            .values_list('pk', flat=True)[:chunk_size]
+        )
+        if not ids:
+            break
+        with transaction.atomic():
+            fixed += (
+                model._base_manager.filter(pk__gte=ids[0], pk__lte=ids[-1])
+                .exclude(**{field: actual}).update(**{field: actual})
+            )
+        last = ids[-1]
+    return fixed
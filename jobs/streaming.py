@@ -0,0 +1,73 @@
+"""Streaming JSON / NDJSON output for large list endpoints.
+
+Rows are read with ``QuerySet.iterator(chunk_size=...)`` and serialized and
+encoded one chunk at a time, so memory stays flat however many rows there
+are and the first bytes leave before the last row is read.
+"""
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+
+from .renderers import dumps
+
+CHUNK_SIZE = 2000
+
+STREAM_FORMATS = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def requested_format(request):
+    """Return the stream format asked for by ``?stream=``, else None"""
+    fmt = request.query_params.get('stream')
+    return fmt if fmt in STREAM_FORMATS else None
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def serialized_chunks(objects, serializer_class, chunk_size=None, context=None):
+    """Yield lists of serialized rows, ``chunk_size`` objects at a time"""
+    for chunk in chunked(objects, chunk_size or CHUNK_SIZE):
+        yield serializer_class(chunk, many=True, context=context or {}).data
+
+
+def json_array(chunks):
+    separator = b'['
+    for rows in chunks:
+        if rows:
+            yield separator + b','.join(dumps(row) for row in rows)
+            separator = b','
+    yield b']' if separator == b',' else b'[]'
+
+
+def ndjson(chunks):
+    for rows in chunks:
+        if rows:
+            yield b''.join(dumps(row) + b'\n' for row in rows)
+
+
+def _response(chunks, fmt):
+    body = ndjson(chunks) if fmt == 'ndjson' else json_array(chunks)
+    return StreamingHttpResponse(body, content_type=STREAM_FORMATS[fmt])
+
+
+def stream_response(objects, serializer_class, fmt, chunk_size=None, context=None):
+    """Return a StreamingHttpResponse serializing ``objects`` in ``fmt``"""
+    return _response(serialized_chunks(objects, serializer_class, chunk_size, context), fmt)
+
+
+def stream_compiled(rows, compiled, fmt, chunk_size=None, context=None):
+    """Like ``stream_response`` for ``values()`` rows and a compiled serializer"""
+    chunks = (
+        compiled.to_representation(chunk, context)
+        for chunk in chunked(rows, chunk_size or CHUNK_SIZE)
+    )
+    return _response(chunks, fmt)
@@ -0,0 +1,272 @@
+"""Versioned snapshot and response cache for the skill taxonomy endpoints.
+
+Skill categories and skills change a few times a day but are read on
+every profile-edit screen. ``TaxonomyCacheMixin`` answers the list and
+detail actions of ``SkillCategoryViewSet`` and ``SkillViewSet`` without
+touching the database, in two layers:
+
+* The snapshot: every category and skill, loaded and serialized once per
+  taxonomy version and kept in process memory. Filters (``filterset_fields``,
+  exact matches), search (``search_fields``, case-insensitive substrings,
+  every term must match) and ordering (``?ordering=`` or the view's
+  default, tie-broken on the primary key) are applied to it in Python.
+  List pages use offset cursors over the ordered ids, which stay valid
+  while the version is the same.
+* Rendered responses: the bytes of each response, keyed by the version,
+  the action, the query string, the host and the negotiated media type.
+  An identical request is answered with those bytes as they are. The
+  browsable API, whose HTML is per user, is not cached.
+
+The version is a counter in the cache, bumped by the Skill and
+SkillCategory save and delete signals (``bump_version``), so after a write
+every process reloads its snapshot on its next request and older response
+entries are never read again. Writes that bypass the signals, such as
+``QuerySet.update()``, must call ``bump_version`` themselves.
+
+``Skill.usage_count`` moves whenever a user adds or removes a skill, too
+often to retire the cache each time, so those writes leave the version
+alone. Instead both layers are also keyed by a clock interval of
+``TAXONOMY_COUNT_TTL`` seconds (default 60): the snapshot is reloaded and
+the responses rendered again once per interval, which bounds how stale a
+count can be. A list cursor handed out in one interval may skip or repeat
+a row in the next if the counts reorder it.
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.http import Http404, HttpResponse
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+
+from .fieldsets import requested
+from .models.skills import Skill, SkillCategory
+from .pagination import InvalidCursor, _parse_ordering, _value, paginate_ranked
+from .prefetch import with_relations
+from .serializers.skills_serializer import SkillCategorySerializer, SkillSerializer
+
+TIMEOUT = getattr(settings, 'TAXONOMY_CACHE_TIMEOUT', 3600)
+
+COUNT_TTL = getattr(settings, 'TAXONOMY_COUNT_TTL', 60)
+
+VERSION_KEY = 'taxonomy:version'
+
+# NullBooleanSelect's reading of a boolean filter value; anything else
+# leaves the filter off, as in django-filter
+BOOLEAN_VALUES = {'true': True, 'True': True, '2': True, 'false': False, 'False': False, '3': False}
+
+
+def _incr(key):
+    # cache.incr() refuses missing keys; add() is a no-op when present
+    cache.add(key, 0, timeout=None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+        return 1
+
+
+def version():
+    value = cache.get(VERSION_KEY)
+    if value is None:
+        cache.add(VERSION_KEY, 1, timeout=None)
+        value = cache.get(VERSION_KEY, 1)
+    return value
+
+
+def bump_version():
+    """Invalidate the snapshot and every cached response; called on taxonomy writes.
+
+    Bumped again once the surrounding transaction commits, so a snapshot
+    loaded by another request before the commit is not kept.
+    """
+    transaction.on_commit(lambda: _incr(VERSION_KEY))
+    return _incr(VERSION_KEY)
+
+
+def stamp():
+    """``(version, count interval)``: what the snapshot and responses are keyed by"""
+    return version(), int(time.time() // COUNT_TTL)
+
+
+class Table:
+    """One model's rows: instances for filtering/ordering, serialized dicts to send"""
+
+    def __init__(self, queryset, serializer_class):
+        self.objects = {obj.pk: obj for obj in with_relations(queryset, serializer_class)}
+        data = serializer_class(list(self.objects.values()), many=True, omit=()).data
+        self.rows = {obj_pk: dict(row) for obj_pk, row in zip(self.objects, data)}
+
+
+# The models in the snapshot, each with the serializer its endpoint sends
+SERIALIZERS = {SkillCategory: SkillCategorySerializer, Skill: SkillSerializer}
+
+
+class Snapshot:
+    """The whole taxonomy, serialized, at one version and count interval"""
+
+    def __init__(self, stamp):
+        self.stamp = stamp
+        self.tables = {
+            model: Table(model.objects.all(), serializer_class)
+            for model, serializer_class in SERIALIZERS.items()
+        }
+
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def get_snapshot():
+    """The snapshot for the current version and interval, loading it if it is older"""
+    global _snapshot
+    current = stamp()
+    snapshot = _snapshot
+    if snapshot is None or snapshot.stamp != current:
+        with _snapshot_lock:
+            if _snapshot is None or _snapshot.stamp != current:
+                _snapshot = Snapshot(current)
+            snapshot = _snapshot
+    return snapshot
+
+
+def _matches_filters(obj, filters):
+    return all(getattr(obj, attname) == value for attname, value in filters)
+
+
+def _matches_search(obj, fields, terms):
+    texts = [str(_value(obj, field) or '').lower() for field in fields]
+    return all(any(term in text for text in texts) for term in terms)
+
+
+def _sort_key(field):
+    def key(obj):
+        value = _value(obj, field)
+        return (0,) if value is None else (1, value)
+    return key
+
+
+def _sorted(objects, keys):
+    # Stable sorts from the last key to the first; NULLs first ascending and
+    # last descending, like the keyset paginator's ORDER BY
+    for field, descending in reversed(keys):
+        objects.sort(key=_sort_key(field), reverse=descending)
+    return objects
+
+
+class TaxonomyCacheMixin:
+    """Serve ``list``/``retrieve`` from the taxonomy snapshot and response cache"""
+
+    def _filters(self, request, snapshot):
+        """``(attname, value)`` pairs from the ``filterset_fields`` parameters"""
+        model = self.get_queryset().model
+        filters = []
+        errors = {}
+        for name in getattr(self, 'filterset_fields', ()):
+            raw = request.query_params.get(name)
+            if raw in (None, ''):
+                continue
+            field = model._meta.get_field(name)
+            if field.get_internal_type() == 'BooleanField':
+                if raw in BOOLEAN_VALUES:
+                    filters.append((field.attname, BOOLEAN_VALUES[raw]))
+                continue
+            try:
+                value = (field.target_field if field.is_relation else field).to_python(raw)
+            except DjangoValidationError:
+                value = None
+            related = snapshot.tables.get(field.related_model) if field.is_relation else None
+            if value is None or (related is not None and value not in related.objects):
+                errors[name] = [
+                    'Select a valid choice. That choice is not one of the available choices.'
+                ]
+                continue
+            filters.append((field.attname, value))
+        if errors:
+            raise ValidationError(errors)
+        return filters
+
+    def _resolve(self, request, snapshot):
+        """The ordered objects the filters, search and ordering select"""
+        table = snapshot.tables[self.get_queryset().model]
+        filters = self._filters(request, snapshot)
+        objects = [obj for obj in table.objects.values() if _matches_filters(obj, filters)]
+        search_fields = getattr(self, 'search_fields', None)
+        if search_fields and SearchFilter in self.filter_backends:
+            terms = [term.lower() for term in SearchFilter().get_search_terms(request)]
+            if terms:
+                objects = [obj for obj in objects if _matches_search(obj, search_fields, terms)]
+        ordering = None
+        if OrderingFilter in self.filter_backends:
+            ordering = OrderingFilter().get_ordering(request, self.get_queryset(), self)
+        return _sorted(objects, _parse_ordering(ordering or self.ordering or ()))
+
+    def _project(self, rows):
+        """Rows narrowed to the ``?fields=``/``?omit=`` selection"""
+        params = requested(self.request)
+        if not params:
+            return rows
+        names = list(self.get_serializer_class()(**params).fields)
+        return [{name: row[name] for name in names} for row in rows]
+
+    def _cached(self, handler, *parts):
+        """Serve the cached bytes for this request, or render and cache ``handler()``"""
+        request = self.request
+        renderer = request.accepted_renderer
+        if isinstance(renderer, BrowsableAPIRenderer):
+            return handler(get_snapshot())
+        snapshot = get_snapshot()
+        digest = hashlib.md5(repr((
+            type(self).__name__, parts, sorted(request.query_params.lists()),
+            request.accepted_media_type, request.scheme, request.get_host(),
+        )).encode()).hexdigest()
+        key = 'taxonomy:{}:{}:{}'.format(*snapshot.stamp, digest)
+        entry = cache.get(key)
+        if entry is not None:
+            content, content_type = entry
+            return HttpResponse(content, content_type=content_type)
+
+        response = handler(snapshot)
+
+        def store(response):
+            if response.status_code == 200:
+                cache.set(key, (response.content, response['Content-Type']), min(TIMEOUT, COUNT_TTL))
+        response.add_post_render_callback(store)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        def handler(snapshot):
+            table = snapshot.tables[self.get_queryset().model]
+            ids = [obj.pk for obj in self._resolve(request, snapshot)]
+            if self.paginator is None:
+                return Response(self._project([table.rows[pk] for pk in ids]))
+            try:
+                page = paginate_ranked(
+                    ids, request.query_params.get(self.paginator.cursor_query_param),
+                    self.paginator.get_page_size(request),
+                )
+            except InvalidCursor:
+                raise NotFound('Invalid cursor')
+            self.paginator.set_page(request, page, total=len(ids))
+            return self.get_paginated_response(self._project([table.rows[pk] for pk in page]))
+        return self._cached(handler, 'list')
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = kwargs[self.lookup_url_kwarg or self.lookup_field]
+
+        def handler(snapshot):
+            model = self.get_queryset().model
+            try:
+                pk = model._meta.pk.to_python(lookup)
+            except DjangoValidationError:
+                raise Http404
+            if pk not in {obj.pk for obj in self._resolve(request, snapshot)}:
+                raise Http404(f'No {model._meta.object_name} matches the given query.')
+            return Response(self._project([snapshot.tables[model].rows[pk]])[0])
+        return self._cached(handler, 'retrieve', lookup)
@@ -0,0 +1,31 @@
+"""Test helpers for the jobs app."""
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryCountAssertionsMixin:
+    """TestCase mixin for checking that list endpoints have no N+1 queries"""
+
+    def assertConstantQueries(self, fetch, grow, sizes=(1, 5, 20)):
+        """Assert ``fetch(n)`` runs as many queries whatever the number of rows.
+
+        ``grow(n)`` is called before each run to make sure at least ``n``
+        rows exist; ``fetch(n)`` then runs the request (e.g. a test client
+        GET with ``page_size=n``). An unmeasured first run warms the
+        process-wide search indexes. On failure the message lists the
+        queries of the biggest run.
+        """
+        grow(sizes[0])
+        fetch(sizes[0])
+        counts = []
+        for size in sizes:
+            grow(size)
+            with CaptureQueriesContext(connection) as context:
+                fetch(size)
+            counts.append(len(context.captured_queries))
+        if len(set(counts)) > 1:
+            queries = '\n'.join(query['sql'] for query in context.captured_queries)
+            self.fail(
+                f'Query count grows with the page size: '
+                f'{dict(zip(sizes, counts))}\nQueries for {sizes[-1]} rows:\n{queries}'
+            )
@@ -1,3 +1,1760 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import queue
+import re
+import tempfile
+import threading
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from functools import partial
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import cbor2
+import msgpack
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from . import (
+    bulk, compression, counters, events, rollups, sketches, skillcounts, streaming, taxonomy, views,
+)
+from .checks import counter_buffer_check, shared_cache_check
+from .geo import get_gazetteer
+from .models import (
+    Company, DailyRollup, Education, Experience, HourlyRollup, InteractionEvent, Job, JobApplication,
+    RollupCheckpoint, SearchSynonym, Skill, SkillCategory, SkillEndorsement, Skills, UserDetails,
+    ViewerSketch,
+)
+from .pagination import InvalidCursor, KeysetPaginator, encode_cursor
+from .prefetch import with_relations
+from .renderers import CBORRenderer, FastJSONRenderer, MessagePackRenderer, orjson
+from .search import analysis
+from .search import cache as result_cache
+from .search.autocomplete import warm_autocomplete
+from .search.facets import FacetIndex, warm_facets
+from .search import ranking
+from .search.ranking import Preferences, RankingIndex, warm_ranking
+from .search.salary import SalaryRange
+from .serializers.compiled import compiled_reader
+from .serializers.job_serializer import CompanySerializer, JobSerializer
+from .serializers.skills_serializer import SkillCategorySerializer
+from .testing import QueryCountAssertionsMixin
+
+
+class FacetIndexTests(SimpleTestCase):
+    """Facet counts from the in-memory index"""
+
+    def setUp(self):
+        self.index = FacetIndex()
+        jobs = [
+            (1, 'Alphaville', 120000, 130000),
+            (2, 'Alphaville', 60000, 70000),
+            (3, 'Betatown', 120000, 130000),
+            (4, 'Betatown', 160000, 170000),
+            (5, 'Betatown', 110000, 180000),
+        ]
+        for job_id, location, low, high in jobs:
+            self.index.update_job(
+                job_id, 'full-time', location, 1, Decimal(low), Decimal(high), True
+            )
+
+    def salary_counts(self, **filters):
+        facets = self.index.facets(**filters)
+        return {band['value']: band['count'] for band in facets['salary']}
+
+    def test_salary_bands_follow_the_location_filter(self):
+        counts = self.salary_counts(location='Alphaville')
+        self.assertEqual(counts['100000-150000'], 1)
+        self.assertEqual(counts['150000-200000'], 0)
+
+    def test_salary_bands_follow_the_location_filter_with_a_salary_filter(self):
+        # Salary bands ignore the salary filter itself, but not the location
+        counts = self.salary_counts(location='Alphaville', salary=SalaryRange(Decimal(100000)))
+        self.assertEqual(counts['50000-100000'], 1)
+        self.assertEqual(counts['100000-150000'], 1)
+        self.assertEqual(counts['150000-200000'], 0)
+        facets = self.index.facets(location='Alphaville', salary=SalaryRange(Decimal(100000)))
+        self.assertEqual(facets['total'], 1)
+        self.assertEqual(
+            {row['value']: row['count'] for row in facets['location']},
+            {'Alphaville': 1, 'Betatown': 3},
+        )
+
+
+class RankingIndexTests(SimpleTestCase):
+    """Candidate order under the configured weights, at a fixed clock"""
+
+    NOW = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+
+    # id: (age in days, job type, location, company, salary_min, salary_max)
+    JOBS = {
+        1: (0, 'full-time', 'Berlin', 1, None, None),
+        2: (14, 'full-time', 'Berlin', 2, Decimal(50000), Decimal(60000)),
+        3: (28, 'remote', 'Remote', 1, Decimal(90000), None),
+        4: (7, 'contract', 'Paris', 2, None, None),
+        5: (0, 'full-time', 'Paris', 2, None, None),
+        6: (3, 'part-time', 'Remote', 1, Decimal(40000), Decimal(45000)),
+    }
+    QUALITY = {1: 1.0, 2: 0.25}
+    TEXT = {2: 2.0, 3: 4.0, 4: 1.0}
+
+    def setUp(self):
+        self.now = self.NOW.timestamp()
+        self.index = RankingIndex(epoch=self.now)
+        for company_id, quality in self.QUALITY.items():
+            self.index.update_company(company_id, quality)
+        for job_id, (age, job_type, location, company_id, low, high) in self.JOBS.items():
+            self.index.update_job(
+                job_id, self.NOW - timedelta(days=age), job_type, location, location.lower(),
+                company_id, low, high, True,
+            )
+
+    def expected(self, text_scores=None, preferences=None, weights=None):
+        """Ids ordered by ``sum(weight * feature)``, computed from the spec"""
+        weights = {**ranking.WEIGHTS, **(weights or {})}
+        best = max(text_scores.values()) if text_scores else 0
+        scores = {}
+        for job_id, (age, job_type, location, company_id, low, high) in self.JOBS.items():
+            score = (
+                weights['recency'] * 0.5 ** (age / ranking.HALF_LIFE_DAYS)
+                + weights['salary'] * (low is not None or high is not None)
+                + weights['company'] * self.QUALITY[company_id]
+            )
+            if best:
+                score += weights['text'] * text_scores.get(job_id, 0) / best
+            if preferences:
+                met = (job_type == preferences.job_type) + (
+                    preferences.remote and ranking.is_remote(job_type, location)
+                )
+                if preferences.salary and (low or high):
+                    job_low, job_high = float(low or high), float(high or low)
+                    met += job_low <= preferences.salary[1] and job_high >= preferences.salary[0]
+                score += weights['match'] * met / len(preferences)
+            scores[job_id] = score
+        return sorted(scores, key=lambda job_id: (scores[job_id], job_id), reverse=True)
+
+    def top(self, **kwargs):
+        return self.index.top(list(self.JOBS), now=self.now, **kwargs)
+
+    def scenarios(self):
+        preferences = Preferences(job_type='full-time', salary=(55000.0, 70000.0))
+        return [
+            {},
+            {'text_scores': self.TEXT},
+            {'preferences': preferences},
+            {'text_scores': self.TEXT, 'preferences': preferences},
+            {'text_scores': self.TEXT, 'weights': {'text': 0.1, 'recency': 2.0}},
+            {'preferences': Preferences(remote=True), 'weights': {'company': 0}},
+        ]
+
+    def test_weights_order_the_candidates(self):
+        for kwargs in self.scenarios():
+            with self.subTest(**kwargs):
+                self.assertEqual(self.top(**kwargs), self.expected(**kwargs))
+
+    def test_features(self):
+        # The company profile separates two jobs posted together
+        self.assertEqual(self.index.top([5, 1], now=self.now), [1, 5])
+        # A stated salary outweighs three days of recency
+        self.assertEqual(self.top()[:2], [6, 1])
+        # A strong text match outweighs four weeks of recency
+        self.assertEqual(self.top(text_scores=self.TEXT)[0], 3)
+        # Recency alone orders by age; ties go to the newest id
+        self.assertEqual(
+            self.top(weights={'salary': 0, 'company': 0}), [5, 1, 6, 4, 2, 3]
+        )
+        self.assertEqual(self.top(k=2, weights={'recency': 0, 'company': 0}), [6, 3])
+
+    def test_recency_follows_the_clock(self):
+        # Once job 5 has aged four weeks more, job 3's salary and company win
+        self.assertEqual(self.index.top([3, 5], now=self.now), [5, 3])
+        later = self.now + 28 * 86400
+        self.assertEqual(self.index.top([3, 5], now=later), [3, 5])
+
+    @skipUnless(ranking.numpy is not None, 'numpy is not installed')
+    def test_python_and_numpy_paths_agree(self):
+        for kwargs in self.scenarios():
+            for k in (len(self.JOBS), 3, 1):
+                with self.subTest(k=k, **kwargs):
+                    vectorized = self.top(k=k, **kwargs)
+                    with mock.patch.object(ranking, 'numpy', None):
+                        self.assertEqual(self.top(k=k, **kwargs), vectorized)
+                    self.assertEqual(vectorized, self.expected(**kwargs)[:k])
+
+
+class ProfileListQueryTests(QueryCountAssertionsMixin, TestCase):
+    """The per-user list endpoints run as many queries for N rows as for 2N"""
+
+    SIZES = (5, 10)
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='secret')
+        self.client.force_login(self.user)
+        self.category = SkillCategory.objects.create(name='Engineering')
+
+    def fetch(self, url):
+        def fetch(size):
+            response = self.client.get(url, {'page_size': size})
+            self.assertEqual(response.status_code, 200, response.content)
+            self.assertEqual(len(response.json()['results']), size)
+        return fetch
+
+    def add_user_skills(self, count):
+        existing = Skills.objects.filter(user=self.user).count()
+        for number in range(existing, count):
+            skill = Skill.objects.create(name=f'Skill {number}', category=self.category)
+            Skills.objects.create(user=self.user, skill=skill, proficiency_level='advanced')
+
+    def test_user_skills(self):
+        self.assertConstantQueries(
+            self.fetch('/api/v1/user-skills/'), self.add_user_skills, sizes=self.SIZES
+        )
+
+    def test_skill_endorsements(self):
+        skill = Skill.objects.create(name='Python', category=self.category)
+        user_skill = Skills.objects.create(user=self.user, skill=skill, proficiency_level='expert')
+
+        def grow(count):
+            for number in range(user_skill.endorsements.count(), count):
+                endorser = User.objects.create_user(f'endorser{number}')
+                SkillEndorsement.objects.create(user_skill=user_skill, endorsed_by=endorser)
+
+        self.assertConstantQueries(
+            self.fetch('/api/v1/skill-endorsements/'), grow, sizes=self.SIZES
+        )
+
+    def test_education(self):
+        def grow(count):
+            for number in range(self.user.education.count(), count):
+                Education.objects.create(
+                    user=self.user, institution=f'University {number}', degree='bachelor',
+                    field_of_study='Physics', start_date=date(2000 + number, 9, 1),
+                )
+
+        self.assertConstantQueries(self.fetch('/api/v1/education/'), grow, sizes=self.SIZES)
+
+    def test_experience(self):
+        def grow(count):
+            for number in range(self.user.experiences.count(), count):
+                Experience.objects.create(
+                    user=self.user, job_title='Engineer', company=f'Company {number}',
+                    employment_type='full_time', start_date=date(2000 + number, 1, 1),
+                    description='Built things',
+                )
+
+        self.assertConstantQueries(self.fetch('/api/v1/experience/'), grow, sizes=self.SIZES)
+
+
+class ProfileDocumentTests(QueryCountAssertionsMixin, TestCase):
+    """The profile document's query count does not grow with its sections"""
+
+    SIZES = (2, 6)
+
+    def setUp(self):
+        counters.flush()
+        # Keep background flushes out of the test's transaction
+        patcher = mock.patch.object(counters, 'FLUSH_INTERVAL', 3600)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user('owner')
+        self.client.force_login(self.user)
+        self.category = SkillCategory.objects.create(name='Engineering')
+        UserDetails.objects.create(user=self.user, current_job_title='Engineer')
+
+    def grow(self, count):
+        for number in range(Skills.objects.filter(user=self.user).count(), count):
+            skill = Skill.objects.create(name=f'Skill {number}', category=self.category)
+            user_skill = Skills.objects.create(
+                user=self.user, skill=skill, proficiency_level='advanced'
+            )
+            endorser = User.objects.create_user(f'endorser{number}')
+            SkillEndorsement.objects.create(user_skill=user_skill, endorsed_by=endorser)
+            Experience.objects.create(
+                user=self.user, job_title='Engineer', company=f'Company {number}',
+                employment_type='full_time', start_date=date(2000 + number, 1, 1),
+                description='Built things',
+            )
+            Education.objects.create(
+                user=self.user, institution=f'University {number}', degree='bachelor',
+                field_of_study='Physics', start_date=date(2000 + number, 9, 1),
+            )
+
+    def fetch(self, size):
+        response = self.client.get('/api/v1/profile/')
+        self.assertEqual(response.status_code, 200, response.content)
+        document = response.json()
+        for name in ('skills', 'endorsements', 'experience', 'education'):
+            self.assertEqual(len(document[name]), size, name)
+
+    def test_constant_queries(self):
+        self.assertConstantQueries(self.fetch, self.grow, sizes=self.SIZES)
+
+    def test_unknown_section(self):
+        response = self.client.get('/api/v1/profile/', {'include': 'skills,hobbies'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('hobbies', response.json()['include'])
+
+    def test_not_modified(self):
+        self.grow(2)
+        for url in ('/api/v1/profile/', '/api/v1/profile/?include=skills,education'):
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+                self.assertEqual(response.content, b'')
+        self.assertNotEqual(
+            self.client.get('/api/v1/profile/')['ETag'],
+            self.client.get('/api/v1/profile/?include=skills')['ETag'],
+        )
+
+
+class CountedRelationQueryTests(QueryCountAssertionsMixin, TestCase):
+    """Count fields and admin count columns come from one annotated query"""
+
+    SIZES = (5, 10)
+
+    def add_categories(self, count):
+        for number in range(SkillCategory.objects.count(), count):
+            category = SkillCategory.objects.create(name=f'Category {number}')
+            for skill in range(number % 3):
+                Skill.objects.create(name=f'Skill {number}.{skill}', category=category)
+
+    def test_skill_category_serializer(self):
+        for size in self.SIZES:
+            self.add_categories(size)
+            categories = with_relations(SkillCategory.objects.all(), SkillCategorySerializer)
+            with self.assertNumQueries(1):
+                rows = SkillCategorySerializer(categories, many=True).data
+            self.assertEqual(len(rows), size)
+            self.assertEqual(
+                {row['name']: row['skill_count'] for row in rows},
+                {f'Category {number}': number % 3 for number in range(size)},
+            )
+
+    def test_skill_category_list(self):
+        user = User.objects.create_user('reader')
+        self.client.force_login(user)
+
+        def fetch(size):
+            # Measure the snapshot build, not a cached snapshot
+            taxonomy.bump_version()
+            response = self.client.get('/api/v1/skill-categories/', {'page_size': size})
+            self.assertEqual(response.status_code, 200, response.content)
+            rows = response.json()['results']
+            self.assertEqual(len(rows), size)
+            self.assertEqual(
+                {row['name']: row['skill_count'] for row in rows},
+                {f'Category {number}': number % 3 for number in range(size)},
+            )
+
+        self.assertConstantQueries(fetch, self.add_categories, sizes=self.SIZES)
+
+    def test_job_admin_changelist(self):
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'secret')
+        applicant = User.objects.create_user('applicant')
+        self.client.force_login(admin_user)
+        company = Company.objects.create(name='Acme', description='Widgets', location='Remote')
+
+        def grow(count):
+            for number in range(Job.objects.count(), count):
+                job = Job.objects.create(
+                    title=f'Job {number}', description='Work', company=company,
+                    location='Remote', job_type='full-time', requirements='None',
+                )
+                JobApplication.objects.bulk_create([
+                    JobApplication(user=applicant, job=job, resume='resumes/cv.pdf')
+                    for _ in range(number % 3)
+                ])
+
+        def fetch(size):
+            response = self.client.get('/admin/jobs/job/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.context['cl'].result_count, size)
+            counts = {job.title: job.application_count for job in response.context['cl'].result_list}
+            self.assertEqual(counts, {f'Job {number}': number % 3 for number in range(size)})
+
+        self.assertConstantQueries(fetch, grow, sizes=self.SIZES)
+
+
+class BinaryFormatTests(TestCase):
+    """MessagePack and CBOR bodies carry exactly what the JSON body does"""
+
+    FORMATS = {
+        'msgpack': (MessagePackRenderer, partial(msgpack.unpackb, raw=False), msgpack.packb),
+        'cbor': (CBORRenderer, cbor2.loads, cbor2.dumps),
+    }
+
+    def setUp(self):
+        self.user = User.objects.create_user('student')
+        self.client.force_login(self.user)
+        for number in range(3):
+            Education.objects.create(
+                user=self.user, institution=f'University {number}', degree='master',
+                field_of_study='Chemistry', start_date=date(2010 + number, 9, 1),
+                grade='A', description='Thesis on   separators',
+            )
+
+    def test_renderers_match_json(self):
+        data = {
+            'decimal': Decimal('1234.50'),
+            'datetime': datetime(2024, 5, 1, 12, 30, 15, 250000, tzinfo=dt_timezone.utc),
+            'date': date(2024, 5, 1),
+            'time': time(9, 15),
+            'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'float': 0.1,
+            'nested': [{'b': 1, 'a': None}, 'text', True],
+        }
+        expected = json.loads(FastJSONRenderer().render(data))
+        # A bare Decimal is a number, as with DRF's encoder (serializer
+        # DecimalFields send strings)
+        self.assertEqual(expected['decimal'], 1234.5)
+        self.assertEqual(expected['datetime'], '2024-05-01T12:30:15.250000Z')
+        for name, (renderer, loads, _) in self.FORMATS.items():
+            with self.subTest(name):
+                self.assertEqual(loads(renderer().render(data)), expected)
+
+    def test_negotiation(self):
+        expected = self.client.get('/api/v1/education/').json()
+        for name, (renderer, loads, _) in self.FORMATS.items():
+            for kwargs in ({'HTTP_ACCEPT': renderer.media_type}, {'data': {'format': name}}):
+                with self.subTest(name, **{key: str(value) for key, value in kwargs.items()}):
+                    response = self.client.get('/api/v1/education/', **kwargs)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response['Content-Type'], renderer.media_type)
+                    self.assertEqual(loads(response.content), expected)
+
+    def test_request_bodies(self):
+        for name, (renderer, _, dumps) in self.FORMATS.items():
+            with self.subTest(name):
+                body = dumps({
+                    'institution': f'{name} Institute', 'degree': 'phd',
+                    'field_of_study': 'Biology', 'start_date': '2020-09-01',
+                })
+                response = self.client.post(
+                    '/api/v1/education/', body, content_type=renderer.media_type
+                )
+                self.assertEqual(response.status_code, 201, response.content)
+                education = Education.objects.get(institution=f'{name} Institute')
+                self.assertEqual(education.start_date, date(2020, 9, 1))
+
+    def test_malformed_request_bodies(self):
+        for name, (renderer, _, _) in self.FORMATS.items():
+            with self.subTest(name):
+                response = self.client.post(
+                    '/api/v1/education/', b'\xc1\xff\x00', content_type=renderer.media_type
+                )
+                self.assertEqual(response.status_code, 400)
+
+
+class TruncatedJobListTests(TestCase):
+    """Job lists say when they stopped at the search or ranking limit"""
+
+    def setUp(self):
+        company = Company.objects.create(name='Acme', description='Widgets', location='Remote')
+        for number in range(6):
+            Job.objects.create(
+                title=f'Python developer {number}', description='Python services',
+                company=company, location='Remote', job_type='full-time', requirements='Python',
+            )
+        # The process-wide indexes outlive each test's rollback; rebuild them
+        warm_facets()
+        warm_ranking()
+        result_cache.bump_generation()
+
+    def get(self, **params):
+        response = self.client.get('/api/jobs/', params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_search_under_the_limit(self):
+        response = self.get(search='python', sort='newest')
+        self.assertIs(response.json()['truncated'], False)
+        self.assertNotIn(views.TRUNCATED_HEADER, response)
+        self.assertEqual(response.json()['facets']['total'], 6)
+
+    def test_search_over_the_limit(self):
+        with mock.patch('jobs.search.index.MAX_RESULTS', 4):
+            for sort in ('newest', 'relevance'):
+                with self.subTest(sort):
+                    response = self.get(search='python', sort=sort)
+                    self.assertIs(response.json()['truncated'], True)
+                    self.assertEqual(response[views.TRUNCATED_HEADER], 'true')
+                    self.assertEqual(response.json()['facets']['total'], 4)
+
+    def test_ranking_over_the_limit(self):
+        with mock.patch('jobs.views.TOP_K', 4):
+            response = self.get(sort='relevance', page_size=10)
+        self.assertIs(response.json()['truncated'], True)
+        self.assertEqual(len(response.json()['results']), 4)
+
+    def test_stream_over_the_limit(self):
+        with mock.patch('jobs.search.index.MAX_RESULTS', 4):
+            response = self.get(search='python', sort='newest', stream='ndjson')
+            lines = b''.join(response.streaming_content).splitlines()
+        self.assertEqual(response[views.TRUNCATED_HEADER], 'true')
+        self.assertEqual(len(lines), 4)
+
+
+class SearchSuggestionTests(TestCase):
+    """Job suggestions keep the keys of the single-job suggestions they replaced"""
+
+    def setUp(self):
+        self.company = Company.objects.create(name='Acme', description='Widgets', location='Remote')
+        self.jobs = [
+            Job.objects.create(
+                title='Data Engineer', description='Pipelines', company=self.company,
+                location=location, job_type='full-time', requirements='SQL',
+            )
+            for location in ('Berlin', 'Lisbon')
+        ]
+        warm_autocomplete()
+
+    def suggestions(self, query):
+        response = self.client.get('/api/search-suggestions/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['suggestions']
+
+    def test_job_suggestion_keys(self):
+        [suggestion] = [item for item in self.suggestions('data eng') if item['type'] == 'job']
+        newest = self.jobs[-1]
+        self.assertEqual(suggestion, {
+            'title': 'Data Engineer',
+            'company': 'Acme',
+            'location': 'Lisbon',
+            'url': f'/jobs/{newest.pk}/',
+            'type': 'job',
+            'count': 2,
+            'search_url': '/jobs/?search=Data+Engineer',
+        })
+
+    def test_a_moved_dictionary_is_rebuilt_off_the_request(self):
+        old = analysis.warm_dictionary()
+        started, release = threading.Event(), threading.Event()
+
+        def build(version):
+            started.set()
+            release.wait(5)
+            return analysis.SynonymDictionary(version)
+
+        with mock.patch.object(analysis, 'build_dictionary', build):
+            analysis.invalidate_dictionary()
+            with self.assertNumQueries(0):
+                self.assertIs(analysis.get_dictionary(), old)
+                self.assertTrue(self.suggestions('data eng'))
+            self.assertTrue(started.wait(5))
+            release.set()
+            analysis._rebuilder.join()
+        self.assertEqual(analysis.get_dictionary().version, analysis.current_version())
+        self.assertIsNot(analysis.get_dictionary(), old)
+
+    def test_removed_job_is_not_the_example(self):
+        self.jobs[-1].delete()
+        [suggestion] = [item for item in self.suggestions('data eng') if item['type'] == 'job']
+        self.assertEqual(suggestion['url'], f'/jobs/{self.jobs[0].pk}/')
+        self.assertEqual(suggestion['location'], 'Berlin')
+        self.assertEqual(suggestion['count'], 1)
+
+
+class ProcessIndexTests(TestCase):
+    """Process-local indexes pick up other workers' writes through the generation"""
+
+    def setUp(self):
+        self.builds = 0
+
+        def build():
+            self.builds += 1
+            return self.builds
+
+        self.index = result_cache.ProcessIndex(build)
+
+    def other_worker_writes(self):
+        result_cache.incr(result_cache.GENERATION_KEY)
+
+    def test_rebuilds_after_a_write_when_the_cache_is_shared(self):
+        with mock.patch.object(result_cache, 'is_shared', return_value=True), \
+                mock.patch.object(result_cache, 'INDEX_MAX_AGE', 0):
+            self.assertEqual(self.index.get(), 1)
+            self.assertEqual(self.index.get(), 1)
+            self.other_worker_writes()
+            # Rebuilt in the background; readers get the old index meanwhile
+            self.assertIn(self.index.get(), (1, 2))
+            self.index.thread.join()
+            self.assertEqual(self.index.get(), 2)
+            self.assertEqual(self.index.get(), 2)
+
+    def test_readers_do_not_wait_for_a_rebuild(self):
+        started, release = threading.Event(), threading.Event()
+
+        def build():
+            if self.index.index is not None:
+                started.set()
+                release.wait(5)
+            return object()
+
+        self.index.build = build
+        with mock.patch.object(result_cache, 'is_shared', return_value=True), \
+                mock.patch.object(result_cache, 'INDEX_MAX_AGE', 0):
+            first = self.index.get()
+            self.other_worker_writes()
+            self.assertIs(self.index.get(), first)
+            self.assertTrue(started.wait(5))
+            self.assertIs(self.index.get(), first)
+            release.set()
+            self.index.thread.join()
+            self.assertIsNot(self.index.get(), first)
+
+    def test_own_writes_do_not_rebuild(self):
+        with mock.patch.object(result_cache, 'is_shared', return_value=True), \
+                mock.patch.object(result_cache, 'INDEX_MAX_AGE', 0):
+            self.assertEqual(self.index.get(), 1)
+            result_cache.bump_generation()
+            result_cache.bump_generation()
+            self.assertEqual(self.index.get(), 1)
+            self.assertIsNone(self.index.thread)
+            # Own and other writes together still rebuild
+            result_cache.bump_generation()
+            self.other_worker_writes()
+            self.index.get()
+            self.index.thread.join()
+            self.assertEqual(self.index.get(), 2)
+
+    def test_checks_at_most_every_max_age(self):
+        with mock.patch.object(result_cache, 'is_shared', return_value=True), \
+                mock.patch.object(result_cache, 'INDEX_MAX_AGE', 3600):
+            self.assertEqual(self.index.get(), 1)
+            self.other_worker_writes()
+            self.assertEqual(self.index.get(), 1)
+
+    def test_local_cache_keeps_the_index(self):
+        self.assertEqual(self.index.get(), 1)
+        result_cache.bump_generation()
+        self.assertEqual(self.index.get(), 1)
+        self.assertEqual(self.index.warm(), 2)
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    def test_warns_on_a_local_cache(self):
+        self.assertEqual([warning.id for warning in shared_cache_check(None)], ['jobs.W001'])
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache',
+    }})
+    def test_quiet_on_a_shared_cache(self):
+        self.assertEqual(shared_cache_check(None), [])
+
+    @override_settings(COUNTER_BUFFER='local', CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache',
+    }})
+    def test_warns_on_local_counters_next_to_a_shared_cache(self):
+        self.assertEqual([warning.id for warning in counter_buffer_check(None)], ['jobs.W002'])
+
+
+class RecordingTarget:
+    """A buffered write target that records what each flush wrote"""
+
+    def __init__(self):
+        self.written = []
+        self.flushed = threading.Event()
+
+    def key(self, pk):
+        return f'test:recording:{id(self)}:{pk}'
+
+    def write(self, deltas):
+        self.written.append(deltas)
+        self.flushed.set()
+
+
+class BackgroundFlushTests(TestCase):
+    def setUp(self):
+        counters.flush()
+        self.target = RecordingTarget()
+
+    def test_idle_rows_are_flushed_without_another_increment(self):
+        # A thread of its own, not one an earlier test left sleeping
+        with mock.patch.object(counters, 'FLUSH_INTERVAL', 0.05), \
+                mock.patch.object(counters, '_flusher', None):
+            counters.add(self.target, 7, 3)
+            # TestCase never commits, so only the background thread can flush
+            self.assertTrue(self.target.flushed.wait(10))
+        self.assertEqual(self.target.written, [{7: 3}])
+
+
+class ViewerSketchTests(TestCase):
+    """Views reach the sketch rows at the counter flush, not in the request"""
+
+    def setUp(self):
+        counters.flush()
+        # Keep background flushes out of the test's transaction
+        patcher = mock.patch.object(counters, 'FLUSH_INTERVAL', 3600)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_views_are_buffered_until_the_flush(self):
+        with self.assertNumQueries(0):
+            for viewer in ('user:1', 'user:2', 'user:1'):
+                sketches.record_view('job', 1, viewer)
+        self.assertEqual(sketches.unique_viewers('job', 1)['today'], 2)
+        self.assertFalse(ViewerSketch.objects.exists())
+        counters.flush()
+        self.assertEqual(ViewerSketch.objects.filter(kind='job', object_id=1).count(), 1)
+        self.assertEqual(sketches.unique_viewers('job', 1)['today'], 2)
+
+    def test_flush_merges_into_the_stored_sketch(self):
+        sketches.record_view('profile', 1, 'user:1')
+        counters.flush()
+        for viewer in ('user:1', 'user:2', 'user:3'):
+            sketches.record_view('profile', 1, viewer)
+        counters.flush()
+        self.assertEqual(ViewerSketch.objects.filter(kind='profile', object_id=1).count(), 1)
+        self.assertEqual(sketches.unique_viewers('profile', 1)['last_7_days'], 3)
+
+    def test_failed_flush_keeps_the_views(self):
+        sketches.record_view('job', 2, 'user:1')
+        with mock.patch.object(sketches, '_merge_row', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                counters.flush()
+        self.assertEqual(sketches.unique_viewers('job', 2)['today'], 1)
+        counters.flush()
+        self.assertTrue(ViewerSketch.objects.filter(kind='job', object_id=2).exists())
+
+
+@skipUnless(orjson is not None, 'orjson is not installed')
+class FastJSONRendererTests(SimpleTestCase):
+    """orjson output against DRF's JSONRenderer"""
+
+    def test_same_bytes_as_drf(self):
+        data = {
+            'id': 2 ** 63 + 5,
+            'title': 'Café line',
+            'salary': Decimal('1234.50'),
+            'created_at': datetime(2024, 5, 1, 12, 30, 15, 250000, tzinfo=dt_timezone.utc),
+            'day': date(2024, 5, 1),
+            'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'scores': [0.1, 2.5, -3.0, 123456.789],
+            'tags': ['a', None, True],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_exponent_floats_parse_the_same(self):
+        data = {'values': [1e16, 1e-7, 1.5e300, 1e22]}
+        fast, stock = FastJSONRenderer().render(data), JSONRenderer().render(data)
+        self.assertEqual(fast, b'{"values":[1e16,1e-7,1.5e300,1e22]}')
+        self.assertEqual(stock, b'{"values":[1e+16,1e-07,1.5e+300,1e+22]}')
+        self.assertEqual(json.loads(fast), json.loads(stock))
+
+
+@skipUnless(compression.brotli, 'brotli is not installed')
+class CompressionTests(TestCase):
+    """Brotli for API payloads only; HTML keeps gzip and its BREACH padding"""
+
+    ACCEPT = {'HTTP_ACCEPT_ENCODING': 'gzip, deflate, br'}
+
+    def setUp(self):
+        patcher = mock.patch.object(compression, 'MIN_SIZE', 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_html_is_gzipped(self):
+        response = self.client.get('/jobs/', **self.ACCEPT)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_json_prefers_brotli(self):
+        self.client.force_login(User.objects.create_user('reader'))
+        response = self.client.get('/api/v1/skill-categories/', **self.ACCEPT)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertIn(b'results', compression.brotli.decompress(response.content))
+
+
+class SkillCountTests(TestCase):
+    """usage_count and endorsement_count follow the rows they count"""
+
+    def setUp(self):
+        category = SkillCategory.objects.create(name='Engineering')
+        self.python = Skill.objects.create(name='Python', category=category)
+        self.go = Skill.objects.create(name='Go', category=category)
+        self.users = [User.objects.create_user(f'user{number}') for number in range(3)]
+
+    def usage(self, skill):
+        skill.refresh_from_db()
+        return skill.usage_count
+
+    def add(self, user, skill):
+        return Skills.objects.create(user=user, skill=skill, proficiency_level='advanced')
+
+    def test_create_and_delete(self):
+        rows = [self.add(user, self.python) for user in self.users]
+        self.assertEqual(self.usage(self.python), 3)
+        rows[0].delete()
+        self.assertEqual(self.usage(self.python), 2)
+
+    def test_re_pointing_moves_the_count(self):
+        row = self.add(self.users[0], self.python)
+        row.skill = self.go
+        row.save()
+        self.assertEqual(self.usage(self.python), 0)
+        self.assertEqual(self.usage(self.go), 1)
+        # A save that leaves the skill alone moves nothing
+        row.proficiency_level = 'expert'
+        row.save()
+        self.assertEqual(self.usage(self.go), 1)
+
+    def test_re_pointing_with_update_fields(self):
+        row = self.add(self.users[0], self.python)
+        for update_fields, skill in ((['skill_id'], self.go), (['skill'], self.python)):
+            with self.subTest(update_fields=update_fields):
+                row.skill = skill
+                row.save(update_fields=update_fields)
+                self.assertEqual(self.usage(skill), 1)
+                self.assertEqual(self.usage(self.go if skill == self.python else self.python), 0)
+        row.skill = self.go
+        row.save(update_fields=['proficiency_level'])
+        # The skill was not written, so neither count moves
+        self.assertEqual(self.usage(self.python), 1)
+        self.assertEqual(self.usage(self.go), 0)
+
+    def test_re_pointing_an_endorsement_with_update_fields(self):
+        first, second = self.add(self.users[0], self.python), self.add(self.users[1], self.go)
+        endorsement = SkillEndorsement.objects.create(user_skill=first, endorsed_by=self.users[2])
+        endorsement.user_skill_id = second.pk
+        endorsement.save(update_fields=['user_skill_id'])
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.endorsement_count, second.endorsement_count), (0, 1))
+
+    def test_endorsements(self):
+        row = self.add(self.users[0], self.python)
+        endorsement = SkillEndorsement.objects.create(user_skill=row, endorsed_by=self.users[1])
+        row.refresh_from_db()
+        self.assertEqual(row.endorsement_count, 1)
+        endorsement.delete()
+        row.refresh_from_db()
+        self.assertEqual(row.endorsement_count, 0)
+
+    def test_moves(self):
+        self.assertEqual(
+            skillcounts.moves({1: 10, 2: 10, 3: 11}, {1: 11, 2: 10, 3: 11, 4: 12}),
+            {10: -1, 11: 1},
+        )
+
+    def test_never_below_zero(self):
+        skillcounts.adjust('usage_count', {self.python.pk: -5})
+        self.assertEqual(self.usage(self.python), 0)
+
+    def test_deferred_writes_once(self):
+        with self.assertNumQueries(1):
+            with skillcounts.deferred():
+                skillcounts.adjust('usage_count', {self.python.pk: 2})
+                skillcounts.adjust('usage_count', {self.python.pk: 1, self.go.pk: 1})
+        self.assertEqual((self.usage(self.python), self.usage(self.go)), (3, 1))
+
+    def test_reconcile_fixes_drift(self):
+        self.add(self.users[0], self.python)
+        self.add(self.users[1], self.python)
+        Skill.objects.filter(pk=self.python.pk).update(usage_count=7)
+        Skill.objects.filter(pk=self.go.pk).update(usage_count=1)
+        self.assertEqual(skillcounts.reconcile('usage_count', chunk_size=1), 2)
+        self.assertEqual((self.usage(self.python), self.usage(self.go)), (2, 0))
+        self.assertEqual(skillcounts.reconcile('usage_count'), 0)
+
+    def test_counts_leave_the_taxonomy_version_alone(self):
+        before = taxonomy.version()
+        row = self.add(self.users[0], self.python)
+        row.delete()
+        skillcounts.reconcile('usage_count')
+        self.assertEqual(taxonomy.version(), before)
+
+    def test_taxonomy_picks_counts_up_in_the_next_interval(self):
+        self.client.force_login(self.users[0])
+
+        def usage_count(now):
+            with mock.patch.object(taxonomy.time, 'time', return_value=now):
+                response = self.client.get(f'/api/v1/skills/{self.python.pk}/')
+            return response.json()['usage_count']
+
+        self.assertEqual(usage_count(0), 0)
+        self.add(self.users[1], self.python)
+        self.assertEqual(usage_count(1), 0)
+        self.assertEqual(usage_count(taxonomy.COUNT_TTL), 1)
+
+
+class ConditionalGetTests(TestCase):
+    """ETags answer 304 until the rows a response is built from change"""
+
+    def setUp(self):
+        counters.flush()
+        # Keep background flushes out of the test's transaction
+        patcher = mock.patch.object(counters, 'FLUSH_INTERVAL', 3600)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user('owner')
+        self.client.force_login(self.user)
+        self.category = SkillCategory.objects.create(name='Engineering')
+        self.skill = Skill.objects.create(name='Python', category=self.category)
+        self.row = Skills.objects.create(user=self.user, skill=self.skill, proficiency_level='advanced')
+
+    def etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response['ETag']
+
+    def assertNotModified(self, url, etag):
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def assertEtagMoves(self, url, change):
+        etag = self.etag(url)
+        self.assertNotModified(url, etag)
+        change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def rename_skill(self):
+        self.skill.name = 'Python 3'
+        self.skill.save()
+
+    def rename_category(self):
+        self.category.name = 'Software'
+        self.category.save()
+
+    def test_update(self):
+        def update():
+            self.row.proficiency_level = 'expert'
+            self.row.save()
+
+        self.assertEtagMoves(f'/api/v1/user-skills/{self.row.pk}/', update)
+
+    def test_skill_rename(self):
+        self.assertEtagMoves(f'/api/v1/user-skills/{self.row.pk}/', self.rename_skill)
+        self.assertEtagMoves('/api/v1/user-skills/', self.rename_skill)
+        self.assertEtagMoves('/api/v1/profile/', self.rename_skill)
+
+    def test_category_rename(self):
+        self.assertEtagMoves(f'/api/v1/user-skills/{self.row.pk}/', self.rename_category)
+        self.assertEtagMoves('/api/v1/user-skills/', self.rename_category)
+        self.assertEtagMoves('/api/v1/profile/?include=skills', self.rename_category)
+
+    def test_buffered_counter_increment(self):
+        details = UserDetails.objects.create(user=self.user)
+        # The increment is still in the buffer, so updated_at has not moved
+        self.assertEtagMoves(f'/api/v1/user-details/{details.pk}/', details.increment_profile_views)
+        self.assertEtagMoves('/api/v1/profile/', details.increment_profile_views)
+
+    def listed_job(self):
+        # Searches record events; keep them off the shared queue and writer thread
+        for name, value in (('_queue', queue.Queue()), ('BACKGROUND', False)):
+            patcher = mock.patch.object(events, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        company = Company.objects.create(name='Acme', description='Widgets', location='Remote')
+        job = Job.objects.create(
+            title='Engineer', description='Work', company=company, location='Remote',
+            job_type='full-time', requirements='None',
+        )
+        # Compiled here: a background rebuild cannot read the test transaction
+        analysis.warm_dictionary()
+        warm_facets()
+        warm_ranking()
+        result_cache.bump_generation()
+        return job
+
+    def test_job_list(self):
+        job = self.listed_job()
+
+        def retitle():
+            job.title = 'Senior Engineer'
+            job.save()
+
+        def rename_company():
+            job.company.name = 'Acme Inc'
+            job.company.save()
+
+        for url in ('/api/jobs/?sort=newest', '/api/jobs/?search=engineer', '/api/jobs/'):
+            with self.subTest(url=url):
+                self.assertEtagMoves(url, retitle)
+                self.assertEtagMoves(url, rename_company)
+        self.assertNotEqual(self.etag('/api/jobs/'), self.etag('/api/jobs/?fields=id'))
+        streamed = self.client.get('/api/jobs/', {'stream': 'ndjson'})
+        b''.join(streamed.streaming_content)
+        self.assertNotModified('/api/jobs/?stream=ndjson', streamed['ETag'])
+
+    def test_job_list_follows_the_viewer_preferences(self):
+        self.listed_job()
+        details = UserDetails.objects.create(user=self.user, employment_type_preference='full_time')
+
+        def change_preferences():
+            details.employment_type_preference = 'contract'
+            details.save()
+
+        self.assertEtagMoves('/api/jobs/?sort=relevance', change_preferences)
+
+    def test_company_list(self):
+        company = self.listed_job().company
+        other = Company.objects.create(name='Beta', description='Gadgets', location='Paris')
+
+        def rename():
+            company.name = 'Acme Inc'
+            company.save()
+
+        self.assertEtagMoves('/api/companies/', rename)
+        self.assertEtagMoves('/api/companies/', other.delete)
+        self.assertEtagMoves('/api/companies/?fields=id,name', rename)
+
+
+class KeysetPaginationTests(TestCase):
+    """Cursors walk every row once, both ways, through ties and NULLs"""
+
+    YEARS = (3, None, 3, 1, None, 3, 5)
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner')
+        self.client.force_login(self.user)
+        category = SkillCategory.objects.create(name='Engineering')
+        for number, years in enumerate(self.YEARS):
+            skill = Skill.objects.create(name=f'Skill {number}', category=category)
+            Skills.objects.create(
+                user=self.user, skill=skill, proficiency_level='advanced', years_of_experience=years,
+            )
+        self.queryset = Skills.objects.filter(user=self.user)
+
+    def expected(self, descending):
+        rows = list(self.queryset.values_list('years_of_experience', 'pk'))
+        # NULLs first ascending, last descending; ties broken on the primary key
+        rows.sort(key=lambda row: (row[0] is not None, row[0] or 0, row[1]), reverse=descending)
+        return [pk for _, pk in rows]
+
+    def walk(self, paginator):
+        pages = [paginator.paginate(self.queryset)]
+        while pages[-1].has_next():
+            pages.append(paginator.paginate(self.queryset, pages[-1].next_cursor))
+        return pages
+
+    def test_round_trip_both_ways(self):
+        for ordering in (('years_of_experience',), ('-years_of_experience',)):
+            with self.subTest(ordering=ordering):
+                paginator = KeysetPaginator(ordering, page_size=2)
+                pages = self.walk(paginator)
+                self.assertEqual(
+                    [obj.pk for page in pages for obj in page],
+                    self.expected(ordering[0].startswith('-')),
+                )
+                self.assertFalse(pages[0].has_previous())
+                self.assertEqual([len(page) for page in pages], [2, 2, 2, 1])
+                # Back from the last page through the previous cursors
+                page = pages[-1]
+                for expected in reversed(pages[:-1]):
+                    page = paginator.paginate(self.queryset, page.previous_cursor)
+                    self.assertEqual([obj.pk for obj in page], [obj.pk for obj in expected])
+                self.assertFalse(page.has_previous())
+
+    def test_invalid_cursors(self):
+        paginator = KeysetPaginator(('years_of_experience',), page_size=2)
+        cursor = paginator.paginate(self.queryset).next_cursor
+        tampered = cursor[:-2] + ('AA' if cursor[-2:] != 'AA' else 'BB')
+        for bad in (tampered, 'garbage', encode_cursor({'k': [1]}), encode_cursor({'k': 'x'})):
+            with self.subTest(cursor=bad):
+                with self.assertRaises(InvalidCursor):
+                    paginator.paginate(self.queryset, bad)
+
+    def test_api_links(self):
+        url = '/api/v1/user-skills/?ordering=years_of_experience&page_size=3'
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            pages.append(response.json())
+            url = pages[-1]['next']
+        self.assertIsNone(pages[0]['previous'])
+        self.assertEqual(
+            [row['id'] for page in pages for row in page['results']], self.expected(False)
+        )
+        previous = self.client.get(pages[-1]['previous']).json()
+        self.assertEqual(previous['results'], pages[-2]['results'])
+        response = self.client.get('/api/v1/user-skills/', {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, 404)
+
+
+class BulkSkillsTests(TestCase):
+    """The bulk/ route validates every item before it writes any"""
+
+    url = '/api/v1/user-skills/bulk/'
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner')
+        self.other = User.objects.create_user('other')
+        self.client.force_login(self.user)
+        category = SkillCategory.objects.create(name='Engineering')
+        self.skills = [
+            Skill.objects.create(name=f'Skill {number}', category=category) for number in range(4)
+        ]
+        self.mine = Skills.objects.create(
+            user=self.user, skill=self.skills[0], proficiency_level='advanced'
+        )
+        self.theirs = Skills.objects.create(
+            user=self.other, skill=self.skills[1], proficiency_level='advanced'
+        )
+
+    def send(self, method, items):
+        return getattr(self.client, method)(
+            self.url, json.dumps(items), content_type='application/json'
+        )
+
+    def item(self, skill, **fields):
+        return {'skill': skill.pk, 'proficiency_level': 'expert', **fields}
+
+    def test_create(self):
+        response = self.send('post', [self.item(self.skills[2]), self.item(self.skills[3])])
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual([row['skill'] for row in response.json()], [self.skills[2].pk, self.skills[3].pk])
+        self.assertEqual(Skills.objects.filter(user=self.user).count(), 3)
+        self.skills[2].refresh_from_db()
+        self.assertEqual(self.skills[2].usage_count, 1)
+
+    def test_item_errors_write_nothing(self):
+        response = self.send('post', [
+            self.item(self.skills[2]),
+            self.item(self.skills[3], proficiency_level='wizard'),
+            {'proficiency_level': 'expert'},
+        ])
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()
+        self.assertEqual(errors[0], {})
+        self.assertIn('proficiency_level', errors[1])
+        self.assertIn('skill', errors[2])
+        self.assertEqual(Skills.objects.filter(user=self.user).count(), 1)
+
+    def test_unique_conflicts(self):
+        # With an existing row, and twice within the batch
+        response = self.send('post', [
+            self.item(self.skills[0]), self.item(self.skills[2]), self.item(self.skills[2]),
+        ])
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()
+        self.assertIn('skill', errors[0])
+        self.assertEqual(errors[1], {})
+        self.assertIn('skill', errors[2])
+        self.assertEqual(Skills.objects.filter(user=self.user).count(), 1)
+
+    def test_update_conflicts_with_the_rest_of_the_batch(self):
+        second = Skills.objects.create(user=self.user, skill=self.skills[2], proficiency_level='beginner')
+        response = self.send('patch', [
+            {'id': self.mine.pk, 'skill': self.skills[3].pk},
+            {'id': second.pk, 'skill': self.skills[3].pk},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()[0], {})
+        self.assertIn('skill', response.json()[1])
+        self.assertEqual(Skills.objects.filter(skill=self.skills[3]).count(), 0)
+        response = self.send('patch', [{'id': self.mine.pk, 'skill': self.skills[3].pk}])
+        self.assertEqual(response.status_code, 200, response.content)
+        self.skills[3].refresh_from_db()
+        self.assertEqual(self.skills[3].usage_count, 1)
+
+    def test_update(self):
+        response = self.send('patch', [{'id': self.mine.pk, 'proficiency_level': 'expert'}])
+        self.assertEqual(response.status_code, 200, response.content)
+        self.mine.refresh_from_db()
+        self.assertEqual(self.mine.proficiency_level, 'expert')
+
+    def test_update_rejects_other_users_rows(self):
+        response = self.send('patch', [
+            {'id': self.mine.pk, 'proficiency_level': 'expert'},
+            {'id': self.theirs.pk, 'proficiency_level': 'beginner'},
+            {'id': self.mine.pk, 'proficiency_level': 'beginner'},
+            {'proficiency_level': 'beginner'},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), [
+            {}, {'id': ['Not found.']}, {'id': ['Duplicate id in this request.']},
+            {'id': ['This field is required.']},
+        ])
+        self.theirs.refresh_from_db()
+        self.assertEqual(self.theirs.proficiency_level, 'advanced')
+        self.mine.refresh_from_db()
+        self.assertEqual(self.mine.proficiency_level, 'advanced')
+
+    def test_delete_rejects_other_users_rows(self):
+        response = self.send('delete', [self.mine.pk, self.theirs.pk])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), [{}, {'id': ['Not found.']}])
+        self.assertEqual(Skills.objects.count(), 2)
+        response = self.send('delete', [{'id': self.mine.pk}])
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Skills.objects.filter(pk=self.mine.pk).exists())
+        self.assertTrue(Skills.objects.filter(pk=self.theirs.pk).exists())
+
+    def test_item_cap(self):
+        with mock.patch.object(bulk, 'MAX_ITEMS', 2):
+            response = self.send('post', [self.item(skill) for skill in self.skills[1:]])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'non_field_errors': ['At most 2 items per request.']})
+        for body in ([], {'id': self.mine.pk}):
+            self.assertEqual(self.send('delete', body).status_code, 400)
+        self.assertEqual(Skills.objects.count(), 2)
+
+
+class RollupTests(TestCase):
+    """Daily rows are recomputed from the hours, never added to"""
+
+    def setUp(self):
+        self.today = timezone.localdate()
+
+    def noon(self, days_ago):
+        return rollups.day_range(self.today - timedelta(days=days_ago))[0] + timedelta(hours=12)
+
+    def daily(self, days_ago, object_id=1):
+        return DailyRollup.objects.get(
+            metric='job_view', object_id=object_id, day=self.today - timedelta(days=days_ago)
+        ).count
+
+    def test_reruns_do_not_double_count(self):
+        rollups.add_hourly('job_view', self.noon(1), {1: 3, 2: 1})
+        rollups.add_hourly('job_view', self.noon(1) + timedelta(hours=1), {1: 2})
+        self.assertEqual(rollups.roll_days(), 2)
+        self.assertEqual((self.daily(1), self.daily(1, object_id=2)), (5, 1))
+        # Within OVERLAP of the checkpoint the same hours are summed again
+        rollups.roll_days()
+        self.assertEqual(self.daily(1), 5)
+        # A late flush into a rolled day
+        rollups.add_hourly('job_view', self.noon(1), {1: 2})
+        rollups.roll_days()
+        self.assertEqual(self.daily(1), 7)
+
+    def test_hours_older_than_the_checkpoint_are_skipped(self):
+        rollups.add_hourly('job_view', self.noon(2), {1: 3})
+        rollups.roll_days()
+        past = timezone.now() - rollups.OVERLAP - timedelta(hours=1)
+        HourlyRollup.objects.update(updated_at=past)
+        RollupCheckpoint.objects.filter(name='daily').update(last_time=past + timedelta(minutes=30))
+        self.assertEqual(rollups.roll_days(), 0)
+
+    def test_applications_are_rolled_once(self):
+        user = User.objects.create_user('applicant')
+        company = Company.objects.create(name='Acme', description='Widgets', location='Remote')
+        job = Job.objects.create(
+            title='Engineer', description='Work', company=company, location='Remote',
+            job_type='full-time', requirements='None',
+        )
+        JobApplication.objects.create(user=user, job=job, resume='resumes/cv.pdf')
+        JobApplication.objects.update(applied_at=self.noon(1))
+        self.assertEqual(rollups.roll_applications(), 1)
+        self.assertEqual(rollups.roll_applications(), 0)
+        rollups.roll_days()
+        self.assertEqual(
+            DailyRollup.objects.get(metric='application', object_id=job.pk).count, 1
+        )
+
+    def test_series_mixes_daily_rows_and_unrolled_hours(self):
+        # Rolled days come from DailyRollup, even where the hours disagree
+        rollups.add_hourly('job_view', self.noon(6), {1: 1})
+        DailyRollup.objects.create(
+            metric='job_view', object_id=1, day=self.today - timedelta(days=6), count=10,
+        )
+        # Days from the last run on come from the hours, even over a stale daily row
+        rollups.add_hourly('job_view', self.noon(1), {1: 4})
+        DailyRollup.objects.create(
+            metric='job_view', object_id=1, day=self.today - timedelta(days=1), count=99,
+        )
+        rollups.add_hourly('job_view', rollups.hour_of(timezone.now()), {1: 2})
+        RollupCheckpoint.objects.create(name='daily', last_time=self.noon(3))
+
+        result = rollups.series('job_view', 1, 'day', 7)
+        self.assertEqual(result['counts'], [10, 0, 0, 0, 0, 4, 2])
+        self.assertEqual(result['total'], 16)
+        self.assertEqual(result['start'], (self.today - timedelta(days=6)).isoformat())
+        self.assertEqual(rollups.series('job_view', 1, 'hour', 1)['counts'], [2])
+
+
+class EventLogTests(TestCase):
+    """Events are queued, written in batches and archived a month at a time"""
+
+    def setUp(self):
+        for name, value in (
+            ('_queue', queue.Queue(maxsize=3)), ('BACKGROUND', False), ('BATCH_SIZE', 2),
+        ):
+            patcher = mock.patch.object(events, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_full_queue_drops_and_counts(self):
+        with mock.patch.object(events, 'BATCH_SIZE', 10):
+            before = events.stats()
+            self.assertEqual([events.record('view', 'job', 1) for _ in range(4)], [True] * 3 + [False])
+            after = events.stats()
+        self.assertEqual(after['dropped'] - before['dropped'], 1)
+        self.assertEqual(after['queued'], 3)
+        self.assertEqual(InteractionEvent.objects.count(), 0)
+        self.assertEqual(events.flush(), 3)
+        self.assertEqual(InteractionEvent.objects.count(), 3)
+
+    def test_batches_without_the_background_writer(self):
+        before = events.stats()['written']
+        events.record('search', query='python')
+        self.assertEqual(InteractionEvent.objects.count(), 0)
+        # A full batch is written by the request that completes it
+        events.record('view', 'job', 1, actor_id=5)
+        self.assertEqual(InteractionEvent.objects.count(), 2)
+        self.assertEqual(events.stats()['written'] - before, 2)
+
+    def event(self, month, **fields):
+        moment = datetime(month // 100, month % 100, 15, tzinfo=dt_timezone.utc)
+        return InteractionEvent.objects.create(
+            kind='view', object_type='job', object_id=1, created_at=moment, month=month, **fields
+        )
+
+    def test_archive_month(self):
+        archived = [self.event(202401, actor_id=number) for number in range(3)]
+        kept = self.event(202402)
+        late = []
+        dumps = events.dumps
+
+        def dumps_during_a_write(row):
+            # An event of the archived month committed while the file is written
+            if not late:
+                late.append(self.event(202401))
+            return dumps(row)
+
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch.object(events, 'dumps', dumps_during_a_write):
+            path, rows = events.archive_month(202401, directory)
+            self.assertEqual(rows, 3)
+            self.assertEqual(os.path.basename(path), f'events-2024-01-{archived[-1].pk}.ndjson.gz')
+            self.assertEqual(os.listdir(directory), [os.path.basename(path)])
+            with gzip.open(path, 'rb') as archive:
+                lines = [json.loads(line) for line in archive]
+            self.assertEqual(events.archive_month(202403, directory), (None, 0))
+        self.assertEqual([line['id'] for line in lines], [event.pk for event in archived])
+        self.assertEqual([line['actor_id'] for line in lines], [0, 1, 2])
+        self.assertEqual(list(lines[0]), list(events.ARCHIVE_FIELDS))
+        self.assertEqual(
+            set(InteractionEvent.objects.values_list('pk', flat=True)), {kept.pk, late[0].pk}
+        )
+
+
+class JobListFacetLinkTests(TestCase):
+    """Facet links start the new filter from its first page"""
+
+    def setUp(self):
+        company = Company.objects.create(name='Acme', description='Widgets', location='Remote')
+        for number in range(12):
+            Job.objects.create(
+                title=f'Job {number}', description='Work', company=company,
+                location=('Berlin', 'Lisbon')[number % 2],
+                job_type=('full-time', 'contract')[number % 2], requirements='None',
+            )
+
+    def test_facet_links_drop_the_cursor(self):
+        cursor = self.client.get('/jobs/').context['page_obj'].next_cursor
+        self.assertTrue(cursor)
+        response = self.client.get('/jobs/', {'cursor': cursor})
+        self.assertEqual(response.status_code, 200)
+        links = [
+            href for href in re.findall(r'href="([^"]*)"', response.content.decode())
+            if 'job_type=' in href or 'location=' in href
+        ]
+        self.assertTrue(any('job_type=contract' in href for href in links))
+        self.assertTrue(any('location=Lisbon' in href for href in links))
+        for href in links:
+            self.assertNotIn('cursor=', href)
+
+
+class StreamingListTests(TestCase):
+    """?stream=json|ndjson sends every row, a chunk at a time"""
+
+    def setUp(self):
+        patcher = mock.patch.object(streaming, 'CHUNK_SIZE', 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        result_cache.bump_generation()
+
+    def add_rows(self, count):
+        for number in range(count):
+            company = Company.objects.create(
+                name=f'Company {number}', description='Widgets', location='Remote',
+            )
+            Job.objects.create(
+                title=f'Job {number}', description='Work', company=company,
+                location='Remote', job_type='full-time', requirements='None',
+            )
+        result_cache.bump_generation()
+
+    def stream(self, url, fmt, **params):
+        response = self.client.get(url, {'stream': fmt, **params})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], streaming.STREAM_FORMATS[fmt])
+        chunks = list(response.streaming_content)
+        body = b''.join(chunks)
+        rows = json.loads(body) if fmt == 'json' else [json.loads(line) for line in body.splitlines()]
+        return rows, chunks
+
+    def test_empty(self):
+        for url in ('/api/jobs/', '/api/companies/'):
+            with self.subTest(url=url):
+                self.assertEqual(self.stream(url, 'json')[0], [])
+                self.assertEqual(self.stream(url, 'ndjson'), ([], []))
+
+    def test_jobs_in_several_chunks(self):
+        self.add_rows(5)
+        listed = self.client.get('/api/jobs/', {'sort': 'newest', 'page_size': 100}).json()['results']
+        for fmt in ('json', 'ndjson'):
+            with self.subTest(fmt=fmt):
+                rows, chunks = self.stream('/api/jobs/', fmt, sort='newest')
+                self.assertGreaterEqual(len(chunks), 3)
+                self.assertEqual(rows, listed)
+                rows, _ = self.stream('/api/jobs/', fmt, sort='newest', fields='id,title')
+                self.assertEqual(rows, [{'id': row['id'], 'title': row['title']} for row in listed])
+
+    def test_companies_in_several_chunks(self):
+        self.add_rows(5)
+        listed = sorted(self.client.get('/api/companies/').json(), key=lambda row: row['id'])
+        for fmt in ('json', 'ndjson'):
+            with self.subTest(fmt=fmt):
+                rows, chunks = self.stream('/api/companies/', fmt)
+                self.assertGreaterEqual(len(chunks), 3)
+                self.assertEqual(rows, listed)
+
+
+class SalaryFilterTests(TestCase):
+    """Salary filters on the generated salary_low/salary_high columns"""
+
+    SALARIES = {
+        'low': (50000, 70000),
+        'mid': (90000, 120000),
+        'floor only': (110000, None),
+        'unknown': (None, None),
+        'ceiling only': (None, 60000),
+    }
+
+    def setUp(self):
+        company = Company.objects.create(name='Acme', description='Widgets', location='Remote')
+        for title, (low, high) in self.SALARIES.items():
+            Job.objects.create(
+                title=title, description='Work', company=company, location='Remote',
+                job_type='full-time', requirements='None', salary_min=low, salary_max=high,
+            )
+        # The process-wide indexes outlive each test's rollback; rebuild them
+        warm_facets()
+        warm_ranking()
+        result_cache.bump_generation()
+
+    def titles(self, *args, **kwargs):
+        salary = SalaryRange(
+            *(None if bound is None else Decimal(bound) for bound in args), **kwargs
+        )
+        return set(salary.apply(Job.objects.all()).values_list('title', flat=True))
+
+    def test_overlap_and_within(self):
+        self.assertEqual(self.titles(100000, 130000), {'mid', 'floor only'})
+        self.assertEqual(self.titles(100000, 115000), {'mid', 'floor only'})
+        self.assertEqual(self.titles(100000, 115000, match='within'), {'floor only'})
+        self.assertEqual(self.titles(40000, 130000, match='within'), {
+            'low', 'mid', 'floor only', 'ceiling only',
+        })
+
+    def test_one_open_bound(self):
+        self.assertEqual(self.titles(100000), {'mid', 'floor only'})
+        self.assertEqual(self.titles(None, 60000), {'low', 'ceiling only'})
+        self.assertEqual(self.titles(60000, match='within'), {'mid', 'floor only', 'ceiling only'})
+        self.assertEqual(self.titles(None, 70000, match='within'), {'low', 'ceiling only'})
+
+    def test_swapped_bounds(self):
+        self.assertEqual(self.titles(130000, 100000), self.titles(100000, 130000))
+        salary = SalaryRange.from_params({'salary_min': '130,000', 'salary_max': '100000'})
+        self.assertEqual((salary.lower, salary.upper), (Decimal(100000), Decimal(130000)))
+
+    def test_null_salaries_never_match(self):
+        self.assertNotIn('unknown', self.titles(0))
+        self.assertNotIn('unknown', self.titles(None, 10 ** 9, match='within'))
+
+    def test_params_on_the_list_views(self):
+        cases = [
+            ({'salary_min': '100000', 'salary_max': '115000'}, {'mid', 'floor only'}),
+            ({'salary_min': '115000', 'salary_max': '100000', 'salary_match': 'within'}, {'floor only'}),
+            ({'salary_max': '60000'}, {'low', 'ceiling only'}),
+        ]
+        for params, expected in cases:
+            with self.subTest(params=params):
+                response = self.client.get('/api/jobs/', {**params, 'page_size': 100})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual({row['title'] for row in response.json()['results']}, expected)
+                self.assertEqual(response.json()['facets']['total'], len(expected))
+                response = self.client.get('/jobs/', params)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual({job.title for job in response.context['page_obj']}, expected)
+
+    def test_bad_params(self):
+        for params in ({'salary_min': 'lots'}, {'salary_min': '-1'}, {'salary_min': '1', 'salary_match': 'near'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get('/api/jobs/', params).status_code, 400)
+                # The page ignores a bad filter
+                response = self.client.get('/jobs/', params)
+                self.assertEqual(len(response.context['page_obj']), len(self.SALARIES))
+
+
+class RadiusSearchTests(TestCase):
+    """Locations resolve against the gazetteer and ?near= pages go nearest first"""
+
+    LOCATIONS = ('Los Angeles, CA', 'SF', 'San Jose', 'Oakland, CA', 'Sacramento', 'Mars Base')
+
+    def setUp(self):
+        company = Company.objects.create(name='Acme', description='Widgets', location='Remote')
+        for location in self.LOCATIONS:
+            Job.objects.create(
+                title=f'Engineer in {location}', description='Work', company=company,
+                location=location, job_type='full-time', requirements='None',
+            )
+        # The process-wide indexes outlive each test's rollback; rebuild them
+        warm_facets()
+        warm_ranking()
+        result_cache.bump_generation()
+
+    def test_resolution(self):
+        gazetteer = get_gazetteer()
+        for text in ('SF', 'San Francisco, CA', 'san francisco ca', 'Bay Area'):
+            with self.subTest(text=text):
+                self.assertEqual(gazetteer.resolve(text).id, 'us-ca-san-francisco')
+        self.assertIsNone(gazetteer.resolve('Mars Base'))
+        places = dict(Job.objects.values_list('location', 'place_id'))
+        self.assertEqual(places['SF'], 'us-ca-san-francisco')
+        self.assertEqual(places['Mars Base'], '')
+
+    def test_api_radius(self):
+        for near in ('SF', '37.7749,-122.4194'):
+            with self.subTest(near=near):
+                response = self.client.get('/api/jobs/', {'near': near, 'radius': 80})
+                self.assertEqual(response.status_code, 200, response.content)
+                rows = response.json()['results']
+                self.assertEqual(
+                    [row['title'] for row in rows],
+                    ['Engineer in SF', 'Engineer in Oakland, CA', 'Engineer in San Jose'],
+                )
+                distances = [row['distance_km'] for row in rows]
+                self.assertEqual(distances, sorted(distances))
+                self.assertTrue(all(distance <= 80 for distance in distances))
+
+    def test_page_radius(self):
+        response = self.client.get('/jobs/', {'near': 'San Francisco', 'radius': 200})
+        self.assertEqual(response.status_code, 200)
+        jobs = list(response.context['page_obj'])
+        self.assertEqual(
+            [job.title for job in jobs],
+            ['Engineer in SF', 'Engineer in Oakland, CA', 'Engineer in San Jose', 'Engineer in Sacramento'],
+        )
+        distances = [job.distance_km for job in jobs]
+        self.assertEqual(distances, sorted(distances))
+        self.assertTrue(all(distance <= 200 for distance in distances))
+
+    def test_unknown_place(self):
+        response = self.client.get('/api/jobs/', {'near': 'Atlantis'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('near', response.json())
+        for params in ({'near': 'Atlantis'}, {'near': 'SF', 'radius': 'far'}, {'near': '95,10'}):
+            with self.subTest(params=params):
+                response = self.client.get('/jobs/', params)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.context['near_error'])
+                self.assertEqual(len(response.context['page_obj']), len(self.LOCATIONS))
+
+
+class QueryExpansionTests(TransactionTestCase):
+    """Searches match stems, acronyms and synonyms saved while the process runs"""
+
+    # Committed rows, so the background dictionary rebuild can read them
+
+    def setUp(self):
+        company = Company.objects.create(name='Acme', description='Widgets', location='Remote')
+        for title in ('Senior Developer', 'Machine Learning Engineer', 'Kubernetes Administrator'):
+            Job.objects.create(
+                title=title, description='Work', company=company, location='Remote',
+                job_type='full-time', requirements='None',
+            )
+        Skill.objects.create(name='Machine Learning')
+        analysis.warm_dictionary()
+        warm_facets()
+        warm_ranking()
+
+    def titles(self, query):
+        response = self.client.get('/api/jobs/', {'search': query, 'sort': 'newest'})
+        self.assertEqual(response.status_code, 200)
+        return {row['title'] for row in response.json()['results']}
+
+    def reloaded(self):
+        """Wait for the rebuild a moved version starts"""
+        analysis.get_dictionary()
+        if analysis._rebuilder is not None:
+            analysis._rebuilder.join(5)
+        return analysis.get_dictionary()
+
+    def test_stems(self):
+        self.assertEqual(analysis.stem('developers'), 'developer')
+        self.assertEqual(self.titles('developers'), {'Senior Developer'})
+
+    def test_acronyms(self):
+        self.assertIn((('machine', 'learning'), True), analysis.analyze('ML')[0])
+        self.assertEqual(self.titles('ML'), {'Machine Learning Engineer'})
+
+    def test_new_synonym_without_a_restart(self):
+        self.assertEqual(self.titles('k8s'), set())
+        SearchSynonym.objects.create(term='k8s', synonyms='kubernetes')
+        self.assertEqual(self.reloaded().version, analysis.current_version())
+        self.assertEqual(self.titles('k8s'), {'Kubernetes Administrator'})
+
+    def test_only_a_rename_recompiles(self):
+        skill = Skill.objects.get(name='Machine Learning')
+        version = analysis.current_version()
+        skill.description = 'Models'
+        skill.save()
+        skill.save(update_fields=['is_trending'])
+        self.assertEqual(analysis.current_version(), version)
+        skill.name = 'Deep Learning'
+        skill.save()
+        self.assertNotEqual(analysis.current_version(), version)
+        self.reloaded()
+        self.assertEqual(self.titles('ML'), set())
+
+
+class SparseFieldsetTests(TestCase):
+    """``?fields=``/``?omit=`` prune the response and the columns loaded"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner')
+        self.client.force_login(self.user)
+        UserDetails.objects.create(
+            user=self.user, current_job_title='Engineer', summary='A long summary',
+        )
+        Experience.objects.create(
+            user=self.user, job_title='Engineer', company='Acme', employment_type='full_time',
+            start_date=date(2020, 1, 1), description='Built things',
+        )
+        company = Company.objects.create(name='Acme', description='Widgets', location='Remote')
+        for number in range(3):
+            Job.objects.create(
+                title=f'Engineer {number}', description='Long text', company=company,
+                location='Remote', job_type='full-time', requirements='None',
+            )
+        warm_facets()
+        warm_ranking()
+        result_cache.bump_generation()
+
+    def fetch(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results'], ' '.join(query['sql'] for query in queries)
+
+    def test_viewset_keeps_the_requested_fields(self):
+        rows, sql = self.fetch('/api/v1/user-details/', {'fields': 'id,current_job_title'})
+        self.assertEqual([set(row) for row in rows], [{'id', 'current_job_title'}])
+        self.assertEqual(rows[0]['current_job_title'], 'Engineer')
+        self.assertNotIn('"summary"', sql)
+        # Without the parameter the column is read, so the check above means something
+        rows, sql = self.fetch('/api/v1/user-details/', {})
+        self.assertIn('summary', rows[0])
+        self.assertIn('"summary"', sql)
+
+    def test_viewset_omits_fields(self):
+        rows, sql = self.fetch('/api/v1/experience/', {'omit': 'description'})
+        self.assertNotIn('description', rows[0])
+        self.assertEqual(rows[0]['job_title'], 'Engineer')
+        self.assertNotIn('"description"', sql)
+
+    def test_job_list_keeps_nested_fields(self):
+        params = {'fields': 'id,title,company.name', 'sort': 'newest'}
+        rows, sql = self.fetch('/api/jobs/', params)
+        self.assertEqual(len(rows), 3)
+        for row in rows:
+            self.assertEqual(set(row), {'id', 'title', 'company'})
+            self.assertEqual(row['company'], {'name': 'Acme'})
+        self.assertNotIn('"description"', sql)
+        rows, sql = self.fetch('/api/jobs/', {'sort': 'newest'})
+        self.assertIn('description', rows[0])
+        self.assertIn('"description"', sql)
+
+    def test_unknown_field(self):
+        for url, params in (
+            ('/api/jobs/', {'fields': 'id,salary'}),
+            ('/api/jobs/', {'fields': 'company.nope'}),
+            ('/api/jobs/', {'fields': 'title.length'}),
+            ('/api/v1/user-details/', {'fields': 'id,summery'}),
+            ('/api/v1/experience/', {'omit': 'descr'}),
+        ):
+            with self.subTest(url=url, **params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(next(iter(params)), response.json())
+
+
+class CompiledSerializerTests(TestCase):
+    """Compiled reads render the same bytes as the stock serializers"""
+
+    def setUp(self):
+        with_logo = Company.objects.create(
+            name='Acme', description='Widgets', location='Berlin', website='https://acme.test',
+            logo='company_logos/acme.png',
+        )
+        without_logo = Company.objects.create(name='Beta', description='Gadgets', location='')
+        Company.objects.create(name='Gamma', description='Tools', location='Paris')
+        # save() stores a missing logo as ''; rows written by queries can hold NULL
+        Company.objects.filter(pk=without_logo.pk).update(logo=None)
+        for title, company, salary_min, salary_max in (
+            ('Engineer', with_logo, Decimal('85000.50'), Decimal('120000')),
+            ('Designer', without_logo, None, None),
+            ('Analyst', with_logo, Decimal('60000'), None),
+        ):
+            Job.objects.create(
+                title=title, description='Work', company=company, location='Berlin',
+                job_type='full-time', requirements='None', salary_min=salary_min,
+                salary_max=salary_max,
+            )
+        # A fixed, aware timestamp with microseconds, away from UTC midnight
+        Job.objects.filter(title='Engineer').update(
+            created_at=datetime(2026, 3, 29, 0, 30, 15, 123456, tzinfo=dt_timezone.utc)
+        )
+
+    def assertSameBytes(self, serializer_class, queryset, fields=None, context=None):
+        params = {'fields': fields} if fields else {}
+        compiled = compiled_reader(serializer_class, **params)
+        self.assertIsNotNone(compiled)
+        renderer = JSONRenderer()
+        stock = serializer_class(queryset, many=True, context=context or {}, **params).data
+        self.assertEqual(
+            renderer.render(compiled.serialize(queryset, context)), renderer.render(stock)
+        )
+
+    def test_rows_render_identically(self):
+        jobs = Job.objects.select_related('company').order_by('id')
+        companies = Company.objects.order_by('id')
+        request = RequestFactory().get('/api/jobs/')
+        for tz in ('UTC', 'Europe/Berlin', 'America/Los_Angeles'):
+            for context in (None, {'request': request}):
+                with self.subTest(tz=tz, request=context is not None), timezone.override(tz):
+                    self.assertSameBytes(JobSerializer, jobs, context=context)
+                    self.assertSameBytes(CompanySerializer, companies, context=context)
+
+    def test_field_subsets_render_identically(self):
+        jobs = Job.objects.select_related('company').order_by('id')
+        for fields in ('id,salary_min,salary_max', 'title,created_at,company.logo', 'company'):
+            with self.subTest(fields=fields):
+                self.assertSameBytes(JobSerializer, jobs, fields)
+        self.assertSameBytes(CompanySerializer, Company.objects.order_by('id'), 'name,logo')
+
+    def test_covers_the_edge_cases(self):
+        rows = compiled_reader(JobSerializer).serialize(Job.objects.order_by('id'))
+        self.assertEqual(rows[0]['salary_min'], '85000.50')
+        self.assertEqual(rows[0]['created_at'], '2026-03-29T00:30:15.123456Z')
+        self.assertIsNone(rows[1]['salary_min'])
+        self.assertIsNone(rows[1]['company']['logo'])
+        self.assertIsNone(rows[2]['salary_max'])
+        self.assertTrue(rows[0]['company']['logo'].endswith('company_logos/acme.png'))
+        self.assertEqual(Company.objects.filter(logo='').count(), 1)
+        self.assertEqual(Company.objects.filter(logo__isnull=True).count(), 1)
+        logos = CompanySerializer(Company.objects.order_by('id'), many=True, fields='logo').data
+        self.assertEqual([row['logo'] for row in logos][1:], [None, None])
@@ -13,7 +13,11 @@ urlpatterns = [
     # API endpoints
     path('api/jobs/', views.api_job_list, name='api_job_list'),
     path('api/jobs/<int:job_id>/', views.api_job_detail, name='api_job_detail'),
+    path('api/jobs/<int:job_id>/viewers/', views.api_job_viewers, name='api_job_viewers'),
+    path('api/jobs/<int:job_id>/series/', views.api_job_series, name='api_job_series'),
     path('api/companies/', views.api_company_list, name='api_company_list'),
     path('api/companies/<int:company_id>/', views.api_company_detail, name='api_company_detail'),
+    path('api/search-cache/stats/', views.api_search_cache_stats, name='api_search_cache_stats'),
+    path('api/events/stats/', views.api_event_log_stats, name='api_event_log_stats'),
     path('api/search-suggestions/', views.search_suggestions, name='search_suggestions'),
 ]
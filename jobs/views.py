@@ -1,14 +1,35 @@
+import time
+from functools import partial
+
 from django.shortcuts import render, get_object_or_404
-from django.db.models import Q
-from django.core.paginator import Paginator
 from .models import Job, Company, UserProfile
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
 from .serializers import JobSerializer, CompanySerializer
+from .serializers.compiled import compiled_reader
+from . import events, rollups, search, sketches, streaming
+from .search import autocomplete, cache as result_cache
+from .search.facets import get_facets
+from .search.ranking import (
+    NEWEST, REFRESH_SECONDS, RELEVANCE, SORTS, TOP_K, Preferences, get_ranking,
+)
+from .search.salary import SalaryRange
+from .conditional import (
+    conditional_get, list_validators, make_etag, not_modified, set_validators,
+)
+from .fieldsets import requested, sparse_queryset
+from .geo import Near, location_q
+from .prefetch import with_relations
+from .pagination import InvalidCursor, KeysetPage, KeysetPaginator, KeysetPagination, paginate_ranked
+
+# Set on job lists whose results stopped at JOB_SEARCH_MAX_RESULTS or JOB_RANKING_TOP_K
+TRUNCATED_HEADER = 'X-Results-Truncated'
 
 def home(request):
     """Home page with featured jobs and search functionality"""
@@ -18,44 +39,180 @@ def home(request):
     }
     return render(request, 'jobs/home.html', context)
 
+def _jobs_near(near, matched_ids, location, job_type, salary):
+    """Return the filtered ids of jobs within ``near``, nearest first"""
+    index = get_facets()
+    nearby = index.jobs_near(near.places(), matched_ids)
+    return nearby, index.matching(nearby, location, job_type, salary)
+
+def _matched_ids(search_query):
+    """Full-text matches best first, and whether they stopped at ``MAX_RESULTS``"""
+    hits, truncated = search.search_capped(search_query)
+    return [job_id for job_id, _ in hits], truncated
+
+def _ranked_candidates(jobs, search_query, location, job_type, salary, preferences, k=None):
+    """Return the search matches, the ``k`` best candidates (all by default) and
+    whether either was cut short.
+    
+    Candidates are the search hits passing the ``jobs`` filters, or without
+    a query every active job passing them; the matches are ``None`` when
+    not searching. Only the ``MAX_RESULTS`` best search hits are candidates.
+    """
+    truncated = False
+    if search_query:
+        hits, truncated = search.search_capped(search_query)
+        matched_ids = [job_id for job_id, _ in hits]
+        candidates = search.filter_ranked(jobs, matched_ids)
+        text_scores = dict(hits)
+    else:
+        matched_ids = text_scores = None
+        candidates = get_facets().matching(None, location, job_type, salary)
+    if k is None:
+        k = len(candidates)
+    elif len(candidates) > k:
+        truncated = True
+    return matched_ids, get_ranking().top(candidates, k, text_scores, preferences), truncated
+
+def _job_results(jobs, search_query, location, job_type, salary, near, sort, preferences,
+                 cursor, page_size):
+    """Return one listing page's job ids, cursors and facets, cached.
+    
+    ``jobs`` must already carry the location/job_type/salary filters.
+    With ``near`` the page is ordered by distance and ``distances`` maps
+    its job ids to km; otherwise ``sort`` picks relevance ranking (for the
+    viewer's ``preferences``) or newest first. Raises InvalidCursor for a
+    bad ``cursor``.
+    
+    Searches consider the ``MAX_RESULTS`` best full-text matches, and
+    relevance ranking the ``TOP_K`` best candidates. ``truncated`` says
+    whether this result hit either limit, in which case the pages, the
+    count and the facets cover only those jobs.
+    """
+    def compute():
+        # Full-text matches, best first; ``None`` when not searching
+        matched_ids = None
+        distances = None
+        truncated = False
+        if near:
+            # Radius search runs on the in-memory indexes, ordered by distance
+            if search_query:
+                matched_ids, truncated = _matched_ids(search_query)
+            matched_ids, ranked = _jobs_near(near, matched_ids, location, job_type, salary)
+            page = paginate_ranked(ranked, cursor, page_size)
+            ids = page.object_list
+            index = get_facets()
+            km = {place.label: round(distance, 1) for place, distance in near.places()}
+            distances = {job_id: km.get(index.location_of(job_id)) for job_id in ids}
+        elif sort == RELEVANCE:
+            matched_ids, ranked, truncated = _ranked_candidates(
+                jobs, search_query, location, job_type, salary, preferences, TOP_K
+            )
+            page = paginate_ranked(ranked, cursor, page_size)
+            ids = page.object_list
+        elif search_query:
+            matched_ids, truncated = _matched_ids(search_query)
+            # Ids grow with creation time, so this is newest first
+            ranked = sorted(search.filter_ranked(jobs, matched_ids), reverse=True)
+            page = paginate_ranked(ranked, cursor, page_size)
+            ids = page.object_list
+        else:
+            keys = jobs.select_related(None).only('id', 'created_at')
+            page = KeysetPaginator(('-created_at',), page_size).paginate(keys, cursor)
+            ids = [job.pk for job in page]
+        return {
+            'ids': ids,
+            'next': page.next_cursor,
+            'previous': page.previous_cursor,
+            'distances': distances,
+            'truncated': truncated,
+            'facets': get_facets().facets(
+                matched_ids, location=location, job_type=job_type, salary=salary
+            ),
+        }
+    
+    params = result_cache.normalize(
+        search_query, location, job_type, cursor, page_size, salary, near,
+        sort, preferences if sort == RELEVANCE else None,
+    )
+    return result_cache.get_or_compute(params, compute)
+
 def job_list(request):
     """List all jobs with search and filtering"""
-    jobs = Job.objects.filter(is_active=True)
+    jobs = Job.objects.filter(is_active=True).select_related('company')
     
     # Search functionality
     search_query = request.GET.get('search', '')
     location = request.GET.get('location', '')
     job_type = request.GET.get('job_type', '')
     
-    if search_query:
-        jobs = jobs.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(company__name__icontains=search_query)
-        )
-    
     if location:
-        jobs = jobs.filter(location__icontains=location)
+        jobs = jobs.filter(location_q(location))
     
     if job_type:
         jobs = jobs.filter(job_type=job_type)
     
-    # Pagination
-    paginator = Paginator(jobs, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Salary range (?salary_min=&salary_max=&salary_match=); bad input is ignored
+    try:
+        salary = SalaryRange.from_params(request.GET)
+    except ValueError:
+        salary = None
+    if salary:
+        jobs = salary.apply(jobs)
+    
+    # Radius search (?near=place or lat,lon&radius=km)
+    near_error = None
+    try:
+        near = Near.from_params(request.GET)
+    except ValueError as exc:
+        near, near_error = None, str(exc)
+    
+    # Ordering (?sort=relevance|newest); searches default to relevance
+    sort = request.GET.get('sort', '')
+    if sort not in SORTS:
+        sort = RELEVANCE if search_query else NEWEST
+    preferences = (
+        Preferences.for_user(request.user) if sort == RELEVANCE and not near else None
+    )
+    
+    # Keyset pagination; no cursor means the first page
+    try:
+        results = _job_results(
+            jobs, search_query, location, job_type, salary, near, sort, preferences,
+            request.GET.get('cursor'), 10,
+        )
+    except InvalidCursor:
+        raise Http404("Invalid cursor")
+    if search_query and not request.GET.get('cursor'):
+        events.record('search', actor_id=events.actor_of(request), query=search_query)
+    page_obj = KeysetPage(
+        search.load_in_order(jobs, results['ids']), results['next'], results['previous']
+    )
+    if results['distances']:
+        for job in page_obj:
+            job.distance_km = results['distances'].get(job.pk)
     
     context = {
         'page_obj': page_obj,
+        'facets': results['facets'],
         'search_query': search_query,
         'location': location,
         'job_type': job_type,
+        'salary': salary,
+        'near': near,
+        'near_query': request.GET.get('near', ''),
+        'near_error': near_error,
+        'radius': request.GET.get('radius', ''),
+        'sort': sort,
+        'truncated': results['truncated'],
     }
     return render(request, 'jobs/job_list.html', context)
 
 def job_detail(request, job_id):
     """Detailed view of a specific job"""
     job = get_object_or_404(Job, id=job_id, is_active=True)
+    sketches.record_view('job', job.pk, sketches.viewer_id(request))
+    rollups.JOB_VIEWS.incr(job.pk)
+    events.record('view', 'job', job.pk, events.actor_of(request))
     context = {
         'job': job,
     }
@@ -110,57 +267,238 @@ def apply_job(request, job_id):
                 resume=resume,
                 cover_letter=cover_letter
             )
+            events.record('apply', 'job', job.pk, request.user.pk)
             return render(request, 'jobs/application_success.html', {'job': job})
     
     return render(request, 'jobs/apply_job.html', {'job': job})
 
 # API Views
+def _mark_truncated(response, truncated):
+    """Flag a job list that stopped at the search or ranking limit"""
+    if truncated:
+        response[TRUNCATED_HEADER] = 'true'
+    return response
+
+def _job_list_etag(request, sort, preferences):
+    """ETag of a job listing, taken before anything is searched or ranked.
+
+    The result cache generation moves on every job, company and synonym
+    write, which covers the rows, their order and the facets. Relevance
+    order also depends on the viewer's preferences and drifts with recency,
+    which the ranking refreshes every ``REFRESH_SECONDS``.
+    """
+    clock = int(time.time() // REFRESH_SECONDS) if sort == RELEVANCE else None
+    return make_etag(
+        request, 'jobs', result_cache.generation(), preferences and preferences.key(), clock
+    )
+
 @api_view(['GET'])
 def api_job_list(request):
     """API endpoint for job list"""
-    jobs = Job.objects.filter(is_active=True)
-    serializer = JobSerializer(jobs, many=True)
-    return Response(serializer.data)
+    jobs = with_relations(Job.objects.filter(is_active=True), JobSerializer)
+    search_query = request.GET.get('search', '')
+    location = request.GET.get('location', '')
+    job_type = request.GET.get('job_type', '')
+    
+    if location:
+        jobs = jobs.filter(location_q(location))
+    if job_type:
+        jobs = jobs.filter(job_type=job_type)
+    try:
+        salary = SalaryRange.from_params(request.query_params)
+    except ValueError as exc:
+        raise ValidationError({'salary': str(exc)})
+    if salary:
+        jobs = salary.apply(jobs)
+    try:
+        near = Near.from_params(request.query_params)
+    except ValueError as exc:
+        raise ValidationError({'near': str(exc)})
+    sort = request.query_params.get('sort') or (RELEVANCE if search_query else NEWEST)
+    if sort not in SORTS:
+        raise ValidationError({'sort': f"Must be one of: {', '.join(SORTS)}"})
+    preferences = (
+        Preferences.for_user(request.user) if sort == RELEVANCE and not near else None
+    )
+    etag = _job_list_etag(request, sort, preferences)
+    response = not_modified(request, etag)
+    if response is not None:
+        # The search event was recorded with the response being revalidated
+        return set_validators(response, etag)
+    # ?fields= / ?omit= narrow the rows loaded for serialization
+    rows_queryset = sparse_queryset(jobs, JobSerializer, request)
+    fieldsets = requested(request)
+    # Plain-column rows skip model instances and DRF fields altogether
+    compiled = compiled_reader(JobSerializer, **fieldsets)
+    if compiled is not None:
+        load_rows = partial(compiled.rows_in_order, jobs)
+    else:
+        load_rows = partial(search.load_in_order, rows_queryset)
+    
+    # ?stream=json|ndjson returns every match as a flat-memory stream
+    stream_format = streaming.requested_format(request)
+    if stream_format:
+        truncated = False
+        if near or sort == RELEVANCE:
+            if near:
+                matched_ids = None
+                if search_query:
+                    matched_ids, truncated = _matched_ids(search_query)
+                _, ranked = _jobs_near(near, matched_ids, location, job_type, salary)
+            else:
+                _, ranked, truncated = _ranked_candidates(
+                    jobs, search_query, location, job_type, salary, preferences
+                )
+            # Load the (possibly large) ranked id list a chunk at a time
+            rows = (
+                job
+                for ids in streaming.chunked(ranked, streaming.CHUNK_SIZE)
+                for job in load_rows(ids)
+            )
+        elif search_query:
+            matched_ids, truncated = _matched_ids(search_query)
+            ranked = sorted(search.filter_ranked(jobs, matched_ids), reverse=True)
+            rows = load_rows(ranked)
+        else:
+            newest = rows_queryset.order_by('-created_at', '-id')
+            if compiled is not None:
+                newest = compiled.values(newest)
+            rows = newest.iterator(chunk_size=streaming.CHUNK_SIZE)
+        if compiled is not None:
+            response = streaming.stream_compiled(rows, compiled, stream_format)
+        else:
+            response = streaming.stream_response(
+                rows, partial(JobSerializer, **fieldsets), stream_format
+            )
+        return set_validators(_mark_truncated(response, truncated), etag)
+    
+    pagination = KeysetPagination()
+    try:
+        results = _job_results(
+            jobs, search_query, location, job_type, salary, near, sort, preferences,
+            request.query_params.get(pagination.cursor_query_param),
+            pagination.get_page_size(request),
+        )
+    except InvalidCursor:
+        raise NotFound('Invalid cursor')
+    if search_query and not request.query_params.get(pagination.cursor_query_param):
+        events.record('search', actor_id=events.actor_of(request), query=search_query)
+    pagination.set_page(
+        request,
+        KeysetPage(results['ids'], results['next'], results['previous']),
+        results['facets']['total'],
+    )
+    if compiled is not None:
+        rows = compiled.to_representation(load_rows(results['ids']))
+    else:
+        rows = JobSerializer(load_rows(results['ids']), many=True, **fieldsets).data
+    if results['distances']:
+        for row in rows:
+            row['distance_km'] = results['distances'].get(row['id'])
+    data = pagination.get_paginated_data(rows)
+    data['facets'] = results['facets']
+    data['truncated'] = results['truncated']
+    return set_validators(_mark_truncated(Response(data), results['truncated']), etag)
 
 @api_view(['GET'])
+@permission_classes([IsAdminUser])
+def api_search_cache_stats(request):
+    """API endpoint with the job search result cache hit/miss ratios"""
+    return Response(result_cache.stats())
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def api_event_log_stats(request):
+    """API endpoint with the interaction event log's written/dropped/failed counts"""
+    return Response(events.stats())
+
+def _job_validators(request, job_id):
+    return Job.objects.filter(id=job_id, is_active=True).values_list(
+        'updated_at', 'company__updated_at'
+    ).first()
+
+@api_view(['GET'])
+@conditional_get(_job_validators)
 def api_job_detail(request, job_id):
     """API endpoint for job detail"""
-    job = get_object_or_404(Job, id=job_id, is_active=True)
-    serializer = JobSerializer(job)
+    fieldsets = requested(request)
+    compiled = compiled_reader(JobSerializer, **fieldsets)
+    if compiled is not None:
+        row = get_object_or_404(compiled.values(Job.objects.all()), id=job_id, is_active=True)
+        return Response(compiled.to_representation([row])[0])
+    jobs = sparse_queryset(with_relations(Job.objects.all(), JobSerializer), JobSerializer, request)
+    job = get_object_or_404(jobs, id=job_id, is_active=True)
+    serializer = JobSerializer(job, **fieldsets)
     return Response(serializer.data)
 
+@api_view(['GET'])
+def api_job_viewers(request, job_id):
+    """Distinct viewers of a job today and over the last 7 and 30 days"""
+    job = get_object_or_404(Job.objects.only('id'), id=job_id)
+    return Response(sketches.unique_viewers('job', job.pk))
+
+# ?metric= values of api_job_series and the rollup metrics they read
+JOB_SERIES_METRICS = {'views': 'job_view', 'applications': 'application'}
+
+@api_view(['GET'])
+def api_job_series(request, job_id):
+    """Views or applications of a job per hour or day (see jobs/rollups.py)"""
+    job = get_object_or_404(Job.objects.only('id'), id=job_id)
+    metric = request.query_params.get('metric', 'views')
+    if metric not in JOB_SERIES_METRICS:
+        raise ValidationError({'metric': f"Must be one of: {', '.join(JOB_SERIES_METRICS)}"})
+    return Response(rollups.series(JOB_SERIES_METRICS[metric], job.pk, **rollups.series_params(request)))
+
 @api_view(['GET'])
 def api_company_list(request):
     """API endpoint for company list"""
-    companies = Company.objects.all()
-    serializer = CompanySerializer(companies, many=True)
+    etag, _ = list_validators(request, Company.objects.all())
+    response = not_modified(request, etag)
+    if response is not None:
+        return set_validators(response, etag)
+    return set_validators(_company_list(request), etag)
+
+def _company_list(request):
+    companies = sparse_queryset(Company.objects.all(), CompanySerializer, request)
+    fieldsets = requested(request)
+    compiled = compiled_reader(CompanySerializer, **fieldsets)
+    stream_format = streaming.requested_format(request)
+    if stream_format:
+        rows = companies.order_by('pk')
+        if compiled is not None:
+            rows = compiled.values(rows).iterator(chunk_size=streaming.CHUNK_SIZE)
+            return streaming.stream_compiled(rows, compiled, stream_format)
+        rows = rows.iterator(chunk_size=streaming.CHUNK_SIZE)
+        serializer_class = partial(CompanySerializer, **fieldsets)
+        return streaming.stream_response(rows, serializer_class, stream_format)
+    if compiled is not None:
+        return Response(compiled.serialize(companies))
+    serializer = CompanySerializer(companies, many=True, **fieldsets)
     return Response(serializer.data)
 
+def _company_validators(request, company_id):
+    return Company.objects.filter(id=company_id).values_list('updated_at').first()
+
 @api_view(['GET'])
+@conditional_get(_company_validators)
 def api_company_detail(request, company_id):
     """API endpoint for company detail"""
-    company = get_object_or_404(Company, id=company_id)
-    serializer = CompanySerializer(company)
+    fieldsets = requested(request)
+    compiled = compiled_reader(CompanySerializer, **fieldsets)
+    if compiled is not None:
+        row = get_object_or_404(compiled.values(Company.objects.all()), id=company_id)
+        return Response(compiled.to_representation([row])[0])
+    companies = sparse_queryset(Company.objects.all(), CompanySerializer, request)
+    company = get_object_or_404(companies, id=company_id)
+    serializer = CompanySerializer(company, **fieldsets)
     return Response(serializer.data)
 
 def search_suggestions(request):
     """AJAX endpoint for search suggestions"""
     query = request.GET.get('q', '')
     if len(query) >= 2:
-        jobs = Job.objects.filter(
-            Q(title__icontains=query) | 
-            Q(company__name__icontains=query)
-        ).filter(is_active=True)[:5]
-        
-        suggestions = []
-        for job in jobs:
-            suggestions.append({
-                'title': job.title,
-                'company': job.company.name,
-                'location': job.location,
-                'url': f'/jobs/{job.id}/'
-            })
-        
+        # Served from the in-memory autocomplete index, never the database
+        suggestions = autocomplete.suggest(query, limit=5)
         return JsonResponse({'suggestions': suggestions})
     
     return JsonResponse({'suggestions': []})
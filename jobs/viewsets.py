@@ -1,9 +1,20 @@
+from collections import Counter
+
+from django.utils import timezone
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 
+from . import counters, events, rollups, sketches, skillcounts
+from .bulk import BulkModelMixin
+from .conditional import ConditionalGetMixin, not_modified, set_validators
+from .fieldsets import SparseFieldsViewSetMixin
+from .prefetch import SerializerRelationsMixin
+from .profile import included, profile_document, profile_etag
+from .taxonomy import TaxonomyCacheMixin
+
 from .models.education import Education
 from .models.experience import Experience
 from .models.register import Register
@@ -23,9 +34,12 @@ from .serializers.userdetails_serializer import (
     UserDetailsSerializer, UserDetailsCreateSerializer, UserDetailsUpdateSerializer
 )
 
-class EducationViewSet(viewsets.ModelViewSet):
+class EducationViewSet(
+    BulkModelMixin, SparseFieldsViewSetMixin, SerializerRelationsMixin, viewsets.ModelViewSet
+):
     """ViewSet for Education model"""
     
+    queryset = Education.objects.all()
     serializer_class = EducationSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -36,11 +50,11 @@ class EducationViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Return education entries for the current user"""
-        return Education.objects.filter(user=self.request.user)
+        return super().get_queryset().filter(user=self.request.user)
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
-        if self.action == 'create':
+        if self.action in ('create', 'bulk_create'):
             return EducationCreateSerializer
         return EducationSerializer
     
@@ -48,9 +62,12 @@ class EducationViewSet(viewsets.ModelViewSet):
         """Set user when creating education entry"""
         serializer.save(user=self.request.user)
 
-class ExperienceViewSet(viewsets.ModelViewSet):
+class ExperienceViewSet(
+    BulkModelMixin, SparseFieldsViewSetMixin, SerializerRelationsMixin, viewsets.ModelViewSet
+):
     """ViewSet for Experience model"""
     
+    queryset = Experience.objects.all()
     serializer_class = ExperienceSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -61,11 +78,11 @@ class ExperienceViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Return experience entries for the current user"""
-        return Experience.objects.filter(user=self.request.user)
+        return super().get_queryset().filter(user=self.request.user)
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
-        if self.action == 'create':
+        if self.action in ('create', 'bulk_create'):
             return ExperienceCreateSerializer
         return ExperienceSerializer
     
@@ -73,9 +90,10 @@ class ExperienceViewSet(viewsets.ModelViewSet):
         """Set user when creating experience entry"""
         serializer.save(user=self.request.user)
 
-class RegisterViewSet(viewsets.ModelViewSet):
+class RegisterViewSet(SparseFieldsViewSetMixin, SerializerRelationsMixin, viewsets.ModelViewSet):
     """ViewSet for Register model"""
     
+    queryset = Register.objects.all()
     serializer_class = RegisterSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter]
@@ -84,7 +102,7 @@ class RegisterViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Return registration profile for the current user"""
-        return Register.objects.filter(user=self.request.user)
+        return super().get_queryset().filter(user=self.request.user)
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
@@ -106,9 +124,12 @@ class RegisterViewSet(viewsets.ModelViewSet):
             'completion_percentage': 100 if is_complete else 0
         })
 
-class ResumeViewSet(viewsets.ModelViewSet):
+class ResumeViewSet(
+    ConditionalGetMixin, SparseFieldsViewSetMixin, SerializerRelationsMixin, viewsets.ModelViewSet
+):
     """ViewSet for Resume model"""
     
+    queryset = Resume.objects.all()
     serializer_class = ResumeSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -119,7 +140,11 @@ class ResumeViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Return resumes for the current user"""
-        return Resume.objects.filter(user=self.request.user)
+        return super().get_queryset().filter(user=self.request.user)
+    
+    def _validator_extra(self):
+        # download_count includes increments not written to updated_at yet
+        return (*super()._validator_extra(), counters.epoch(self.request.user.pk))
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
@@ -137,24 +162,36 @@ class ResumeViewSet(viewsets.ModelViewSet):
     def download(self, request, pk=None):
         """Track resume download"""
         resume = self.get_object()
-        resume.increment_download_count()
+        rollups.RESUME_DOWNLOADS.incr(resume.pk)
+        events.record('download', 'resume', resume.pk, request.user.pk)
         return Response({
             'download_url': resume.file.url,
-            'download_count': resume.download_count
+            'download_count': resume.increment_download_count()
         })
     
+    @action(detail=True, methods=['get'])
+    def downloads_series(self, request, pk=None):
+        """Downloads per hour or day (``?interval=``, ``?buckets=``, see jobs/rollups.py)"""
+        resume = self.get_object()
+        return Response(rollups.series('resume_download', resume.pk, **rollups.series_params(request)))
+    
     @action(detail=True, methods=['post'])
     def set_primary(self, request, pk=None):
         """Set resume as primary"""
         resume = self.get_object()
         # Remove primary status from other resumes
-        Resume.objects.filter(user=request.user, is_primary=True).update(is_primary=False)
+        Resume.objects.filter(user=request.user, is_primary=True).update(
+            is_primary=False, updated_at=timezone.now()
+        )
         # Set this resume as primary
         resume.is_primary = True
         resume.save()
         return Response({'message': 'Resume set as primary'})
 
-class SkillCategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class SkillCategoryViewSet(
+    TaxonomyCacheMixin, SparseFieldsViewSetMixin, SerializerRelationsMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
     """ViewSet for SkillCategory model (read-only)"""
     
     queryset = SkillCategory.objects.all()
@@ -164,7 +201,10 @@ class SkillCategoryViewSet(viewsets.ReadOnlyModelViewSet):
     search_fields = ['name', 'description']
     ordering = ['name']
 
-class SkillViewSet(viewsets.ReadOnlyModelViewSet):
+class SkillViewSet(
+    TaxonomyCacheMixin, SparseFieldsViewSetMixin, SerializerRelationsMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
     """ViewSet for Skill model (read-only)"""
     
     queryset = Skill.objects.all()
@@ -176,10 +216,17 @@ class SkillViewSet(viewsets.ReadOnlyModelViewSet):
     ordering_fields = ['name', 'usage_count', 'created_at']
     ordering = ['name']
 
-class SkillsViewSet(viewsets.ModelViewSet):
+class SkillsViewSet(
+    BulkModelMixin, ConditionalGetMixin, SparseFieldsViewSetMixin, SerializerRelationsMixin,
+    viewsets.ModelViewSet,
+):
     """ViewSet for User Skills model"""
     
+    queryset = Skills.objects.all()
     serializer_class = SkillsSerializer
+    bulk_unique_fields = ('skill',)
+    # The skill and category names in each row
+    validator_relations = ('skill__updated_at', 'skill__category__updated_at')
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['proficiency_level', 'verification_status', 'is_featured']
@@ -189,14 +236,36 @@ class SkillsViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Return skills for the current user"""
-        return Skills.objects.filter(user=self.request.user)
+        return super().get_queryset().filter(user=self.request.user)
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
-        if self.action == 'create':
+        if self.action in ('create', 'bulk_create'):
             return SkillsCreateSerializer
         return SkillsSerializer
     
+    def perform_bulk_create(self, objects):
+        """Create the batch and add it to the skills' usage_count in one UPDATE"""
+        super().perform_bulk_create(objects)
+        skillcounts.adjust('usage_count', Counter(obj.skill_id for obj in objects))
+    
+    def perform_bulk_update(self, objects, fields):
+        """Update the batch, moving usage_count for rows pointed at another skill"""
+        if 'skill' in fields:
+            before = dict(
+                Skills.objects.filter(pk__in=[obj.pk for obj in objects]).values_list('pk', 'skill_id')
+            )
+        super().perform_bulk_update(objects, fields)
+        if 'skill' in fields:
+            skillcounts.adjust('usage_count', skillcounts.moves(
+                before, {obj.pk: obj.skill_id for obj in objects}
+            ))
+    
+    def perform_bulk_destroy(self, queryset):
+        """Delete the batch; the delete signals' counts are summed into one UPDATE per counter"""
+        with skillcounts.deferred():
+            super().perform_bulk_destroy(queryset)
+    
     def perform_create(self, serializer):
         """Set user when creating skill"""
         serializer.save(user=self.request.user)
@@ -208,9 +277,12 @@ class SkillsViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(featured_skills, many=True)
         return Response(serializer.data)
 
-class SkillEndorsementViewSet(viewsets.ModelViewSet):
+class SkillEndorsementViewSet(
+    SparseFieldsViewSetMixin, SerializerRelationsMixin, viewsets.ModelViewSet
+):
     """ViewSet for Skill Endorsements"""
     
+    queryset = SkillEndorsement.objects.all()
     serializer_class = SkillEndorsementSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, OrderingFilter]
@@ -219,7 +291,7 @@ class SkillEndorsementViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Return endorsements for the current user's skills"""
-        return SkillEndorsement.objects.filter(user_skill__user=self.request.user)
+        return super().get_queryset().filter(user_skill__user=self.request.user)
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
@@ -229,11 +301,15 @@ class SkillEndorsementViewSet(viewsets.ModelViewSet):
     
     def perform_create(self, serializer):
         """Set endorsed_by when creating endorsement"""
-        serializer.save(endorsed_by=self.request.user)
+        endorsement = serializer.save(endorsed_by=self.request.user)
+        events.record('endorse', 'user_skill', endorsement.user_skill_id, self.request.user.pk)
 
-class UserDetailsViewSet(viewsets.ModelViewSet):
+class UserDetailsViewSet(
+    ConditionalGetMixin, SparseFieldsViewSetMixin, SerializerRelationsMixin, viewsets.ModelViewSet
+):
     """ViewSet for UserDetails model"""
     
+    queryset = UserDetails.objects.all()
     serializer_class = UserDetailsSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter]
@@ -242,7 +318,11 @@ class UserDetailsViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Return user details for the current user"""
-        return UserDetails.objects.filter(user=self.request.user)
+        return super().get_queryset().filter(user=self.request.user)
+    
+    def _validator_extra(self):
+        # profile_views_count includes increments not written to updated_at yet
+        return (*super()._validator_extra(), counters.epoch(self.request.user.pk))
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
@@ -270,7 +350,35 @@ class UserDetailsViewSet(viewsets.ModelViewSet):
     def increment_views(self, request, pk=None):
         """Increment profile views counter"""
         user_details = self.get_object()
-        user_details.increment_profile_views()
+        sketches.record_view('profile', user_details.pk, sketches.viewer_id(request))
+        rollups.PROFILE_VIEWS.incr(user_details.pk)
+        events.record('view', 'profile', user_details.pk, request.user.pk)
         return Response({
-            'profile_views_count': user_details.profile_views_count
+            'profile_views_count': user_details.increment_profile_views()
         })
+    
+    @action(detail=True, methods=['get'])
+    def unique_viewers(self, request, pk=None):
+        """Distinct viewers today and over the last 7 and 30 days (see jobs/sketches.py)"""
+        user_details = self.get_object()
+        return Response(sketches.unique_viewers('profile', user_details.pk))
+    
+    @action(detail=True, methods=['get'])
+    def views_series(self, request, pk=None):
+        """Profile views per hour or day (``?interval=``, ``?buckets=``, see jobs/rollups.py)"""
+        user_details = self.get_object()
+        return Response(rollups.series('profile_view', user_details.pk, **rollups.series_params(request)))
+
+class ProfileViewSet(viewsets.ViewSet):
+    """The current user's whole profile in one response (see jobs/profile.py)"""
+    
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def list(self, request):
+        """Return the profile document, or 304 if the ETag still matches"""
+        sections = included(request)
+        etag = profile_etag(request, sections)
+        response = not_modified(request, etag)
+        if response is None:
+            response = Response(profile_document(request, sections))
+        return set_validators(response, etag)